@@ -16,9 +16,11 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length, to_list
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
@@ -77,6 +79,10 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def to_list(self) -> list:
+        """Return a shallow copy of the elements as a Python list, for bulk operations."""
+        return self._data.copy()
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -100,14 +106,18 @@ def hash_function_2(key: str) -> int:
 
 class SLNode:
     """
-    Singly Linked List node for use in a hash map
+    Singly Linked List node for use in a hash map.
+    Carries the hash of its key so the map can rehash and compare without calling the hash function.
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash_val: int = None) -> None:
+        """Initialize node given a key, value and optionally the hash of the key."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash_val
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +129,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -142,8 +154,11 @@ class LinkedList:
     """
     Class implementing a Singly Linked List
     Supported methods are: insert, remove, contains, length, iterator
+    Passing the key's hash to insert, remove and contains lets them skip full key compares on hash mismatch.
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,35 +183,49 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash_val: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash_val)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash_val: int = None) -> bool:
         """
         Remove first node with matching key.
         Return True if removal was successful, False otherwise.
         """
+        return self.pop(key, hash_val) is not None
+
+    def pop(self, key: str, hash_val: int = None) -> SLNode:
+        """
+        Remove first node with matching key.
+        Return the removed node, or None if no match
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash_val is None or node.hash == hash_val) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
-    def contains(self, key: str) -> SLNode:
+    def contains(self, key: str, hash_val: int = None) -> SLNode:
         """Return node with matching key, or None if no match"""
         node = self._head
+        if hash_val is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash_val and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,14 +239,18 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ('key', 'value', 'is_tombstone', 'hash')
+
+    def __init__(self, key: str, value: object, hash_val: int = None) -> None:
+        """Initialize an entry for use in a hash map, optionally caching the hash of its key."""
         self.key = key
         self.value = value
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
 
+        self.hash = hash_val
+
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
@@ -0,0 +1,1552 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Benchmarks for the HashMap implementations. Run with `python benchmarks.py --help`.
+
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+
+import cache_map
+import frequency_counting
+import hash_map_concurrent
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_oa_compact
+import hash_map_rh
+import hash_map_sc
+import hash_map_shared
+import hash_map_sharded
+import hash_map_swiss
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_batch import bucket_indices, has_batch_path, hash_keys
+from hash_functions import HASH_FUNCTIONS, CachedHash, builtin_hash, fnv1a_hash
+
+
+def _time_per_op(fn, keys) -> float:
+    """
+    Call fn on every key and return the mean time per call in nanoseconds.
+    """
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+def bench_sc_lookup_scaling(sizes, lookups: int = 100_000, max_load: float = 1.0, function: callable = builtin_hash) -> list:
+    """
+    Fill a chaining HashMap with 'str' + int keys and time random hit and miss lookups at each size. With load-driven
+    growth the per-lookup latency should stay flat as the key count grows.
+    :param sizes: Key counts to benchmark
+    :param lookups: Number of lookups timed at each size
+    :param max_load: Grow threshold handed to the HashMap
+    :param function: Hash function handed to the HashMap. The sample hash functions only produce a few thousand
+                     distinct values for these keys, so chains grow with size no matter how large the table gets.
+    :return: List of result dicts, one per size
+    """
+    results = []
+    rng = random.Random(0)
+    for size in sizes:
+        m = hash_map_sc.HashMap(function=function, max_load=max_load)
+        for i in range(size):
+            m.put('str' + str(i), i)
+
+        hits = ['str' + str(rng.randrange(size)) for _ in range(lookups)]
+        misses = ['str' + str(size + rng.randrange(size)) for _ in range(lookups)]
+        results.append({
+            'size': size,
+            'capacity': m.get_capacity(),
+            'load': round(m.table_load(), 3),
+            'resizes': m.get_resize_count(),
+            'hit_ns': round(_time_per_op(m.get, hits)),
+            'miss_ns': round(_time_per_op(m.contains_key, misses)),
+        })
+    return results
+
+
+def _percentiles(samples: list) -> dict:
+    """
+    Return the p50, p99, p999 and max of a list of latencies, in microseconds.
+    """
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return {
+        'p50_us': round(samples[last // 2] / 1000, 2),
+        'p99_us': round(samples[last * 99 // 100] / 1000, 2),
+        'p999_us': round(samples[last * 999 // 1000] / 1000, 2),
+        'max_us': round(samples[last] / 1000, 2),
+    }
+
+
+def bench_resize_latency(size: int, incremental_step: int = 8, function: callable = builtin_hash) -> list:
+    """
+    Time every put while filling each map from its default capacity to size keys, once with stop-the-world resizes
+    and once with incremental resizes. The tail percentiles show the cost of the put that triggers a resize.
+    :param size: Number of keys inserted
+    :param incremental_step: Buckets migrated per operation in incremental mode
+    :param function: Hash function handed to the HashMaps
+    :return: List of result dicts, one per map and mode
+    """
+    engines = {
+        'sc': lambda step: hash_map_sc.HashMap(11, function, incremental_step=step),
+        'oa': lambda step: hash_map_oa.HashMap(11, function, incremental_step=step),
+    }
+    keys = ['str' + str(i) for i in range(size)]
+    results = []
+    for name, make in engines.items():
+        for step in (0, incremental_step):
+            m = make(step)
+            samples = []
+            clock = time.perf_counter_ns
+            #  Keep garbage collector pauses out of the tail
+            gc.disable()
+            for i, key in enumerate(keys):
+                start = clock()
+                m.put(key, i)
+                samples.append(clock() - start)
+            gc.enable()
+            results.append({'map': name, 'mode': f'incremental({step})' if step else 'stop-the-world',
+                            'size': size, **_percentiles(samples)})
+    return results
+
+
+def key_sets(count: int, seed: int = 0) -> dict:
+    """
+    Build realistic key sets of the given size: 'str' + int keys, random UUIDs and URLs.
+    """
+    rng = random.Random(seed)
+    hosts = ['example.com', 'api.example.org', 'cdn.example.net', 'shop.example.io']
+    words = ['users', 'items', 'orders', 'search', 'static', 'img', 'v1', 'v2', 'docs', 'cart']
+    urls = []
+    for i in range(count):
+        path = '/'.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        urls.append(f"https://{rng.choice(hosts)}/{path}/{i}?page={rng.randrange(100)}")
+    return {
+        'str+int': ['str' + str(i) for i in range(count)],
+        'uuid': [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(count)],
+        'url': urls,
+    }
+
+
+def zipf_keys(count: int, distinct: int, skew: float = 1.1, seed: int = 0, keys: list = None) -> list:
+    """
+    Draw count keys from distinct 'item' + rank keys, where rank r is drawn with probability proportional to
+    1 / r ** skew, so a few keys dominate the stream. If keys is given, rank r draws keys[r] instead.
+    """
+    rng = random.Random(seed)
+    cum_weights, total = [], 0.0
+    for rank in range(1, distinct + 1):
+        total += rank ** -skew
+        cum_weights.append(total)
+    ranks = rng.choices(range(distinct), cum_weights=cum_weights, k=count)
+    if keys is not None:
+        return [keys[rank] for rank in ranks]
+    return ['item' + str(rank) for rank in ranks]
+
+
+def bench_hash_functions(count: int, capacity: int = None) -> list:
+    """
+    Hash every key set with every named hash function and report how well the keys spread over a prime-capacity
+    table, together with the hashing throughput.
+    :param count: Keys per key set
+    :param capacity: Table capacity used for the distribution; defaults to the first prime >= 2 * count
+    :return: List of result dicts, one per key set and hash function
+    """
+    if capacity is None:
+        capacity = hash_map_sc.HashMap(1)._next_prime(2 * count)
+    results = []
+    for set_name, keys in key_sets(count).items():
+        for func_name, function in HASH_FUNCTIONS.items():
+            start = time.perf_counter()
+            hashes = [function(key) for key in keys]
+            elapsed = time.perf_counter() - start
+
+            #  A uniform hash fills count / capacity of the slots on average, with few keys per slot
+            bucket_counts = {}
+            for bucket_idx in bucket_indices(hashes, capacity):
+                bucket_counts[bucket_idx] = bucket_counts.get(bucket_idx, 0) + 1
+            results.append({
+                'keys': set_name,
+                'function': func_name,
+                'distinct_hashes': len(set(hashes)),
+                'used_buckets': len(bucket_counts),
+                'max_chain': max(bucket_counts.values()),
+                'collisions': count - len(bucket_counts),
+                'mhash_per_s': round(count / elapsed / 1e6, 2),
+            })
+    return results
+
+
+class _CountingHash:
+    """
+    Hash function wrapper that counts how often it is called
+    """
+
+    def __init__(self, function: callable) -> None:
+        """Wrap the given hash function."""
+        self._function = function
+        self.calls = 0
+
+    def __call__(self, key: str) -> int:
+        """Count the call and forward it."""
+        self.calls += 1
+        return self._function(key)
+
+
+class _CountingArray(DynamicArray):
+    """
+    Dynamic Array that counts element reads, i.e. probe steps when used as a hash table
+    """
+
+    def __init__(self, arr=None) -> None:
+        """Initialize new dynamic array using a list."""
+        super().__init__(arr)
+        self.reads = 0
+
+    def get_at_index(self, index: int):
+        """Count the read and return value of element at a given index."""
+        self.reads += 1
+        return super().get_at_index(index)
+
+
+def bench_oa_probe_counts(size: int, hash_map_cls: type = hash_map_oa.HashMap) -> list:
+    """
+    Count hash function calls and slot reads per operation on an open addressing map filled to a load of about 0.45.
+    The table is sized up front so no resize happens while counting.
+    :param size: Number of keys in the map
+    :param hash_map_cls: Open addressing HashMap class to measure, so older versions can be compared
+    :return: List of result dicts, one per operation
+    """
+    function = _CountingHash(builtin_hash)
+    m = hash_map_cls(int(size / 0.45), function)
+    keys = ['str' + str(i) for i in range(size)]
+    for i, key in enumerate(keys):
+        m.put(key, i)
+
+    #  Remove a tenth of the keys so the probes also have tombstones to walk through
+    removed = keys[::10]
+    for key in removed:
+        m.remove(key)
+    present = [key for key in keys if key not in set(removed)][:size // 2]
+    missing = ['miss' + str(i) for i in range(size // 2)]
+
+    m._buckets = _CountingArray(m._buckets._data)
+    operations = [
+        ('get hit', m.get, present),
+        ('get miss', m.get, missing),
+        ('contains_key miss', m.contains_key, missing),
+        ('put update', lambda key: m.put(key, 0), present),
+        ('put new', lambda key: m.put(key, 0), removed),
+        ('remove', m.remove, present),
+    ]
+    results = []
+    for name, operation, op_keys in operations:
+        function.calls, m._buckets.reads = 0, 0
+        for key in op_keys:
+            operation(key)
+        results.append({
+            'operation': name,
+            'hash_calls_per_op': round(function.calls / len(op_keys), 2),
+            'probes_per_op': round(m._buckets.reads / len(op_keys), 2),
+        })
+    return results
+
+
+class _CountingKey(str):
+    """
+    String key that counts equality comparisons, i.e. chain nodes visited when stored in a chaining map
+    """
+    compares = 0
+
+    def __eq__(self, other) -> bool:
+        """Count the comparison and compare as a plain string."""
+        _CountingKey.compares += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def bench_sc_chain_op_counts(chain_lengths=(1, 2, 5, 10, 20, 50),
+                             hash_map_cls: type = hash_map_sc.HashMap) -> list:
+    """
+    Count hash function calls and key comparisons per operation on a single chain of each given length. Every key
+    hashes to the same bucket and the capacity is large enough that no resize happens.
+    :param chain_lengths: Chain lengths to measure
+    :param hash_map_cls: Chaining HashMap class to measure, so older versions can be compared
+    :return: List of result dicts, one per chain length and operation
+    """
+    function = _CountingHash(lambda key: 0)
+    results = []
+    for length in chain_lengths:
+        m = hash_map_cls(101, function)
+        keys = [_CountingKey('key' + str(i)) for i in range(length)]
+        for key in keys:
+            m.put(key, 0)
+
+        operations = [
+            ('get hit', m.get, keys),
+            ('get miss', m.get, [_CountingKey('miss')]),
+            ('put update', lambda key: m.put(key, 1), keys),
+            ('remove', m.remove, keys),
+            ('put new', lambda key: m.put(key, 2), keys),
+        ]
+        for name, operation, op_keys in operations:
+            function.calls, _CountingKey.compares = 0, 0
+            for key in op_keys:
+                operation(key)
+            results.append({
+                'chain': length,
+                'operation': name,
+                'hash_calls_per_op': round(function.calls / len(op_keys), 2),
+                'compares_per_op': round(_CountingKey.compares / len(op_keys), 2),
+            })
+    return results
+
+
+def _traced_bytes(build: callable) -> (object, int):
+    """
+    Call build and return its result with the number of bytes it left allocated.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def bench_oa_layouts(size: int, function: callable = builtin_hash) -> list:
+    """
+    Compare the HashEntry-per-slot open addressing map with the parallel-array engine. Memory per entry covers the
+    table and entry objects but not the keys and values themselves, which are created before measuring.
+    :param size: Number of keys inserted
+    :param function: Hash function handed to the HashMaps
+    :return: List of result dicts, one per engine
+    """
+    engines = {
+        'oa (HashEntry)': hash_map_oa.HashMap,
+        'oa_compact (arrays)': hash_map_oa_compact.HashMap,
+    }
+    keys = ['str' + str(i) for i in range(size)]
+    values = list(range(size, 2 * size))
+    results = []
+    for name, hash_map_cls in engines.items():
+        def build():
+            m = hash_map_cls(11, function)
+            for key, value in zip(keys, values):
+                m.put(key, value)
+            return m
+
+        _, table_bytes = _traced_bytes(build)
+
+        start = time.perf_counter()
+        m = build()
+        put_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for key in keys:
+            m.get(key)
+        get_elapsed = time.perf_counter() - start
+
+        results.append({
+            'engine': name,
+            'size': size,
+            'capacity': m.get_capacity(),
+            'bytes_per_entry': round(table_bytes / size, 1),
+            'put_kops': round(size / put_elapsed / 1000, 1),
+            'get_kops': round(size / get_elapsed / 1000, 1),
+        })
+    return results
+
+
+def bench_resize_cost(size: int, function: callable = fnv1a_hash,
+                      sc_cls: type = hash_map_sc.HashMap, oa_cls: type = hash_map_oa.HashMap) -> list:
+    """
+    Build each map at a fixed capacity (so no resize happens while building), then measure the memory held per
+    entry and the time and hash calls taken by a single resize_table to double the capacity.
+    :param size: Number of keys in each map
+    :param function: Hash function handed to the HashMaps
+    :param sc_cls: Chaining HashMap class to measure, so older versions can be compared
+    :param oa_cls: Open addressing HashMap class to measure, so older versions can be compared
+    :return: List of result dicts, one per map
+    """
+    engines = {
+        'sc': lambda hash_fn: sc_cls(size, hash_fn),
+        'oa': lambda hash_fn: oa_cls(2 * size + 1, hash_fn),
+    }
+    keys = ['str' + str(i) for i in range(size)]
+    values = list(range(size, 2 * size))
+    results = []
+    for name, make in engines.items():
+        counting_function = _CountingHash(function)
+
+        def build():
+            m = make(counting_function)
+            for key, value in zip(keys, values):
+                m.put(key, value)
+            return m
+
+        m, table_bytes = _traced_bytes(build)
+        counting_function.calls = 0
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        m.resize_table(2 * m.get_capacity())
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        results.append({
+            'map': name,
+            'size': size,
+            'bytes_per_entry': round(table_bytes / size, 1),
+            'resize_s': round(elapsed, 3),
+            'resize_hash_calls': counting_function.calls,
+        })
+    return results
+
+
+def bench_batch_ops(batch_size: int, function: callable = builtin_hash) -> list:
+    """
+    Load a batch into an empty map with a put loop and with put_many, then read it back with a get loop and with
+    get_many.
+    :param batch_size: Number of key/value pairs in the batch
+    :param function: Hash function handed to the HashMaps
+    :return: List of result dicts, one per map and operation
+    """
+    engines = {
+        'sc': lambda: hash_map_sc.HashMap(11, function),
+        'oa': lambda: hash_map_oa.HashMap(11, function),
+    }
+    keys = ['str' + str(i) for i in range(batch_size)]
+    pairs = DynamicArray([(key, i) for i, key in enumerate(keys)])
+    key_da = DynamicArray(keys)
+    results = []
+    for name, make in engines.items():
+        looped, batched = make(), make()
+
+        def put_loop():
+            for key, value in zip(keys, range(batch_size)):
+                looped.put(key, value)
+
+        def get_loop():
+            for key in keys:
+                looped.get(key)
+
+        timings = {}
+        for label, operation in (('put loop', put_loop), ('put_many', lambda: batched.put_many(pairs)),
+                                 ('get loop', get_loop), ('get_many', lambda: batched.get_many(key_da))):
+            start = time.perf_counter()
+            operation()
+            timings[label] = time.perf_counter() - start
+
+        for loop_label, batch_label in (('put loop', 'put_many'), ('get loop', 'get_many')):
+            results.append({
+                'map': name,
+                'operation': batch_label,
+                'loop_kops': round(batch_size / timings[loop_label] / 1000, 1),
+                'batch_kops': round(batch_size / timings[batch_label] / 1000, 1),
+                'speedup': round(timings[loop_label] / timings[batch_label], 2),
+            })
+    return results
+
+
+def bench_batch_hashing(count: int) -> list:
+    """
+    Compare calling each hash function once per key with hash_keys, which computes the functions it supports with
+    NumPy, and check that both give the same hashes.
+    :param count: Keys per key set
+    :return: List of result dicts, one per key set and hash function
+    """
+    results = []
+    for set_name, keys in key_sets(count).items():
+        for func_name, function in HASH_FUNCTIONS.items():
+            start = time.perf_counter()
+            scalar = [function(key) for key in keys]
+            scalar_elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            batch = hash_keys(keys, function)
+            batch_elapsed = time.perf_counter() - start
+            results.append({
+                'keys': set_name,
+                'function': func_name,
+                'numpy': has_batch_path(function),
+                'identical': batch == scalar,
+                'scalar_mhash_per_s': round(count / scalar_elapsed / 1e6, 2),
+                'batch_mhash_per_s': round(count / batch_elapsed / 1e6, 2),
+            })
+    return results
+
+
+class _CountingList(list):
+    """
+    List that counts element reads, for slot arrays that are not Dynamic Arrays
+    """
+    reads = 0
+
+    def __getitem__(self, index):
+        """Count the read and return the element."""
+        _CountingList.reads += 1
+        return list.__getitem__(self, index)
+
+
+def _probe_lengths(m, keys: list) -> list:
+    """
+    Return the number of slots inspected by contains_key for each key. Works for hash_map_oa (reads of the
+    _buckets Dynamic Array) and hash_map_rh (reads of the _dists array).
+    """
+    if isinstance(m, hash_map_rh.HashMap):
+        counted, restore = _CountingList(m._dists), m._dists
+        m._dists = counted
+        lengths = []
+        for key in keys:
+            _CountingList.reads = 0
+            m.contains_key(key)
+            lengths.append(_CountingList.reads)
+        m._dists = restore
+        return lengths
+
+    counted, restore = _CountingArray(m._buckets.to_list()), m._buckets
+    m._buckets = counted
+    lengths = []
+    for key in keys:
+        counted.reads = 0
+        m.contains_key(key)
+        lengths.append(counted.reads)
+    m._buckets = restore
+    return lengths
+
+
+def bench_probe_lengths(size: int, functions=('builtin',)) -> list:
+    """
+    Fill quadratic probing and Robin Hood maps with the same keys and report hit and miss probe lengths and memory.
+    Each map is sized up front to sit just under its grow threshold: 0.5 for quadratic probing, and both 0.5 and
+    the default 0.9 for Robin Hood.
+    :param size: Number of keys inserted
+    :param functions: Names from HASH_FUNCTIONS of the hash functions handed to the HashMaps
+    :return: List of result dicts, one per hash function and engine
+    """
+    engines = [
+        ('oa quadratic', lambda function: hash_map_oa.HashMap(int(size / 0.49), function)),
+        ('rh robin hood', lambda function: hash_map_rh.HashMap(int(size / 0.49), function)),
+        ('rh robin hood', lambda function: hash_map_rh.HashMap(int(size / 0.88), function)),
+    ]
+    keys = ['str' + str(i) for i in range(size)]
+    misses = ['miss' + str(i) for i in range(size)]
+    sample = max(1, size // 10000)
+    results = []
+    for function_name, (name, make) in itertools.product(functions, engines):
+        def build():
+            m = make(HASH_FUNCTIONS[function_name])
+            for i, key in enumerate(keys):
+                m.put(key, i)
+            return m
+
+        m, table_bytes = _traced_bytes(build)
+        hits = _probe_lengths(m, keys[::sample])
+        missed = _probe_lengths(m, misses[::sample])
+        results.append({
+            'function': function_name,
+            'engine': name,
+            'size': size,
+            'load': round(m.table_load(), 2),
+            'hit_mean': round(sum(hits) / len(hits), 2),
+            'hit_max': max(hits),
+            'miss_mean': round(sum(missed) / len(missed), 2),
+            'miss_max': max(missed),
+            'bytes_per_entry': round(table_bytes / size, 1),
+        })
+    return results
+
+
+def bench_oa_churn(size: int, rounds: int = 20, churn: float = 0.25, function: callable = builtin_hash) -> list:
+    """
+    Keep size live keys in an open addressing map while every round removes a random churn fraction of them and
+    inserts as many new keys. The live count never reaches the grow threshold, so only compaction clears the
+    tombstones. Run once with compaction disabled and once with the default threshold.
+    :param size: Number of live keys
+    :param rounds: Number of remove/insert rounds
+    :param churn: Fraction of the live keys replaced every round
+    :param function: Hash function handed to the HashMaps
+    :return: List of result dicts, one per map and checkpoint round
+    """
+    rng = random.Random(0)
+    misses = ['miss' + str(i) for i in range(0, size, max(1, size // 10000))]
+    results = []
+    for compact_load in (1.0, hash_map_oa.HashMap(1, function).get_compact_load()):
+        m = hash_map_oa.HashMap(int(size / 0.4), function, compact_load=compact_load)
+        live = ['str' + str(i) for i in range(size)]
+        for i, key in enumerate(live):
+            m.put(key, i)
+        next_key = size
+        for round_num in range(1, rounds + 1):
+            for _ in range(int(size * churn)):
+                idx = rng.randrange(size)
+                m.remove(live[idx])
+                live[idx] = 'str' + str(next_key)
+                m.put(live[idx], next_key)
+                next_key += 1
+            if round_num % (rounds // 4 or 1) == 0:
+                lengths = _probe_lengths(m, misses)
+                results.append({
+                    'compact_load': compact_load,
+                    'round': round_num,
+                    'tombstones': m.get_tombstone_count(),
+                    'used': round((m.get_size() + m.get_tombstone_count()) / m.get_capacity(), 2),
+                    'compactions': m.get_compaction_count(),
+                    'miss_probe_mean': round(sum(lengths) / len(lengths), 2),
+                    'miss_probe_max': max(lengths),
+                    'miss_ns': round(_time_per_op(m.contains_key, misses)),
+                })
+    return results
+
+
+def bench_lookup_tail_latency(size: int, lookups: int = 100_000) -> list:
+    """
+    Time every get of random hits and misses and report the latency percentiles for the chaining, quadratic probing
+    and cuckoo maps. Runs once with the clustering hash_function_2 and once with builtin_hash; the cuckoo map
+    indexes its second table with fnv1a_hash in both runs, and may rehash since hash_function_2 collides in bulk.
+    :param size: Number of keys inserted
+    :param lookups: Number of timed hits and of timed misses
+    :return: List of result dicts, one per hash function, engine and lookup kind
+    """
+    engines = {
+        'sc': lambda function: hash_map_sc.HashMap(11, function),
+        'oa': lambda function: hash_map_oa.HashMap(11, function),
+        'cuckoo': lambda function: hash_map_cuckoo.HashMap(11, function, fnv1a_hash, rehash=True),
+    }
+    rng = random.Random(0)
+    keys = ['str' + str(i) for i in range(size)]
+    lookup_keys = {
+        'hit': [keys[rng.randrange(size)] for _ in range(lookups)],
+        'miss': ['str' + str(size + rng.randrange(size)) for _ in range(lookups)],
+    }
+    clock = time.perf_counter_ns
+    results = []
+    for function in (hash_function_2, builtin_hash):
+        for name, make in engines.items():
+            m = make(function)
+            for i, key in enumerate(keys):
+                m.put(key, i)
+            for kind, batch in lookup_keys.items():
+                samples = []
+                gc.disable()
+                for key in batch:
+                    start = clock()
+                    m.get(key)
+                    samples.append(clock() - start)
+                gc.enable()
+                results.append({'function': function.__name__, 'map': name, 'lookup': kind, 'size': size,
+                                **_percentiles(samples)})
+    return results
+
+
+def bench_open_addressing_lookups(size: int, lookups: int = 100_000, functions=('builtin',)) -> list:
+    """
+    Time hit and miss lookups and count key comparisons per lookup on every open addressing engine, each filled
+    through put so it sits at a load its own resize policy produces.
+    :param size: Number of keys inserted
+    :param lookups: Number of timed hits and of timed misses
+    :param functions: Names from HASH_FUNCTIONS of the hash functions handed to the HashMaps
+    :return: List of result dicts, one per hash function and engine
+    """
+    engines = {
+        'oa': hash_map_oa.HashMap,
+        'oa compact': hash_map_oa_compact.HashMap,
+        'rh': hash_map_rh.HashMap,
+        'swiss': hash_map_swiss.HashMap,
+    }
+    rng = random.Random(0)
+    keys = ['str' + str(i) for i in range(size)]
+    hits = [keys[rng.randrange(size)] for _ in range(lookups)]
+    misses = ['str' + str(size + rng.randrange(size)) for _ in range(lookups)]
+    counted_hits = [_CountingKey(key) for key in hits[:10000]]
+    counted_misses = [_CountingKey(key) for key in misses[:10000]]
+    results = []
+    for function_name, (name, hash_map_cls) in itertools.product(functions, engines.items()):
+        m = hash_map_cls(11, HASH_FUNCTIONS[function_name])
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        row = {'function': function_name, 'engine': name, 'size': size, 'load': round(m.table_load(), 2),
+               'hit_ns': round(_time_per_op(m.get, hits)), 'miss_ns': round(_time_per_op(m.get, misses))}
+        for kind, counted in (('hit', counted_hits), ('miss', counted_misses)):
+            _CountingKey.compares = 0
+            for key in counted:
+                m.get(key)
+            row[f'{kind}_compares'] = round(_CountingKey.compares / len(counted), 2)
+        results.append(row)
+    return results
+
+
+class _GlobalLockMap:
+    """
+    Chaining HashMap behind one lock, the baseline for the lock striping benchmark
+    """
+
+    def __init__(self, function: callable) -> None:
+        """Create the map and its lock."""
+        self._map = hash_map_sc.HashMap(11, function)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        """Put under the lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """Get under the lock."""
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove under the lock."""
+        with self._lock:
+            self._map.remove(key)
+
+    def get_size(self) -> int:
+        """Return the size of the map."""
+        return self._map.get_size()
+
+
+def bench_concurrent_stress(ops_per_thread: int, thread_counts=(1, 2, 4, 8), function: callable = builtin_hash) -> list:
+    """
+    Run a mixed workload (80% get, 15% put, 5% remove) from several threads at once, against the lock striping map
+    and against a chaining map behind a single lock. Every thread reads the whole key space but only writes its own
+    keys, so the final contents can be checked against what each thread did. Maps start empty, so resizes happen
+    while the other threads keep working.
+    :param ops_per_thread: Operations run by each thread
+    :param thread_counts: Numbers of threads to benchmark
+    :param function: Hash function handed to the HashMaps
+    :return: List of result dicts, one per map and thread count
+    """
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    engines = {
+        'striped': lambda: hash_map_concurrent.HashMap(11, function),
+        'global lock': lambda: _GlobalLockMap(function),
+    }
+    results = []
+    for threads in thread_counts:
+        for name, make in engines.items():
+            m = make()
+            expected = [{} for _ in range(threads)]
+            barrier = threading.Barrier(threads + 1)
+
+            def worker(num: int) -> None:
+                rng = random.Random(num)
+                own = expected[num]
+                span = ops_per_thread // 4
+                barrier.wait()
+                for i in range(ops_per_thread):
+                    op = rng.random()
+                    if op < 0.8:
+                        m.get(f"{rng.randrange(threads)}:{rng.randrange(span)}")
+                    elif op < 0.95:
+                        key = f"{num}:{rng.randrange(span)}"
+                        m.put(key, i)
+                        own[key] = i
+                    else:
+                        key = f"{num}:{rng.randrange(span)}"
+                        m.remove(key)
+                        own.pop(key, None)
+
+            workers = [threading.Thread(target=worker, args=(num,)) for num in range(threads)]
+            for thread in workers:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            consistent = m.get_size() == sum(len(own) for own in expected) and \
+                all(m.get(key) == value for own in expected for key, value in own.items())
+            results.append({
+                'map': name,
+                'threads': threads,
+                'gil': gil,
+                'kops_per_s': round(threads * ops_per_thread / elapsed / 1000, 1),
+                'consistent': consistent,
+            })
+    return results
+
+
+def bench_sharded_scaling(size: int, lookups: int = 100_000, process_counts=(1, 2, 4, 8), batch: int = 100_000,
+                          function: callable = fnv1a_hash) -> list:
+    """
+    Build a sharded map of size keys with put_many batches and query it with get_many batches, for each number of
+    worker processes. The in-process chaining map is timed with the same batches as the baseline.
+    :param size: Number of keys inserted
+    :param lookups: Number of keys looked up
+    :param process_counts: Numbers of worker processes to benchmark
+    :param batch: Pairs or keys per put_many / get_many call
+    :param function: Hash function used for routing and inside the shards
+    :return: List of result dicts, one per configuration
+    """
+    rng = random.Random(0)
+    pairs = [('str' + str(i), i) for i in range(size)]
+    lookup_keys = ['str' + str(rng.randrange(2 * size)) for _ in range(lookups)]
+
+    def run(m) -> dict:
+        start = time.perf_counter()
+        for first in range(0, size, batch):
+            m.put_many(pairs[first:first + batch])
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for first in range(0, lookups, batch):
+            m.get_many(lookup_keys[first:first + batch])
+        query = time.perf_counter() - start
+        return {'size': size, 'build_s': round(build, 2), 'put_kops_per_s': round(size / build / 1000, 1),
+                'get_kops_per_s': round(lookups / query / 1000, 1)}
+
+    results = [{'map': 'in-process sc', 'processes': 0, **run(hash_map_sc.HashMap(size, function))}]
+    for processes in process_counts:
+        with hash_map_sharded.HashMap(processes, hash_map_sc.HashMap, size // processes, function) as m:
+            results.append({'map': 'sharded sc', 'processes': processes, **run(m)})
+    return results
+
+
+def bench_shared_table(size: int, lookups: int = 100_000, function: callable = fnv1a_hash) -> list:
+    """
+    Compare what a reader process pays to get a usable table: rebuilding a hash_map_oa.HashMap from the pairs,
+    attaching to a shared memory table or mapping a table file. Reports setup time, the Python memory the reader
+    allocates for the table (measured in a separate, traced setup), and the time per get.
+    :param size: Number of key/value pairs
+    :param lookups: Number of timed gets, half hits and half misses
+    :param function: Hash function used by every table
+    :return: List of result dicts, one per way of getting the table
+    """
+    rng = random.Random(0)
+    pairs = [('str' + str(i), i) for i in range(size)]
+    lookup_keys = ['str' + str(rng.randrange(2 * size)) for _ in range(lookups)]
+
+    def rebuild():
+        m = hash_map_oa.HashMap(11, function)
+        for key, value in pairs:
+            m.put(key, value)
+        return m
+
+    start = time.perf_counter()
+    source = hash_map_shared.HashMap.build(pairs, function)
+    build_s = time.perf_counter() - start
+    path = os.path.join(tempfile.mkdtemp(), 'table.bin')
+    hash_map_shared.HashMap.build(pairs, function, path=path).close()
+
+    readers = {
+        'rebuild oa': rebuild,
+        'attach shared memory': lambda: hash_map_shared.HashMap.attach(source.get_name(), function),
+        'open mmap file': lambda: hash_map_shared.HashMap.open(path, function),
+    }
+    results = []
+    for name, setup in readers.items():
+        m, private_bytes = _traced_bytes(setup)
+        if isinstance(m, hash_map_shared.HashMap):
+            m.close()
+        start = time.perf_counter()
+        m = setup()
+        setup_s = time.perf_counter() - start
+        results.append({
+            'reader': name,
+            'size': size,
+            'setup_ms': round(setup_s * 1000, 1),
+            'private_bytes': private_bytes,
+            'get_ns': round(_time_per_op(m.get, lookup_keys)),
+        })
+        if isinstance(m, hash_map_shared.HashMap):
+            m.close()
+    results.append({'reader': 'build shared (once)', 'size': size, 'setup_ms': round(build_s * 1000, 1),
+                    'private_bytes': 0, 'get_ns': 0})
+    source.unlink()
+    os.remove(path)
+    return results
+
+
+def bench_snapshot_startup(sizes, function: callable = fnv1a_hash) -> list:
+    """
+    Compare the startup paths for a saved map: rebuilding it by putting every pair, rebuilding it with put_many,
+    and loading a binary snapshot written by save.
+    :param sizes: Key counts to benchmark
+    :param function: Hash function of the maps
+    :return: List of result dicts, one per map and size
+    """
+    engines = {
+        'sc': hash_map_sc.HashMap,
+        'oa': hash_map_oa.HashMap,
+    }
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    results = []
+    for size in sizes:
+        pairs = [('str' + str(i), i) for i in range(size)]
+        for name, hash_map_cls in engines.items():
+            m = hash_map_cls(11, function)
+            m.put_many(pairs)
+            start = time.perf_counter()
+            m.save(path)
+            save_s = time.perf_counter() - start
+            saved = m.get_keys_and_values().to_list()
+            del m
+
+            gc.disable()
+            start = time.perf_counter()
+            m = hash_map_cls(11, function)
+            for key, value in saved:
+                m.put(key, value)
+            put_s = time.perf_counter() - start
+            del m
+            start = time.perf_counter()
+            hash_map_cls(11, function).put_many(saved)
+            put_many_s = time.perf_counter() - start
+            start = time.perf_counter()
+            hash_map_cls.load(path, function)
+            load_s = time.perf_counter() - start
+            gc.enable()
+
+            results.append({
+                'map': name,
+                'size': size,
+                'file_mb': round(os.path.getsize(path) / 2 ** 20, 1),
+                'save_s': round(save_s, 2),
+                'rebuild_put_s': round(put_s, 2),
+                'rebuild_put_many_s': round(put_many_s, 2),
+                'load_s': round(load_s, 2),
+            })
+    os.remove(path)
+    return results
+
+
+def _peak_rss_kb(run: callable) -> (object, int):
+    """
+    Call run and return its result with the growth of the peak resident set size it caused, in KiB. Linux only:
+    the peak is reset through /proc/self/clear_refs before the call.
+    """
+    def status(field: str) -> int:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith(field):
+                    return int(line.split()[1])
+
+    with open('/proc/self/clear_refs', 'w') as file:
+        file.write('5')
+    before = status('VmRSS:')
+    result = run()
+    return result, status('VmHWM:') - before
+
+
+def bench_scan_memory(size: int, function: callable = builtin_hash) -> list:
+    """
+    Scan every key/value pair of a map once through the items() generator and once through get_keys_and_values,
+    and report the peak RSS growth and time of each scan. The generator scan runs first, so memory freed by the
+    Dynamic Array scan cannot be reused by it.
+    :param size: Number of keys in the map
+    :param function: Hash function of the maps
+    :return: List of result dicts, one per map and scan
+    """
+    def scan_items(m) -> int:
+        total = 0
+        for _, value in m.items():
+            total += value
+        return total
+
+    def scan_array(m) -> int:
+        pairs = m.get_keys_and_values()
+        total = 0
+        for idx in range(pairs.length()):
+            total += pairs[idx][1]
+        return total
+
+    results = []
+    for name, hash_map_cls in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        #  Fill with put rather than put_many: a freed batch list would leave enough free memory behind to hide
+        #  the growth of the scans
+        m = hash_map_cls(11, function)
+        for i in range(size):
+            m.put('str' + str(i), i)
+        gc.collect()
+        for scan_name, scan in (('items()', scan_items), ('get_keys_and_values', scan_array)):
+            start = time.perf_counter()
+            _, peak_kb = _peak_rss_kb(lambda: scan(m))
+            elapsed = time.perf_counter() - start
+            results.append({'map': name, 'scan': scan_name, 'size': size, 'peak_rss_mb': round(peak_kb / 1024, 1),
+                            'scan_s': round(elapsed, 2)})
+    return results
+
+
+def bench_find_mode_stream(count: int, distinct: int = 10_000, k: int = 10, counters: int = 1000,
+                           skew: float = 1.1) -> list:
+    """
+    Find the most frequent keys of a Zipf-distributed stream with find_mode, with exact streaming counts and with
+    bounded-memory Space-Saving, and report throughput, peak traced memory and agreement with the exact top k.
+    All three count with hash_function_1, the hash find_mode is fixed to.
+    :param count: Length of the stream
+    :param distinct: Number of distinct keys the stream is drawn from
+    :param k: Number of most frequent keys compared
+    :param counters: Counters kept by Space-Saving
+    :param skew: Zipf exponent of the stream
+    :return: List of result dicts, one per method
+    """
+    stream = zipf_keys(count, distinct, skew)
+    exact = frequency_counting.find_mode_stream(iter(stream), k)
+    exact_keys = {exact[idx][0] for idx in range(exact.length())}
+    exact_counts = dict(frequency_counting.count_frequencies(stream).items())
+
+    methods = {
+        'find_mode': lambda: hash_map_sc.find_mode(DynamicArray(stream)),
+        'exact stream': lambda: frequency_counting.find_mode_stream(iter(stream), k),
+        f'space-saving({counters})': lambda: frequency_counting.find_mode_stream(iter(stream), k, counters),
+    }
+    results = []
+    for name, run in methods.items():
+        gc.collect()
+        start = time.perf_counter()
+        found = run()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        if name == 'find_mode':
+            #  find_mode reports the mode(s) only, so compare it on the top key
+            modes, frequency = found
+            found_keys = {modes[idx] for idx in range(modes.length())}
+            recall = len(found_keys & exact_keys) / len(found_keys)
+            max_error = abs(frequency - exact[0][1])
+        else:
+            found_keys = {found[idx][0] for idx in range(found.length())}
+            recall = len(found_keys & exact_keys) / k
+            max_error = max(found[idx][1] - exact_counts[found[idx][0]] for idx in range(found.length()))
+        results.append({
+            'method': name,
+            'items': count,
+            'distinct': distinct,
+            'items_per_s': round(count / elapsed),
+            'peak_mb': round(peak_bytes / 2 ** 20, 1),
+            f'top{k}_recall': round(recall, 2),
+            'max_count_error': max_error,
+        })
+    return results
+
+
+def bench_counting(count: int, distinct: int = 10_000, skew: float = 1.1, function: callable = fnv1a_hash) -> list:
+    """
+    Count a Zipf-distributed key stream with the contains_key / get / put pattern of find_mode and with the
+    single-probe increment, upsert and setdefault, and report throughput and hash calls per item.
+    :param count: Length of the stream
+    :param distinct: Number of distinct keys the stream is drawn from
+    :param skew: Zipf exponent of the stream
+    :param function: Hash function of the maps
+    :return: List of result dicts, one per map and pattern
+    """
+    def three_calls(m, keys) -> None:
+        for key in keys:
+            if m.contains_key(key):
+                m.put(key, m.get(key) + 1)
+            else:
+                m.put(key, 1)
+
+    def increment(m, keys) -> None:
+        for key in keys:
+            m.increment(key)
+
+    def upsert(m, keys) -> None:
+        add_one = (lambda value: value + 1)
+        for key in keys:
+            m.upsert(key, add_one, 1)
+
+    def setdefault(m, keys) -> None:
+        #  Counting through a mutable cell, the way a list-valued map is grown
+        for key in keys:
+            m.setdefault(key, [0])[0] += 1
+
+    stream = zipf_keys(count, distinct, skew)
+    patterns = {
+        'contains/get/put': three_calls,
+        'increment': increment,
+        'upsert': upsert,
+        'setdefault': setdefault,
+    }
+    results = []
+    for name, hash_map_cls in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        for pattern, run in patterns.items():
+            counting_function = _CountingHash(function)
+            m = hash_map_cls(11, counting_function)
+            gc.collect()
+            start = time.perf_counter()
+            run(m, stream)
+            elapsed = time.perf_counter() - start
+            results.append({
+                'map': name,
+                'pattern': pattern,
+                'items': count,
+                'items_per_s': round(count / elapsed),
+                'hashes_per_item': round(counting_function.calls / count, 2),
+            })
+    return results
+
+
+def bench_hash_cache(size: int, lookups: int = 100_000, cache_size: int = 1024, skew: float = 1.1) -> list:
+    """
+    Look up Zipf-distributed URL keys in maps whose hash function is used bare or wrapped in an LRU or CLOCK
+    CachedHash, and report the time per get and the cache hit rate.
+    :param size: Number of keys in each map
+    :param lookups: Number of timed gets
+    :param cache_size: Number of keys each cache holds
+    :param skew: Zipf exponent of the lookups
+    :return: List of result dicts, one per map, hash function and cache
+    """
+    keys = key_sets(size)['url']
+    stream = zipf_keys(lookups, size, skew, keys=keys)
+    results = []
+    for function_name in ('hash_function_1', 'hash_function_2', 'fnv1a'):
+        function = HASH_FUNCTIONS[function_name]
+        for name, hash_map_cls in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+            for policy in (None, 'lru', 'clock'):
+                cached = function if policy is None else CachedHash(function, cache_size, policy)
+                m = hash_map_cls(11, cached)
+                m.put_many([(key, idx) for idx, key in enumerate(keys)])
+                if policy is not None:
+                    #  Time the lookups only, starting from a cache filled by the inserts
+                    cached.hits = cached.misses = 0
+                results.append({
+                    'function': function_name,
+                    'map': name,
+                    'cache': 'none' if policy is None else f'{policy}({cache_size})',
+                    'get_ns': round(_time_per_op(m.get, stream)),
+                    'hit_rate': '-' if policy is None else round(cached.hit_rate(), 3),
+                })
+    return results
+
+
+class _ScanEvictCache:
+    """
+    Cache bolted onto a chaining HashMap the O(n) way: each value is stored with its last use time, and a full
+    cache scans every pair for the oldest one to evict.
+    """
+
+    def __init__(self, capacity: int, function: callable) -> None:
+        """Initialize an empty cache of the given capacity."""
+        self._capacity = capacity
+        self._map = hash_map_sc.HashMap(2 * capacity, function)
+        self._tick = 0
+
+    def get(self, key: str) -> object:
+        """Return the value cached for key, or None."""
+        self._tick += 1
+        pair = self._map.get(key)
+        if pair is None:
+            return None
+        pair[1] = self._tick
+        return pair[0]
+
+    def put(self, key: str, value: object) -> None:
+        """Cache value for key, evicting the least recently used pair if the cache is full."""
+        self._tick += 1
+        if self._map.get_size() >= self._capacity and not self._map.contains_key(key):
+            oldest, _ = min(self._map.items(), key=lambda item: item[1][1])
+            self._map.remove(oldest)
+        self._map.put(key, [value, self._tick])
+
+
+def cache_traces(count: int, distinct: int = 100_000, scan_every: int = 2_000, scan_length: int = 5_000,
+                 seed: int = 0) -> dict:
+    """
+    Build key traces for cache benchmarks: a Zipf(1.0) trace, and a scan-heavy one that interrupts the same Zipf
+    trace every scan_every keys with a sequential scan of scan_length keys that are never used again.
+    """
+    zipf = zipf_keys(count, distinct, 1.0, seed)
+    scan = []
+    for start in range(0, count, scan_every):
+        scan.extend(zipf[start:start + scan_every])
+        scan.extend('scan' + str(start + i) for i in range(scan_length))
+    return {'zipf': zipf, 'scan-heavy': scan[:count]}
+
+
+def bench_cache_policies(count: int, capacity: int = 1000, function: callable = fnv1a_hash) -> list:
+    """
+    Replay cache-aside traces (get, then put on a miss) against LRUCache, LFUCache and a cache that evicts by
+    scanning the map, and report the hit rate and operations per second.
+    :param count: Length of each trace
+    :param capacity: Entries each cache holds
+    :param function: Hash function of the cache indexes
+    :return: List of result dicts, one per trace and cache
+    """
+    caches = {
+        'lru': lambda: cache_map.LRUCache(capacity, function),
+        'lfu': lambda: cache_map.LFUCache(capacity, function),
+        'scan-evict lru': lambda: _ScanEvictCache(capacity, function),
+    }
+    results = []
+    for trace_name, trace in cache_traces(count).items():
+        for cache_name, make_cache in caches.items():
+            #  The scanning cache is O(capacity) per miss, so it only replays the start of the trace
+            keys = trace if cache_name != 'scan-evict lru' else trace[:count // 100]
+            cache = make_cache()
+            hits = 0
+            start = time.perf_counter()
+            for key in keys:
+                if cache.get(key) is None:
+                    cache.put(key, key)
+                else:
+                    hits += 1
+            elapsed = time.perf_counter() - start
+            results.append({
+                'trace': trace_name,
+                'cache': cache_name,
+                'capacity': capacity,
+                'ops': len(keys),
+                'hit_rate': round(hits / len(keys), 3),
+                'ops_per_s': round(len(keys) / elapsed),
+            })
+    return results
+
+
+def bench_stats_overhead(size: int, lookups: int = 100_000, function: callable = builtin_hash) -> list:
+    """
+    Time puts and gets on maps that never had stats enabled, that had them enabled and disabled again, and that
+    have them enabled, and report the stats of the last one.
+    :param size: Number of keys put into each map
+    :param lookups: Number of timed gets
+    :param function: Hash function of the maps
+    :return: List of result dicts, one per map and stats mode
+    """
+    keys = ['str' + str(i) for i in range(size)]
+    lookup_keys = random.Random(0).choices(keys, k=lookups)
+    results = []
+    for name, hash_map_cls in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        for mode in ('never enabled', 'disabled', 'enabled'):
+            m = hash_map_cls(11, function)
+            if mode != 'never enabled':
+                m.enable_stats()
+            if mode == 'disabled':
+                m.disable_stats()
+            gc.collect()
+            put_ns = _time_per_op(lambda key: m.put(key, 0), keys)
+            get_ns = _time_per_op(m.get, lookup_keys)
+            stats = m.get_stats() or {}
+            results.append({
+                'map': name,
+                'stats': mode,
+                'size': size,
+                'put_ns': round(put_ns),
+                'get_ns': round(get_ns),
+                'resizes': stats.get('resize_count', '-'),
+                'resize_ms': round(stats['resize_seconds'] * 1000, 1) if stats else '-',
+                'hashes_per_op': round(stats['hash_calls_per_op'], 2) if stats else '-',
+                'longest': stats.get('max_chain_length', stats.get('max_cluster_length', '-')),
+            })
+    return results
+
+
+def attack_keys(count: int, letters: str = 'abcdefghij') -> list:
+    """
+    Return count distinct anagrams of letters. hash_function_1 sums the character codes of a key, so all of them
+    collide, as keys sent by an attacker who knows the map's hash function would.
+    """
+    return [''.join(letters) for letters in itertools.islice(itertools.permutations(letters), count)]
+
+
+class _ChainOnlyMap(hash_map_sc.HashMap):
+    """
+    Chaining HashMap that never converts a long chain to a tree bucket, as the map did before treeification
+    """
+
+    def _treeify(self, chain, hash_val: int):
+        """Leave the chain as it is."""
+        return chain
+
+
+def bench_attack_replay(count: int) -> list:
+    """
+    Replay a hash-flooding attack, count colliding keys put and then looked up, against maps hashing with
+    hash_function_1 (with and without tree buckets for SC) and maps seeded per instance. The same number of
+    ordinary keys is replayed as a baseline.
+    :param count: Number of keys put and looked up
+    :return: List of result dicts, one per map and key set
+    """
+    maps = {
+        'sc chains': lambda: _ChainOnlyMap(11, hash_function_1),
+        'sc tree buckets': lambda: hash_map_sc.HashMap(11, hash_function_1),
+        'sc seeded': lambda: hash_map_sc.HashMap(11, hash_function_1, seed='random'),
+        'oa': lambda: hash_map_oa.HashMap(11, hash_function_1),
+        'oa seeded': lambda: hash_map_oa.HashMap(11, hash_function_1, seed='random'),
+    }
+    key_sets = {
+        'ordinary': ['key' + str(i) for i in range(count)],
+        'attack': attack_keys(count),
+    }
+    results = []
+    for keys_name, keys in key_sets.items():
+        lookup_keys = random.Random(0).sample(keys, len(keys))
+        for map_name, make_map in maps.items():
+            m = make_map()
+            gc.collect()
+            put_ns = _time_per_op(lambda key: m.put(key, 0), keys)
+            get_ns = _time_per_op(m.get, lookup_keys)
+
+            #  Longest chain for SC, longest probe sequence of a lookup for OA
+            m.enable_stats()
+            for key in lookup_keys:
+                m.get(key)
+            stats = m.get_stats()
+            results.append({
+                'keys': keys_name,
+                'map': map_name,
+                'size': count,
+                'put_ns': round(put_ns),
+                'get_ns': round(get_ns),
+                'longest': stats.get('max_chain_length') or max(stats['probe_lengths_hit']),
+            })
+    return results
+
+
+#  Engines the standard suite can run. Every one takes (capacity, function) and has put, get, remove and
+#  resize_table; add new engines here to include them in the suite.
+ENGINES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+    'oa-compact': hash_map_oa_compact.HashMap,
+    'rh': hash_map_rh.HashMap,
+    #  hash_function_1 and hash_function_2 leave too many keys on the same pair of cuckoo slots, so let it rehash
+    'cuckoo': lambda capacity, function: hash_map_cuckoo.HashMap(capacity, function, rehash=True),
+    'swiss': hash_map_swiss.HashMap,
+    'concurrent': hash_map_concurrent.HashMap,
+}
+
+
+def _timed(fn, args: list) -> list:
+    """
+    Call fn on every argument and return the latency of each call in nanoseconds.
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    for arg in args:
+        start = clock()
+        fn(arg)
+        samples.append(clock() - start)
+    return samples
+
+
+def _suite_workloads(hash_map_cls: type, function: callable, size: int, seed: int = 0) -> dict:
+    """
+    Return the workloads of the standard suite for one engine and hash function. Each workload is a callable that
+    builds its own map, runs untimed setup, and returns the latency in nanoseconds of every timed operation.
+    """
+    rng = random.Random(seed)
+    keys = ['str' + str(i) for i in range(size)]
+    absent = ['absent' + str(i) for i in range(size)]
+
+    def filled():
+        m = hash_map_cls(11, function)
+        for idx, key in enumerate(keys):
+            m.put(key, idx)
+        return m
+
+    def sequential_insert() -> list:
+        m = hash_map_cls(11, function)
+        return _timed(lambda key: m.put(key, 0), keys)
+
+    def lookup_hit() -> list:
+        return _timed(filled().get, rng.choices(keys, k=size))
+
+    def lookup_miss() -> list:
+        return _timed(filled().get, absent)
+
+    def zipf_read() -> list:
+        return _timed(filled().get, zipf_keys(size, size, 1.1, seed, keys=keys))
+
+    def delete_churn() -> list:
+        #  Remove a random key and insert a new one, keeping the size constant
+        m = filled()
+        live = list(keys)
+        ops = []
+        for i in range(size // 2):
+            idx = rng.randrange(size)
+            ops.append((live[idx], 'churn' + str(i)))
+            live[idx] = 'churn' + str(i)
+
+        def churn(op):
+            m.remove(op[0])
+            m.put(op[1], 0)
+        return _timed(churn, ops)
+
+    def resize_storm() -> list:
+        #  Rehash the whole table back and forth between two capacities; every sample is one full rehash
+        m = filled()
+        capacity = m.get_capacity()
+        return _timed(m.resize_table, [capacity * 4, capacity] * 5)
+
+    stream = zipf_keys(size, max(size // 10, 1), 1.1, seed)
+
+    def find_mode() -> list:
+        #  hash_map_sc.find_mode itself, which always counts in a chaining map with hash_function_1. Every sample is
+        #  one whole call.
+        return _timed(hash_map_sc.find_mode, [DynamicArray(stream)])
+
+    def mode_count() -> list:
+        #  Stand-in for find_mode on the engine under test: the same counting and scan, with increment where the
+        #  engine has it and a get and a put per key otherwise. Every sample counts the whole stream.
+        def run(items):
+            m = hash_map_cls(11, function)
+            if hasattr(m, 'increment'):
+                count = m.increment
+            else:
+                def count(key):
+                    m.put(key, (m.get(key) or 0) + 1)
+            for key in items:
+                count(key)
+            pairs = m.get_keys_and_values()
+            return max(pairs[idx][1] for idx in range(pairs.length()))
+        return _timed(run, [stream])
+
+    workloads = {
+        'sequential_insert': (sequential_insert, size),
+        'lookup_hit': (lookup_hit, size),
+        'lookup_miss': (lookup_miss, size),
+        'zipf_read': (zipf_read, size),
+        'delete_churn': (delete_churn, size // 2),
+        'resize_storm': (resize_storm, size * 10),
+    }
+    if hash_map_cls is hash_map_sc.HashMap and function is hash_function_1:
+        workloads['find_mode'] = (find_mode, size)
+    else:
+        workloads['mode_count'] = (mode_count, size)
+    return workloads
+
+
+def bench_suite(size: int, engines=('sc', 'oa'), functions=('hash_function_1', 'hash_function_2')) -> list:
+    """
+    Standard suite: run every workload on every engine with every hash function, and report throughput, latency
+    percentiles and peak RSS growth. Throughput counts the keys each workload processes per second of timed
+    work (a resize_storm sample rehashes every key, a find_mode or mode_count sample counts the whole stream).
+    :param size: Number of keys in every map
+    :param engines: Names from ENGINES
+    :param functions: Names from HASH_FUNCTIONS
+    :return: List of result dicts, one per engine, hash function and workload
+    """
+    results = []
+    for engine in engines:
+        for function_name in functions:
+            workloads = _suite_workloads(ENGINES[engine], HASH_FUNCTIONS[function_name], size)
+            for workload, (run, keys_processed) in workloads.items():
+                gc.collect()
+                try:
+                    samples, peak_kb = _peak_rss_kb(run)
+                except OSError:
+                    samples, peak_kb = run(), None
+                results.append({
+                    'engine': engine,
+                    'function': function_name,
+                    'workload': workload,
+                    'size': size,
+                    'ops_per_s': round(keys_processed / (sum(samples) / 1e9)),
+                    **_percentiles(samples),
+                    'peak_rss_mb': None if peak_kb is None else round(peak_kb / 1024, 1),
+                })
+    return results
+
+
+def _print_rows(rows: list) -> None:
+    """
+    Print a list of result dicts as an aligned table.
+    """
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = [max(len(str(col)), *(len(str(row[col])) for row in rows)) for col in columns]
+    print('  '.join(str(col).rjust(w) for col, w in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(str(row[col]).rjust(w) for col, w in zip(columns, widths)))
+
+
+def _sizes_up_to(max_keys: int) -> list:
+    """
+    Return powers of ten from 1e3 up to and including max_keys.
+    """
+    sizes, size = [], 1000
+    while size <= max_keys:
+        sizes.append(size)
+        size *= 10
+    return sizes
+
+
+#  hash_function_1 and hash_function_2 collide too often for quadratic probing to fill much larger maps in reasonable
+#  time, so benchmarks that also run them cap their size
+_WEAK_HASH_KEYS = 20_000
+
+BENCHMARKS = {
+    'suite': lambda args: bench_suite(args.suite_keys, args.engines.split(',')),
+    'sc-scaling': lambda args: bench_sc_lookup_scaling(_sizes_up_to(args.max_keys), args.lookups),
+    'resize-latency': lambda args: bench_resize_latency(args.max_keys),
+    'hash-functions': lambda args: bench_hash_functions(args.lookups),
+    'oa-probe-counts': lambda args: bench_oa_probe_counts(args.lookups),
+    'sc-chain-op-counts': lambda args: bench_sc_chain_op_counts(),
+    'oa-layouts': lambda args: bench_oa_layouts(args.max_keys),
+    'resize-cost': lambda args: bench_resize_cost(min(args.max_keys, 5_000_000)),
+    'batch-ops': lambda args: bench_batch_ops(args.lookups),
+    'batch-hashing': lambda args: bench_batch_hashing(args.lookups),
+    'probe-lengths': lambda args: bench_probe_lengths(args.lookups) + bench_probe_lengths(
+        min(args.lookups, _WEAK_HASH_KEYS), ('hash_function_1', 'hash_function_2')),
+    'oa-churn': lambda args: bench_oa_churn(args.lookups),
+    'lookup-tail-latency': lambda args: bench_lookup_tail_latency(args.lookups, args.lookups),
+    'oa-lookups': lambda args: (bench_open_addressing_lookups(args.lookups, args.lookups)
+                                + bench_open_addressing_lookups(min(args.lookups, _WEAK_HASH_KEYS), args.lookups,
+                                                                ('hash_function_1', 'hash_function_2'))),
+    'concurrent-stress': lambda args: bench_concurrent_stress(args.lookups),
+    'sharded-scaling': lambda args: bench_sharded_scaling(args.max_keys, args.lookups),
+    'shared-table': lambda args: bench_shared_table(args.lookups * 2, args.lookups),
+    'attack-replay': lambda args: bench_attack_replay(min(args.lookups, 5_000)),
+    'stats-overhead': lambda args: bench_stats_overhead(args.lookups, args.lookups),
+    'cache-policies': lambda args: bench_cache_policies(min(args.max_keys, 10 * args.lookups)),
+    'hash-cache': lambda args: bench_hash_cache(min(args.max_keys, 100_000), args.lookups),
+    'counting': lambda args: bench_counting(min(args.max_keys, 10 * args.lookups)),
+    'find-mode-stream': lambda args: bench_find_mode_stream(min(args.max_keys, args.lookups)),
+    'scan-memory': lambda args: bench_scan_memory(min(args.max_keys, 5_000_000)),
+    'snapshot-startup': lambda args: bench_snapshot_startup(
+        [size for size in (1_000_000, 2_000_000, 5_000_000, 10_000_000) if size <= args.max_keys] or [args.max_keys]),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='HashMap benchmarks')
+    parser.add_argument('benchmark', nargs='*', help=f"benchmarks to run, any of {sorted(BENCHMARKS)} (default: all)")
+    parser.add_argument('--max-keys', type=int, default=10 ** 7, help='largest map size to build')
+    parser.add_argument('--lookups', type=int, default=100_000, help='timed operations per measurement')
+    parser.add_argument('--suite-keys', type=int, default=20_000,
+                        help='keys per map in the suite; hash_function_1 makes larger maps very slow')
+    parser.add_argument('--engines', default='sc,oa', help=f"comma-separated engines for the suite, any of {sorted(ENGINES)}")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args()
+    for name in args.benchmark:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+    for engine in args.engines.split(','):
+        if engine not in ENGINES:
+            parser.error(f"unknown engine {engine!r}")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'args': vars(args),
+        'results': {},
+    }
+    for name in args.benchmark or sorted(BENCHMARKS):
+        rows = BENCHMARKS[name](args)
+        report['results'][name] = rows
+        if args.json != '-':
+            print(f"\n{name}")
+            print('-' * len(name))
+            _print_rows(rows)
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
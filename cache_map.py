@@ -0,0 +1,413 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Bounded LRU and LFU caches indexed by the chaining HashMap. Entries are linked into an intrusive
+#              doubly linked recency list (LRU) or into frequency buckets (LFU), so get, put and eviction are O(1).
+#              Entries can expire after a time to live, and a callback is told about every eviction.
+
+
+import time
+from abc import ABC, abstractmethod
+
+from a6_include import hash_function_1
+from hash_map_sc import HashMap
+
+
+class _Entry:
+    """
+    Cached key/value pair, linked into a circular list through a sentinel entry
+    """
+
+    __slots__ = ('key', 'value', 'expires', 'prev', 'next', 'bucket')
+
+    def __init__(self, key: str = None, value: object = None, expires: float = None) -> None:
+        """Initialize an entry linked to itself, which is how an empty list's sentinel looks."""
+        self.key = key
+        self.value = value
+        self.expires = expires
+        self.prev = self
+        self.next = self
+        self.bucket = None
+
+
+def _link_front(head: _Entry, entry: _Entry) -> None:
+    """Link entry right after the sentinel head, as the most recent entry of its list."""
+    entry.prev = head
+    entry.next = head.next
+    head.next.prev = entry
+    head.next = entry
+
+
+def _unlink(entry: _Entry) -> None:
+    """Unlink entry from its list."""
+    entry.prev.next = entry.next
+    entry.next.prev = entry.prev
+
+
+class _FrequencyBucket:
+    """
+    LFU bucket: the entries used count times, most recent first, in a list between a doubly linked chain of buckets
+    ordered by count
+    """
+
+    __slots__ = ('count', 'head', 'prev', 'next')
+
+    def __init__(self, count: int, prev: "_FrequencyBucket" = None, next: "_FrequencyBucket" = None) -> None:
+        """Initialize an empty bucket for the given count, linked between prev and next."""
+        self.count = count
+        self.head = _Entry()
+        self.prev = prev
+        self.next = next
+
+
+class _BoundedCache(ABC):
+    """
+    Shared part of LRUCache and LFUCache: the key index, expiry, the eviction callback and the hit counters.
+    Subclasses decide the order entries are evicted in.
+    """
+
+    def __init__(self, capacity: int, function: callable = hash_function_1, ttl: float = None,
+                 on_evict: callable = None, clock: callable = time.monotonic) -> None:
+        """
+        :param capacity: Maximum number of cached entries
+        :param function: Hash function of the key index
+        :param ttl: Seconds an entry stays valid after its put, or None for no expiry
+        :param on_evict: Called as on_evict(key, value, reason) when an entry is evicted, with reason 'capacity'
+                         when it makes room for a new key and 'expired' when it is found past its time to live.
+                         Entries removed with remove, pop or clear are not reported.
+        :param clock: Time source for expiry, in seconds
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self._capacity = capacity
+        self._ttl = ttl
+        self._on_evict = on_evict
+        self._clock = clock
+        self._index = HashMap(2 * capacity, function)
+        self.hits = 0
+        self.misses = 0
+
+    def get_size(self) -> int:
+        """
+        Return the number of cached entries, including expired ones not evicted yet
+        """
+        return self._index.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return the maximum number of cached entries
+        """
+        return self._capacity
+
+    def hit_rate(self) -> float:
+        """
+        Return the fraction of get calls that found a live entry, 0 before the first call
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    # ------------------------------------------------------------------ #
+
+    def _expired(self, entry: _Entry) -> bool:
+        """
+        Return True if entry is past its time to live.
+        """
+        return entry.expires is not None and entry.expires <= self._clock()
+
+    def _evict(self, entry: _Entry, reason: str) -> None:
+        """
+        Drop entry from the index and its list, then report it to the eviction callback.
+        """
+        self._index.remove(entry.key)
+        self._forget(entry)
+        if self._on_evict is not None:
+            self._on_evict(entry.key, entry.value, reason)
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Return the value cached for key and mark it used. Returns default if the key is not cached or has expired.
+        :param key: Key to be searched for
+        :param default: Value returned on a miss
+        :return:
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry.expires is not None and self._expired(entry):
+            self._evict(entry, 'expired')
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._touch(entry)
+        return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if a live entry is cached for key. Does not mark it used or count a hit or miss.
+        :param key: Key to be searched for
+        :return:
+        """
+        entry = self._index.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Cache value for key and mark it used. If the cache is full, the entry evicted first by the policy makes
+        room for a new key.
+        :param key: Key to be cached
+        :param value: Value to be cached
+        :param ttl: Time to live of this entry in seconds, overriding the cache's ttl
+        :return:
+        """
+        if ttl is None:
+            ttl = self._ttl
+        expires = None if ttl is None else self._clock() + ttl
+
+        #  setdefault finds or adds the key with a single hash
+        new_entry = _Entry(key, value, expires)
+        entry = self._index.setdefault(key, new_entry)
+        if entry is not new_entry:
+            entry.value = value
+            entry.expires = expires
+            self._touch(entry)
+            return
+
+        if self._index.get_size() > self._capacity:
+            self._evict(self._victim(), 'capacity')
+        self._admit(new_entry)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Remove key from the cache and return its value, or default if it is not cached or has expired.
+        :param key: Key to be removed
+        :param default: Value returned if the key is not cached
+        :return:
+        """
+        entry = self._index.pop(key)
+        if entry is None:
+            return default
+        self._forget(entry)
+        return default if self._expired(entry) else entry.value
+
+    def remove(self, key: str) -> None:
+        """
+        Remove key from the cache. If it is not cached, do nothing.
+        :param key: Key to be removed
+        :return:
+        """
+        self.pop(key)
+
+    def purge_expired(self) -> int:
+        """
+        Evict every expired entry. Expired entries are otherwise only evicted when looked up, or when their turn
+        comes under the eviction policy. O(n).
+        :return: Number of entries evicted
+        """
+        expired = [entry for _, entry in self._index.items() if self._expired(entry)]
+        for entry in expired:
+            self._evict(entry, 'expired')
+        return len(expired)
+
+    def keys(self):
+        """
+        Generator over the cached keys, in the order the policy would evict them last to first
+        """
+        for entry in self._entries():
+            yield entry.key
+
+    # ------------------------------------------------------------------ #
+    #  Eviction policy, implemented by the subclasses
+
+    @abstractmethod
+    def _admit(self, entry: _Entry) -> None:
+        """Link a newly cached entry."""
+
+    @abstractmethod
+    def _touch(self, entry: _Entry) -> None:
+        """Mark a cached entry used."""
+
+    @abstractmethod
+    def _forget(self, entry: _Entry) -> None:
+        """Unlink an entry dropped from the index."""
+
+    @abstractmethod
+    def _victim(self) -> _Entry:
+        """Return the entry to evict next."""
+
+    @abstractmethod
+    def _entries(self):
+        """Generator over the entries, the one evicted last first."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry without reporting it to the eviction callback."""
+
+
+class LRUCache(_BoundedCache):
+    """
+    Bounded cache evicting the least recently used entry. Entries sit in one recency list, most recent first.
+    """
+
+    def __init__(self, capacity: int, function: callable = hash_function_1, ttl: float = None,
+                 on_evict: callable = None, clock: callable = time.monotonic) -> None:
+        """
+        Initialize an empty LRU cache. See _BoundedCache for the parameters.
+        """
+        super().__init__(capacity, function, ttl, on_evict, clock)
+        self._head = _Entry()
+
+    def _admit(self, entry: _Entry) -> None:
+        """Link a new entry as the most recent."""
+        _link_front(self._head, entry)
+
+    def _touch(self, entry: _Entry) -> None:
+        """Move an entry to the front of the recency list."""
+        _unlink(entry)
+        _link_front(self._head, entry)
+
+    def _forget(self, entry: _Entry) -> None:
+        """Unlink an entry from the recency list."""
+        _unlink(entry)
+
+    def _victim(self) -> _Entry:
+        """Return the least recently used entry."""
+        return self._head.prev
+
+    def _entries(self):
+        """Generator over the entries, most recent first."""
+        entry = self._head.next
+        while entry is not self._head:
+            yield entry
+            entry = entry.next
+
+    def clear(self) -> None:
+        """Remove every entry without reporting it to the eviction callback."""
+        self._index.clear()
+        self._head = _Entry()
+
+
+class LFUCache(_BoundedCache):
+    """
+    Bounded cache evicting the least frequently used entry, and among those the least recently used one.
+    Entries sit in frequency buckets chained in count order, so using an entry moves it to the next bucket in O(1).
+    An entry's count starts over when it is evicted.
+    """
+
+    def __init__(self, capacity: int, function: callable = hash_function_1, ttl: float = None,
+                 on_evict: callable = None, clock: callable = time.monotonic) -> None:
+        """
+        Initialize an empty LFU cache. See _BoundedCache for the parameters.
+        """
+        super().__init__(capacity, function, ttl, on_evict, clock)
+        self._min_bucket = None
+        self._max_bucket = None
+
+    def _drop_if_empty(self, bucket: _FrequencyBucket) -> None:
+        """
+        Unlink bucket from the bucket chain if no entry is left in it.
+        """
+        if bucket.head.next is not bucket.head:
+            return
+        if bucket.prev is None:
+            self._min_bucket = bucket.next
+        else:
+            bucket.prev.next = bucket.next
+        if bucket.next is None:
+            self._max_bucket = bucket.prev
+        else:
+            bucket.next.prev = bucket.prev
+
+    def _admit(self, entry: _Entry) -> None:
+        """Put a new entry in the bucket for count 1, at the head of the bucket chain."""
+        bucket = self._min_bucket
+        if bucket is None or bucket.count != 1:
+            bucket = _FrequencyBucket(1, None, self._min_bucket)
+            if self._min_bucket is None:
+                self._max_bucket = bucket
+            else:
+                self._min_bucket.prev = bucket
+            self._min_bucket = bucket
+        entry.bucket = bucket
+        _link_front(bucket.head, entry)
+
+    def _touch(self, entry: _Entry) -> None:
+        """Move an entry to the bucket for one more use, creating it if needed."""
+        bucket = entry.bucket
+        next_bucket = bucket.next
+        if next_bucket is None or next_bucket.count != bucket.count + 1:
+            next_bucket = _FrequencyBucket(bucket.count + 1, bucket, bucket.next)
+            if bucket.next is None:
+                self._max_bucket = next_bucket
+            else:
+                bucket.next.prev = next_bucket
+            bucket.next = next_bucket
+
+        _unlink(entry)
+        _link_front(next_bucket.head, entry)
+        entry.bucket = next_bucket
+        self._drop_if_empty(bucket)
+
+    def _forget(self, entry: _Entry) -> None:
+        """Unlink an entry from its bucket."""
+        _unlink(entry)
+        self._drop_if_empty(entry.bucket)
+
+    def _victim(self) -> _Entry:
+        """Return the least recently used entry of the lowest count."""
+        return self._min_bucket.head.prev
+
+    def _entries(self):
+        """Generator over the entries, highest count first and most recent first within a count."""
+        bucket = self._max_bucket
+        while bucket is not None:
+            entry = bucket.head.next
+            while entry is not bucket.head:
+                yield entry
+                entry = entry.next
+            bucket = bucket.prev
+
+    def get_use_count(self, key: str) -> int:
+        """
+        Return the number of puts and get hits of the cached key since it was last added, 0 if it is not cached
+        """
+        entry = self._index.get(key)
+        return 0 if entry is None else entry.bucket.count
+
+    def clear(self) -> None:
+        """Remove every entry without reporting it to the eviction callback."""
+        self._index.clear()
+        self._min_bucket = None
+        self._max_bucket = None
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU and LFU eviction")
+    print("--------------------")
+    for cache_cls in (LRUCache, LFUCache):
+        evicted = []
+        cache = cache_cls(3, on_evict=lambda key, value, reason: evicted.append((key, reason)))
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key.upper())
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+        cache.put('d', 'D')
+        print(cache_cls.__name__, list(cache.keys()), evicted, round(cache.hit_rate(), 2))
+
+    print("\nTime to live")
+    print("------------")
+    now = [0.0]
+    cache = LRUCache(10, ttl=5, clock=lambda: now[0])
+    cache.put('short', 1, ttl=1)
+    cache.put('long', 2)
+    now[0] = 2.0
+    print(cache.get('short'), cache.get('long'), cache.get_size())
+    now[0] = 6.0
+    print(cache.purge_expired(), cache.get_size())
@@ -0,0 +1,228 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Streaming frequency counting on top of the chaining HashMap. Counts come from any iterable, one
+#              HashMap.increment per item, and the most frequent items are reported exactly or, in bounded memory,
+#              approximately with the Space-Saving algorithm.
+
+
+import heapq
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap
+
+
+def count_frequencies(items, function: callable = hash_function_1) -> HashMap:
+    """
+    Count how often every item of an iterable occurs. Each item is hashed once.
+    :param items: Any iterable of str items, consumed once
+    :param function: Hash function of the counting map
+    :return: HashMap from item to count
+    """
+    counts = HashMap(function=function)
+    increment = counts.increment
+    for item in items:
+        increment(item)
+    return counts
+
+
+def top_k(counts: HashMap, k: int) -> DynamicArray:
+    """
+    Return the k most frequent items of a counting map.
+    :param counts: HashMap from item to count, as returned by count_frequencies
+    :param k: Number of items to return
+    :return: Dynamic Array of (item, count) tuples, most frequent first
+    """
+    return DynamicArray(heapq.nlargest(k, counts.items(), key=lambda pair: pair[1]))
+
+
+class _CountBucket:
+    """
+    Node of the Space-Saving stream summary: the set of monitored items that share one count
+    """
+
+    __slots__ = ('count', 'items', 'prev', 'next')
+
+    def __init__(self, count: int, prev: "_CountBucket" = None, next: "_CountBucket" = None) -> None:
+        """Initialize an empty bucket for the given count, linked between prev and next."""
+        self.count = count
+        self.items = set()
+        self.prev = prev
+        self.next = next
+
+
+class _Counter:
+    """
+    A monitored item: its bucket (and so its count) and the overestimation it inherited when it was admitted
+    """
+
+    __slots__ = ('bucket', 'error')
+
+    def __init__(self, bucket: _CountBucket, error: int) -> None:
+        """Initialize the counter of an item placed in the given bucket."""
+        self.bucket = bucket
+        self.error = error
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally et al.): approximate counts for at most `capacity` distinct items.
+    Every item occurring more than n / capacity times in a stream of n items is monitored, and a monitored item's
+    count exceeds its true frequency by at most its recorded error. Monitored items are kept in a doubly linked list
+    of buckets ordered by count, so counting an item and evicting the least frequent one are both O(1).
+    """
+
+    def __init__(self, capacity: int, function: callable = hash_function_1) -> None:
+        """
+        :param capacity: Maximum number of items monitored at once
+        :param function: Hash function of the map from item to counter
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._capacity = capacity
+        self._counters = HashMap(2 * capacity, function)
+        self._min_bucket = None
+        self._max_bucket = None
+        self._total = 0
+
+    def get_capacity(self) -> int:
+        """
+        Return the maximum number of monitored items
+        """
+        return self._capacity
+
+    def get_size(self) -> int:
+        """
+        Return the number of monitored items
+        """
+        return self._counters.get_size()
+
+    def get_total(self) -> int:
+        """
+        Return the number of items counted so far
+        """
+        return self._total
+
+    def _move_up(self, item: str, counter: _Counter) -> None:
+        """
+        Move a monitored item from its bucket to the bucket for one more, creating that bucket if needed and
+        dropping the old one if it is left empty.
+        """
+        bucket = counter.bucket
+        next_bucket = bucket.next
+        if next_bucket is None or next_bucket.count != bucket.count + 1:
+            next_bucket = _CountBucket(bucket.count + 1, bucket, next_bucket)
+            if bucket.next is None:
+                self._max_bucket = next_bucket
+            else:
+                bucket.next.prev = next_bucket
+            bucket.next = next_bucket
+
+        bucket.items.discard(item)
+        next_bucket.items.add(item)
+        counter.bucket = next_bucket
+
+        if not bucket.items:
+            if bucket.prev is None:
+                self._min_bucket = next_bucket
+            else:
+                bucket.prev.next = next_bucket
+            next_bucket.prev = bucket.prev
+
+    def add(self, item: str) -> None:
+        """
+        Count one occurrence of item. If it is not monitored and all counters are taken, it replaces one of the
+        least frequent items and inherits that item's count as its error.
+        :param item: Item to be counted
+        :return:
+        """
+        self._total += 1
+        counter = self._counters.get(item)
+        if counter is not None:
+            self._move_up(item, counter)
+            return
+
+        if self._counters.get_size() < self._capacity:
+            #  Start at count 1, in the bucket for count 1 at the head of the list
+            head = self._min_bucket
+            if head is None or head.count != 1:
+                head = _CountBucket(1, None, head)
+                if self._min_bucket is None:
+                    self._max_bucket = head
+                else:
+                    self._min_bucket.prev = head
+                self._min_bucket = head
+            head.items.add(item)
+            self._counters.put(item, _Counter(head, 0))
+            return
+
+        #  Take over the counter of an item in the minimum bucket
+        head = self._min_bucket
+        victim = head.items.pop()
+        counter = self._counters.get(victim)
+        self._counters.remove(victim)
+        head.items.add(item)
+        counter.error = head.count
+        self._counters.put(item, counter)
+        self._move_up(item, counter)
+
+    def update(self, items) -> None:
+        """
+        Count every item of an iterable.
+        :param items: Any iterable of str items, consumed once
+        :return:
+        """
+        add = self.add
+        for item in items:
+            add(item)
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Return the k monitored items with the highest counts.
+        :param k: Number of items to return
+        :return: Dynamic Array of (item, count, error) tuples, highest count first. The true frequency of each item
+                 lies between count - error and count.
+        """
+        result = DynamicArray()
+        bucket = self._max_bucket
+        while bucket is not None and result.length() < k:
+            for item in bucket.items:
+                if result.length() == k:
+                    break
+                result.append((item, bucket.count, self._counters.get(item).error))
+            bucket = bucket.prev
+        return result
+
+
+def find_mode_stream(items, k: int = 1, counters: int = None, function: callable = hash_function_1) -> DynamicArray:
+    """
+    Return the k most frequent items of an iterable, reading it once. Unlike find_mode, the input does not have to
+    be a Dynamic Array and each item is hashed once.
+    :param items: Any iterable of str items
+    :param k: Number of items to return
+    :param counters: None counts every distinct item exactly. A number bounds memory to that many counters and
+                     uses Space-Saving, whose counts may overestimate; it should be well above k.
+    :param function: Hash function of the counting map
+    :return: Dynamic Array of (item, count) tuples, most frequent first
+    """
+    if counters is None:
+        return top_k(count_frequencies(items, function), k)
+
+    summary = SpaceSaving(counters, function)
+    summary.update(items)
+    approximate = summary.top_k(k)
+    return DynamicArray([approximate[idx][:2] for idx in range(approximate.length())])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nExact and approximate top 3")
+    print("---------------------------")
+    words = ("the quick brown fox jumps over the lazy dog the fox " * 50 + "rare words appear once").split()
+    print(find_mode_stream(iter(words), 3))
+    print(find_mode_stream(iter(words), 3, counters=6))
+
+    summary = SpaceSaving(4)
+    summary.update(words)
+    print(summary.get_total(), summary.get_size(), summary.top_k(2))
@@ -0,0 +1,114 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Batch hashing for bulk HashMap operations. When NumPy is installed, hash_function_1,
+#              hash_function_2 and fnv1a_hash are computed for a whole batch of keys at once; the results match
+#              the scalar functions bit for bit. Without NumPy, or for any other hash function, the scalar
+#              function is called once per key.
+
+
+from a6_include import hash_function_1, hash_function_2
+from hash_functions import FNV_OFFSET_BASIS_64, FNV_PRIME_64, fnv1a_hash
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+#  Keys are encoded in chunks so the padded matrices stay small
+_CHUNK_SIZE = 1 << 16
+
+#  hash_function_2 of a key this long can no longer overflow a signed 64-bit sum
+_MAX_KEY_LENGTH = 1 << 20
+
+
+def _code_point_matrix(keys: list):
+    """
+    Encode keys as a zero-padded matrix of Unicode code points, one row per key.
+    """
+    matrix = np.array(keys, dtype=np.str_)
+    width = matrix.dtype.itemsize // 4
+    return matrix.view(np.uint32).reshape(len(keys), width)
+
+
+def _utf8_matrix(keys: list):
+    """
+    Encode keys as a zero-padded matrix of UTF-8 bytes, one row per key, along with the byte length of each key.
+    """
+    encoded = [key.encode() for key in keys]
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+    width = int(lengths.max())
+    if width == 0:
+        return np.zeros((len(keys), 0), dtype=np.uint8), lengths
+    matrix = np.array(encoded, dtype=f'S{width}')
+    return matrix.view(np.uint8).reshape(len(keys), width), lengths
+
+
+def hash_function_1_batch(keys: list):
+    """Vectorized hash_function_1: sum of the code points of each key, as an int64 array"""
+    return _code_point_matrix(keys).sum(axis=1, dtype=np.int64)
+
+
+def hash_function_2_batch(keys: list):
+    """Vectorized hash_function_2: position-weighted sum of the code points of each key, as an int64 array"""
+    code_points = _code_point_matrix(keys)
+    weights = np.arange(1, code_points.shape[1] + 1, dtype=np.int64)
+    return code_points.astype(np.int64) @ weights
+
+
+def fnv1a_batch(keys: list):
+    """Vectorized fnv1a_hash, as a uint64 array. Rows are processed a byte column at a time."""
+    matrix, lengths = _utf8_matrix(keys)
+    hashes = np.full(len(keys), FNV_OFFSET_BASIS_64, dtype=np.uint64)
+    prime = np.uint64(FNV_PRIME_64)
+    for column in range(matrix.shape[1]):
+        mixed = (hashes ^ matrix[:, column]) * prime
+        np.copyto(hashes, mixed, where=lengths > column)
+    return hashes
+
+
+_BATCH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+    fnv1a_hash: fnv1a_batch,
+}
+
+
+def has_batch_path(function: callable) -> bool:
+    """Return True if hash_keys computes the given hash function with NumPy."""
+    return np is not None and function in _BATCH_FUNCTIONS
+
+
+def hash_keys(keys: list, function: callable) -> list:
+    """
+    Hash every key of a batch.
+    :param keys: List of keys
+    :param function: Hash function of the map
+    :return: List with function(key) for every key, as Python ints
+    """
+    if not keys or not has_batch_path(function):
+        return [function(key) for key in keys]
+    if not all(type(key) is str for key in keys) or max(map(len, keys)) > _MAX_KEY_LENGTH:
+        return [function(key) for key in keys]
+
+    batch_function = _BATCH_FUNCTIONS[function]
+    hashes = []
+    for start in range(0, len(keys), _CHUNK_SIZE):
+        hashes.extend(batch_function(keys[start:start + _CHUNK_SIZE]).tolist())
+    return hashes
+
+
+def bucket_indices(hashes: list, capacity: int) -> list:
+    """
+    Return hash % capacity for every hash of a batch.
+    :param hashes: List of hash values, as returned by hash_keys
+    :param capacity: Capacity of the table
+    :return: List of bucket indices
+    """
+    if np is None or not hashes:
+        return [hash_val % capacity for hash_val in hashes]
+    try:
+        array = np.array(hashes, dtype=np.uint64 if min(hashes) >= 0 else np.int64)
+    except OverflowError:
+        return [hash_val % capacity for hash_val in hashes]
+    return (array % capacity).tolist()
@@ -0,0 +1,252 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Well-mixed string hash functions for use with both HashMaps (SC & OA).
+#              Any callable that takes a str key and returns an int can be passed to a HashMap as `function`;
+#              the functions and classes below follow that interface.
+
+
+import os
+from collections import OrderedDict
+
+from a6_include import hash_function_1, hash_function_2
+
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+#  2^64 divided by the golden ratio, the multiplier of Fibonacci hashing
+_FIBONACCI_64 = 0x9E3779B97F4A7C15
+
+FNV_OFFSET_BASIS_64 = 0xCBF29CE484222325
+FNV_PRIME_64 = 0x100000001B3
+
+
+def fnv1a_hash(key: str) -> int:
+    """64-bit FNV-1a over the UTF-8 bytes of the key"""
+    hash = FNV_OFFSET_BASIS_64
+    for byte in key.encode():
+        hash = ((hash ^ byte) * FNV_PRIME_64) & _MASK_64
+    return hash
+
+
+def mix_hash(hash_val: int) -> int:
+    """
+    Scramble a hash value before a table reduces it to a slot. Hashes that differ in a few low bits, such as
+    hash_function_1 and hash_function_2 give similar keys, land in adjacent slots and merge into long probe runs;
+    Fibonacci hashing (a multiply by 2^64 / golden ratio) spreads them over all 64 bits, and folding the high half
+    into the low half makes the low bits as well mixed as the high ones. Equal hashes stay equal.
+    :return: Mixed 63-bit hash, so it fits a signed 64-bit array slot
+    """
+    hash_val = (hash_val * _FIBONACCI_64) & _MASK_64
+    return (hash_val ^ (hash_val >> 32)) >> 1
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's built-in str hash (SipHash in C). By far the fastest option, but it is seeded per process unless
+    PYTHONHASHSEED is set, so its values must not be persisted or shared between processes.
+    """
+    return hash(key)
+
+
+def _rotl(value: int, bits: int) -> int:
+    """Rotate a 64-bit value left by the given number of bits"""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> (int, int, int, int):
+    """Apply the given number of SipRounds to the internal state"""
+    for _ in range(rounds):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotl(v1, 13) ^ v0
+        v0 = _rotl(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotl(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotl(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotl(v1, 17) ^ v2
+        v2 = _rotl(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash24(k0: int, k1: int, data: bytes) -> int:
+    """
+    SipHash-2-4 of data under the 128-bit key (k0, k1), where k0 and k1 are the little-endian halves of the key.
+    :param k0: Low 64 bits of the key
+    :param k1: High 64 bits of the key
+    :param data: Message to be hashed
+    :return: 64-bit hash value
+    """
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    #  Compress every full 8-byte word, then the remaining bytes together with the message length
+    length = len(data)
+    end = length - (length & 7)
+    for offset in range(0, end, 8):
+        word = int.from_bytes(data[offset:offset + 8], 'little')
+        v3 ^= word
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= word
+    word = ((length & 0xFF) << 56) | int.from_bytes(data[end:], 'little')
+    v3 ^= word
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+    v0 ^= word
+
+    #  Finalization
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+class SipHash:
+    """
+    Seeded SipHash-2-4 over the UTF-8 bytes of the key. Instances are callable, so they can be passed to a HashMap
+    as its hash function. Maps built with different seeds place keys differently.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        """Initialize with a 128-bit seed. A random seed is drawn from the OS when none is given."""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(16), 'little')
+        self.seed = seed & ((1 << 128) - 1)
+        self._k0 = self.seed & _MASK_64
+        self._k1 = self.seed >> 64
+
+    def __call__(self, key: str) -> int:
+        """Return the hash of the key under this instance's seed."""
+        return siphash24(self._k0, self._k1, key.encode())
+
+    def __repr__(self) -> str:
+        """Override repr to show the seed."""
+        return f"SipHash(seed={self.seed:#x})"
+
+
+def seeded_hash(function: callable, seed) -> callable:
+    """
+    Return the hash function a HashMap uses for the given function and seed. Salting the input of a weak function
+    does not help, since keys that collide under it (anagrams, for hash_function_1) still collide with any salt
+    added, so a seeded map hashes with keyed SipHash instead of function.
+    :param function: Hash function passed to the map
+    :param seed: None for function itself, an int for SipHash keyed by it, or 'random' for SipHash keyed by a seed
+                 drawn from the OS
+    :return: Hash function of the map
+    """
+    if seed is None:
+        return function
+    if seed == 'random':
+        return SipHash()
+    if not isinstance(seed, int):
+        raise ValueError("seed must be None, an int or 'random'")
+    return SipHash(seed)
+
+
+class CachedHash:
+    """
+    Bounded memo cache in front of a hash function, for workloads where a few hot keys get most of the lookups.
+    Instances are callable, so they can be passed to a HashMap as its hash function. The cache holds at most size
+    keys and evicts with LRU, or with CLOCK (second chance), which does less work on a hit. The counters hits and
+    misses are public and can be reset with clear().
+    """
+
+    def __init__(self, function: callable, size: int = 1024, policy: str = 'lru') -> None:
+        """
+        Wrap a hash function.
+        :param function: Hash function whose values are cached
+        :param size: Maximum number of cached keys
+        :param policy: Eviction policy, 'lru' or 'clock'
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if policy not in ('lru', 'clock'):
+            raise ValueError("policy must be 'lru' or 'clock'")
+
+        self.function = function
+        self.size = size
+        self.policy = policy
+        self._clock = policy == 'clock'
+        self.clear()
+
+    def __call__(self, key: str) -> int:
+        """Return the hash of the key, from the cache if it holds the key."""
+        if self._clock:
+            return self._call_clock(key)
+
+        cache = self._cache
+        hash_val = cache.get(key)
+        if hash_val is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return hash_val
+
+        self.misses += 1
+        hash_val = cache[key] = self.function(key)
+        if len(cache) > self.size:
+            cache.popitem(last=False)
+        return hash_val
+
+    def _call_clock(self, key: str) -> int:
+        """
+        CLOCK lookup. A hit only sets the key's reference bit. A miss advances the hand around the slots, clearing
+        reference bits, until it finds an unreferenced slot to evict.
+        """
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._referenced[cached[1]] = 1
+            return cached[0]
+
+        self.misses += 1
+        hash_val = self.function(key)
+        slots, referenced = self._slots, self._referenced
+        if len(self._cache) < self.size:
+            slot = len(self._cache)
+        else:
+            slot = self._hand
+            while referenced[slot]:
+                referenced[slot] = 0
+                slot = (slot + 1) % self.size
+            del self._cache[slots[slot]]
+            self._hand = (slot + 1) % self.size
+        slots[slot] = key
+        referenced[slot] = 0
+        self._cache[key] = (hash_val, slot)
+        return hash_val
+
+    def __repr__(self) -> str:
+        """Override repr to show the wrapped function and the cache settings."""
+        name = getattr(self.function, '__name__', repr(self.function))
+        return f"CachedHash({name}, size={self.size}, policy={self.policy!r})"
+
+    def __len__(self) -> int:
+        """Return the number of cached keys."""
+        return len(self._cache)
+
+    def hit_rate(self) -> float:
+        """Return the fraction of calls answered from the cache, 0 before the first call."""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def clear(self) -> None:
+        """Empty the cache and reset the hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+        if self._clock:
+            self._cache = {}
+            self._slots = [None] * self.size
+            self._referenced = bytearray(self.size)
+            self._hand = 0
+        else:
+            self._cache = OrderedDict()
+
+
+# Named hash functions, for benchmarks and tools that select one by name
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': fnv1a_hash,
+    'siphash': SipHash(0),
+    'builtin': builtin_hash,
+}
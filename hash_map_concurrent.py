@@ -0,0 +1,309 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Thread-safe HashMap ADT Implemented Using Dynamic Array and Collision Resolution via Chaining, with
+#              Lock Striping. Writers lock only the stripe that owns their bucket; readers take no lock at all.
+
+
+import threading
+
+from a6_include import DynamicArray, LinkedList, hash_function_1, hash_function_2
+
+
+class HashMap:
+    def __init__(self, capacity: int = 11, function=hash_function_1, stripes: int = 16,
+                 max_load: float = 1.0) -> None:
+        """
+        Initialize new HashMap that uses
+        separate chaining for collision resolution and can be shared between threads.
+        Bucket i is guarded by lock i % stripes. The table is published as a single (buckets, capacity) tuple, and
+        chains only change by storing one fully built node or link at a time, so a reader sees a consistent chain
+        without locking. A resize takes every stripe, builds a new table out of copied nodes and publishes it.
+        :param capacity: Initial capacity, rounded up to a prime
+        :param function: Hash function used to map keys to buckets
+        :param stripes: Number of locks the buckets are spread over
+        :param max_load: Load factor above which put doubles the capacity
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        if max_load <= 0:
+            raise ValueError("max_load must be positive")
+
+        self._hash_function = function
+        self._max_load = max_load
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        #  Entry count kept per stripe so writers to different stripes never share a counter. Only the sum is
+        #  meaningful, since a resize moves entries between stripes without moving their counts.
+        self._counts = [0] * stripes
+        self._resize_count = 0
+        self._table = self._new_table(self._next_prime(capacity))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        buckets, capacity = self._table
+        out = ''
+        for i in range(capacity):
+            out += str(i) + ': ' + str(buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Writes in progress on other threads may or may not be counted.
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    def get_stripe_count(self) -> int:
+        """
+        Return the number of locks the buckets are spread over
+        """
+        return len(self._locks)
+
+    def get_resize_count(self) -> int:
+        """
+        Return the number of times the table has been rebuilt
+        """
+        return self._resize_count
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _new_table(capacity: int) -> tuple:
+        """
+        Return a (buckets, capacity) table of empty chains.
+        """
+        return DynamicArray([LinkedList() for _ in range(capacity)]), capacity
+
+    def _locked_bucket(self, hash_val: int) -> (tuple, LinkedList, int):
+        """
+        Acquire the stripe lock of the bucket for hash_val in the current table. If a resize published a new table
+        while waiting for the lock, release it and try again in the new table.
+        :param hash_val: Hash of the key
+        :return: tuple: The table, the bucket and the index of the stripe lock, which the caller must release
+        """
+        while True:
+            table = self._table
+            buckets, capacity = table
+            hash_idx = hash_val % capacity
+            stripe = hash_idx % len(self._locks)
+            self._locks[stripe].acquire()
+            if self._table is table:
+                return table, buckets[hash_idx], stripe
+            self._locks[stripe].release()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the key already exists in the hash map, its associated value
+        is replaced with the new value. If the key is not in the hash map, a new key/value pair must be added.
+        Double the capacity once the load factor exceeds max_load.
+        :param key: Key to be inserted into the hash table.
+        :param value: Value to be inserted into the hash table.
+        :return:
+        """
+        hash_val = self._hash_function(key)
+        table, bucket, stripe = self._locked_bucket(hash_val)
+        try:
+            node = bucket.contains(key, hash_val)
+            if node is not None:
+                node.value = value
+                return
+            bucket.insert(key, value, hash_val)
+            self._counts[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+        #  Grow outside the stripe lock. Only the first thread to see this table overloaded rebuilds it.
+        if self.get_size() > self._max_load * table[1]:
+            self._rebuild(2 * table[1], table)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist. Takes no lock.
+        :param key: Key to be searched for
+        :return:
+        """
+        hash_val = self._hash_function(key)
+        buckets, capacity = self._table
+        node = buckets[hash_val % capacity].contains(key, hash_val)
+        return None if node is None else node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise. Takes no lock.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        hash_val = self._hash_function(key)
+        buckets, capacity = self._table
+        return buckets[hash_val % capacity].contains(key, hash_val) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        hash_val = self._hash_function(key)
+        _, bucket, stripe = self._locked_bucket(hash_val)
+        try:
+            if bucket.remove(key, hash_val):
+                self._counts[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+    def _acquire_all(self) -> None:
+        """
+        Acquire every stripe lock, always in the same order. Writers hold at most one stripe at a time, so this
+        cannot deadlock with them.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _release_all(self) -> None:
+        """
+        Release every stripe lock.
+        """
+        for lock in self._locks:
+            lock.release()
+
+    def _rebuild(self, new_capacity: int, expected: tuple = None) -> None:
+        """
+        Take every stripe, copy all nodes into a new table with a prime capacity and publish it.
+        Readers still walking the old chains see them unchanged.
+        :param new_capacity: Baseline capacity for the new hash table
+        :param expected: Only rebuild if this is still the current table, so threads racing to grow the same table
+                         rebuild it once
+        :return:
+        """
+        self._acquire_all()
+        try:
+            if expected is not None and self._table is not expected:
+                return
+
+            if self._is_prime(new_capacity) is False:
+                new_capacity = self._next_prime(new_capacity)
+            old_buckets, old_capacity = self._table
+            new_buckets, _ = self._new_table(new_capacity)
+            for idx in range(old_capacity):
+                for node in old_buckets[idx]:
+                    new_buckets[node.hash % new_capacity].insert(node.key, node.value, node.hash)
+            self._table = new_buckets, new_capacity
+            self._resize_count += 1
+        finally:
+            self._release_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. All existing key/value pairs remain in the new hash map and
+        are rehashed from their cached hashes. If new_capacity is less than 1, do nothing. Other threads keep reading
+        the old table while the new one is built, and writers wait for it.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        if new_capacity < 1:
+            return
+        self._rebuild(new_capacity)
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: The load factor of the hash map
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the current table
+        :return:
+        """
+        buckets, capacity = self._table
+        return sum(1 for idx in range(capacity) if buckets[idx].length() == 0)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash table capacity.
+        :return:
+        """
+        self._acquire_all()
+        try:
+            self._table = self._new_table(self._table[1])
+            self._counts = [0] * len(self._locks)
+        finally:
+            self._release_all()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        Walks the current table without locking: pairs written or removed during the walk may or may not appear.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        buckets, capacity = self._table
+        return DynamicArray([(node.key, node.value) for idx in range(capacity) for node in buckets[idx]])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nThreaded puts and removes")
+    print("-------------------------")
+    m = HashMap(11, hash_function_2, stripes=4)
+
+    def worker(first: int) -> None:
+        for i in range(first, first + 2000):
+            m.put('str' + str(i), i)
+        for i in range(first, first + 2000, 2):
+            m.remove('str' + str(i))
+
+    threads = [threading.Thread(target=worker, args=(n * 2000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_capacity(), all(m.get('str' + str(i)) == i for i in range(1, 8000, 2)))
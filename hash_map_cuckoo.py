@@ -0,0 +1,493 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: HashMap ADT Implemented Using Two Tables and Collision Resolution via Cuckoo Hashing with a Stash.
+#              Same public API as hash_map_oa.HashMap. A key can only live in one slot of each table or in the
+#              stash, so a lookup reads at most two slots plus a stash of at most _STASH_SIZE entries.
+
+
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import SipHash, fnv1a_hash
+
+
+#  Entries that find no slot within the kick limit wait here until the next rebuild
+_STASH_SIZE = 4
+
+#  Hashes are reduced to 63 bits so they fit a signed 64-bit array slot
+_HASH_MASK = (1 << 63) - 1
+
+#  A rebuild that fails grows the tables while their load stays at least max_load / _MAX_GROWTH, then rehashes if
+#  the map was built with rehash=True
+_MAX_GROWTH = 4
+
+#  Rehashes with new seeds tried by one rebuild before it gives up
+_MAX_REHASHES = 8
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, function_2=fnv1a_hash, max_load: float = 0.45,
+                 rehash: bool = False) -> None:
+        """
+        Initialize new HashMap that uses
+        cuckoo hashing for collision resolution.
+        Slots [0, half) form the first table, indexed by function, and slots [half, 2 * half) the second table,
+        indexed by function_2. Slot i is described by _keys[i] (None if empty), _values[i], _hashes_1[i] and
+        _hashes_2[i]; both hashes are cached so displaced entries move without rehashing.
+        :param capacity: Initial total capacity of both tables; each table gets a prime capacity of about half
+        :param function: Hash function used to index the first table
+        :param function_2: Hash function used to index the second table. It must be independent of function.
+        :param max_load: Load factor above which put doubles the capacity
+        :param rehash: If the two functions leave too many keys on the same pair of slots (weak functions such as
+                       hash_function_1 do), True lets the map replace both with seeded SipHash, see _rebuild.
+                       With False, the default, the map keeps the given functions and such a put raises.
+        """
+        if function_2 is function:
+            raise ValueError("function_2 must differ from function")
+        if not 0 < max_load < 0.5:
+            raise ValueError("max_load must be between 0 and 0.5")
+
+        self._hash_function = function
+        self._hash_function_2 = function_2
+        self._max_load = max_load
+        self._may_rehash = rehash
+        self._size = 0
+        self._rehash_count = 0
+        self._allocate(self._next_prime(max(capacity // 2, 2)))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._keys[i] is None:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]}\n"
+        for key, value, _, _ in self._stash:
+            out += f"stash: K: {key} V: {value}\n"
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map (slots in both tables, not counting the stash)
+        """
+        return self._capacity
+
+    def get_max_load(self) -> float:
+        """
+        Return the load factor above which put grows the tables
+        """
+        return self._max_load
+
+    def get_stash_size(self) -> int:
+        """
+        Return the number of entries waiting in the stash
+        """
+        return len(self._stash)
+
+    def get_rehash_count(self) -> int:
+        """
+        Return the number of times the map switched to new seeded hash functions because entries found no slot
+        """
+        return self._rehash_count
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, half: int) -> None:
+        """
+        Replace both tables and the stash with empty ones, each table holding half slots.
+        :param half: Prime capacity of each table
+        :return:
+        """
+        self._set_tables((half, [None] * (2 * half), [None] * (2 * half), array('q', bytes(16 * half)),
+                          array('q', bytes(16 * half)), []))
+
+    def _get_tables(self) -> tuple:
+        """
+        Return the tables and the stash as a tuple that _set_tables accepts.
+        """
+        return self._half, self._keys, self._values, self._hashes_1, self._hashes_2, self._stash
+
+    def _set_tables(self, tables: tuple) -> None:
+        """
+        Make the map use the given tables and stash, as returned by _get_tables.
+        :param tables: (half, keys, values, hashes_1, hashes_2, stash) tuple
+        :return:
+        """
+        half, self._keys, self._values, self._hashes_1, self._hashes_2, self._stash = tables
+        self._half = half
+        self._capacity = 2 * half
+
+        #  Long displacement chains mean a cycle; give up after a few times log2 of the table size
+        self._max_kicks = 3 * half.bit_length() + 8
+
+    def _entries(self) -> list:
+        """
+        Return every entry in the tables and the stash as (key, value, hash_1, hash_2) tuples.
+        """
+        keys, values, hashes_1, hashes_2 = self._keys, self._values, self._hashes_1, self._hashes_2
+        entries = [(keys[idx], values[idx], hashes_1[idx], hashes_2[idx])
+                   for idx in range(self._capacity) if keys[idx] is not None]
+        return entries + self._stash
+
+    def _find(self, key: str, hash_1: int) -> int:
+        """
+        Return the slot holding key, -1 if it is not in either table. Stash entries are not searched.
+        The second hash is only computed when the first table's slot does not match.
+        :param key: Key to be searched for
+        :param hash_1: Masked first hash of the key
+        :return: Index of the slot holding key, or -1
+        """
+        keys = self._keys
+        hash_idx = hash_1 % self._half
+        if self._hashes_1[hash_idx] == hash_1 and keys[hash_idx] == key:
+            return hash_idx
+
+        hash_2 = self._hash_function_2(key) & _HASH_MASK
+        hash_idx = self._half + hash_2 % self._half
+        if self._hashes_2[hash_idx] == hash_2 and keys[hash_idx] == key:
+            return hash_idx
+        return -1
+
+    def _find_stashed(self, key: str) -> int:
+        """
+        Return the stash position of key, or -1.
+        """
+        for pos, entry in enumerate(self._stash):
+            if entry[0] == key:
+                return pos
+        return -1
+
+    def _place(self, key: str, value: object, hash_1: int, hash_2: int) -> tuple:
+        """
+        Insert an entry known not to be in the map. If both of its slots are taken, it evicts the entry in its first
+        table slot, which moves to its slot in the other table, and so on. An entry still homeless after _max_kicks
+        moves goes to the stash.
+        :param key: Key to be inserted
+        :param value: Value to be inserted
+        :param hash_1: Masked first hash of the key
+        :param hash_2: Masked second hash of the key
+        :return: None on success. If the stash is full, the homeless entry and the slot it was heading for as a
+                 (key, value, hash_1, hash_2, hash_idx) tuple, which _unplace takes to undo the call.
+        """
+        keys, values, hashes_1, hashes_2 = self._keys, self._values, self._hashes_1, self._hashes_2
+        half = self._half
+
+        #  Take a free slot in the second table rather than start a chain of evictions
+        hash_idx = hash_1 % half
+        if keys[hash_idx] is not None:
+            other_idx = half + hash_2 % half
+            if keys[other_idx] is None:
+                hash_idx = other_idx
+
+        for _ in range(self._max_kicks):
+            if keys[hash_idx] is None:
+                keys[hash_idx], values[hash_idx], hashes_1[hash_idx], hashes_2[hash_idx] = key, value, hash_1, hash_2
+                return None
+
+            #  Swap the carried entry into the slot and carry the evicted one to its slot in the other table
+            keys[hash_idx], key = key, keys[hash_idx]
+            values[hash_idx], value = value, values[hash_idx]
+            hashes_1[hash_idx], hash_1 = hash_1, hashes_1[hash_idx]
+            hashes_2[hash_idx], hash_2 = hash_2, hashes_2[hash_idx]
+            hash_idx = half + hash_2 % half if hash_idx < half else hash_1 % half
+
+        if len(self._stash) < _STASH_SIZE:
+            self._stash.append((key, value, hash_1, hash_2))
+            return None
+        return key, value, hash_1, hash_2, hash_idx
+
+    def _unplace(self, homeless: tuple) -> None:
+        """
+        Undo the _place call that returned homeless, leaving the tables as they were before it. The evictions are
+        replayed backwards: the carried entry goes back to the slot it was evicted from, its other slot relative to
+        the one it was heading for, and carries out the entry that evicted it.
+        :param homeless: (key, value, hash_1, hash_2, hash_idx) tuple returned by _place
+        :return:
+        """
+        keys, values, hashes_1, hashes_2 = self._keys, self._values, self._hashes_1, self._hashes_2
+        half = self._half
+        key, value, hash_1, hash_2, hash_idx = homeless
+        for _ in range(self._max_kicks):
+            hash_idx = half + hash_2 % half if hash_idx < half else hash_1 % half
+            keys[hash_idx], key = key, keys[hash_idx]
+            values[hash_idx], value = value, values[hash_idx]
+            hashes_1[hash_idx], hash_1 = hash_1, hashes_1[hash_idx]
+            hashes_2[hash_idx], hash_2 = hash_2, hashes_2[hash_idx]
+
+    def _fill(self, half: int, entries: list) -> bool:
+        """
+        Allocate tables of half slots each and place every entry. Return False if an entry found no slot.
+        """
+        self._allocate(half)
+        for entry in entries:
+            if self._place(*entry) is not None:
+                return False
+        return True
+
+    @staticmethod
+    def _rehash(entries: list, function, function_2) -> list:
+        """
+        Return the entries with their hashes under the given functions.
+        """
+        return [(key, value, function(key) & _HASH_MASK, function_2(key) & _HASH_MASK)
+                for key, value, _, _ in entries]
+
+    def _rebuild(self, capacity: int, entries: list) -> None:
+        """
+        Place every entry into new tables with about the given total capacity, or more if needed to keep the load
+        factor at most max_load. If an entry finds no slot, the tables are doubled while their load stays at least
+        max_load / _MAX_GROWTH. Growing does not help keys whose hash pairs collide in bulk, so after that a map
+        built with rehash=True tries new seeded SipHash functions, up to _MAX_REHASHES times, and keeps the first
+        pair that places every entry. If no attempt succeeds, the old tables and hash functions are put back and
+        RuntimeError is raised.
+        :param capacity: Baseline total capacity for the new tables
+        :param entries: (key, value, hash_1, hash_2) tuples to be placed
+        :return:
+        """
+        old_tables = self._get_tables()
+        half = self._next_prime(max(capacity // 2, 2))
+        while len(entries) / (2 * half) > self._max_load:
+            half = self._next_prime(half + 1)
+
+        max_half = max(half, int(_MAX_GROWTH * len(entries) / (2 * self._max_load)))
+        while not self._fill(half, entries):
+            if 2 * half > max_half:
+                break
+            half = self._next_prime(2 * half)
+        else:
+            return
+
+        for _ in range(_MAX_REHASHES if self._may_rehash else 0):
+            function, function_2 = SipHash(), SipHash()
+            if self._fill(half, self._rehash(entries, function, function_2)):
+                self._hash_function, self._hash_function_2 = function, function_2
+                self._rehash_count += 1
+                return
+
+        self._set_tables(old_tables)
+        if self._may_rehash:
+            raise RuntimeError(f"cuckoo rebuild failed to place {len(entries)} entries after {_MAX_REHASHES} rehashes")
+        raise RuntimeError(f"cuckoo rebuild failed to place {len(entries)} entries; "
+                           "use a stronger hash function or rehash=True")
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the key already exists in the hash map, its associated value
+        is replaced with the new value. If the key is not in the hash map, a new key/value pair must be added.
+        Resize the tables to double the current capacity if the load factor would exceed max_load. If the new entry
+        leaves an entry without a slot while the stash is full, rebuild the tables, see _rebuild.
+        :param key: Key to be inserted into the hash table.
+        :param value: Value to be inserted into the hash table.
+        :return:
+        """
+        hash_1 = self._hash_function(key) & _HASH_MASK
+        hash_idx = self._find(key, hash_1)
+        if hash_idx >= 0:
+            self._values[hash_idx] = value
+            return
+        if self._stash:
+            pos = self._find_stashed(key)
+            if pos >= 0:
+                self._stash[pos] = (key, value) + self._stash[pos][2:]
+                return
+
+        hash_2 = self._hash_function_2(key) & _HASH_MASK
+        if (self._size + 1) / self._capacity > self._max_load:
+            self._rebuild(2 * self._capacity, self._entries() + [(key, value, hash_1, hash_2)])
+        else:
+            homeless = self._place(key, value, hash_1, hash_2)
+            if homeless is not None:
+                try:
+                    self._rebuild(self._capacity, self._entries() + [homeless[:4]])
+                except RuntimeError:
+                    self._unplace(homeless)
+                    raise
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: self._size / self._capacity: The load factor of the hash map
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty slots in both tables
+        :return:
+        """
+        return self._keys.count(None)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the total capacity of the tables. Every entry is placed again from its cached hashes. If the argument
+        new_capacity is less than the number of elements in the hash table, do nothing. If new_capacity is valid,
+        each table gets a prime capacity, large enough to keep the load factor at or below max_load.
+        :param new_capacity: Baseline total capacity for the new tables
+        :return:
+        """
+        if new_capacity < self._size:
+            return
+        self._rebuild(new_capacity, self._entries())
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist.
+        :param key: Key to be searched for
+        :return:
+        """
+        if self._size == 0:
+            return None
+        hash_idx = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if hash_idx >= 0:
+            return self._values[hash_idx]
+        if self._stash:
+            pos = self._find_stashed(key)
+            if pos >= 0:
+                return self._stash[pos][1]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        if self._size == 0:
+            return False
+        if self._find(key, self._hash_function(key) & _HASH_MASK) >= 0:
+            return True
+        return bool(self._stash) and self._find_stashed(key) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        A slot freed in the tables is offered to the stash entries, so the stash drains as the map shrinks.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        if self._size == 0:
+            return
+        hash_idx = self._find(key, self._hash_function(key) & _HASH_MASK)
+        if hash_idx >= 0:
+            self._keys[hash_idx] = self._values[hash_idx] = None
+        else:
+            pos = self._find_stashed(key) if self._stash else -1
+            if pos < 0:
+                return
+            del self._stash[pos]
+        self._size -= 1
+
+        #  Move back the first stash entry whose slot in either table is now free
+        if self._stash and hash_idx >= 0:
+            for pos, (_, _, hash_1, hash_2) in enumerate(self._stash):
+                if hash_1 % self._half == hash_idx or self._half + hash_2 % self._half == hash_idx:
+                    key, value, _, _ = self._stash.pop(pos)
+                    self._keys[hash_idx], self._values[hash_idx] = key, value
+                    self._hashes_1[hash_idx], self._hashes_2[hash_idx] = hash_1, hash_2
+                    break
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash table capacity.
+        :return:
+        """
+        self._allocate(self._half)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        return DynamicArray([(key, value) for key, value, _, _ in self._entries()])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
@@ -6,17 +6,40 @@
 # Description: HashMap ADT Implemented Using Dynamic Array and Collision Resolution via Chaining
 
 
+import time
+
 from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from hash_batch import hash_keys
+from hash_functions import seeded_hash
+from hash_map_stats import HashCallCounter, MapStats, counting_operations, histogram, track_clusters
+from hash_snapshot import read_snapshot, write_snapshot
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, incremental_step: int = 0, compact_load: float = 0.75,
+                 seed=None) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param capacity: Initial capacity, rounded up to a prime
+        :param function: Hash function used to map keys to slots
+        :param incremental_step: Old slots migrated per operation while a put-triggered resize is in progress.
+                                 0 rehashes the whole table inside the put that triggered the resize.
+                                 A step below about 2 may not drain the old table before the next resize or
+                                 compaction, which then finishes the migration in one pass and loses the bounded
+                                 per-operation latency.
+        :param compact_load: Fraction of slots holding live entries or tombstones above which put rehashes the
+                             table at its current capacity to clear the tombstones. 1.0 disables compaction.
+        :param seed: None hashes keys with function. An int, or 'random' for a seed drawn from the OS, hashes them
+                     with SipHash keyed by the seed instead. Keys crafted to collide under function would otherwise
+                     share one probe sequence and make every probe for them scan the whole cluster.
         """
+        if not 0.5 < compact_load <= 1:
+            raise ValueError("compact_load must be greater than 0.5 and at most 1")
+        if incremental_step < 0:
+            raise ValueError("incremental_step must not be negative")
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
@@ -24,9 +47,24 @@ class HashMap:
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        self._hash_function = function
+        self._hash_function = seeded_hash(function, seed)
+        self._seed = self._hash_function.seed if seed is not None else None
         self._size = 0
 
+        #  Tombstones in _buckets. They still occupy slots, so probes walk through them until a compaction.
+        self._tombstones = 0
+        self._compact_load = compact_load
+        self._compaction_count = 0
+
+        #  Bumped whenever a key is added or removed or the table is rebuilt, so iterators can detect it
+        self._mod_count = 0
+
+        #  Table being drained by an incremental resize. Slots below _migrate_idx have been moved already.
+        self._incremental_step = incremental_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_idx = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -84,6 +122,36 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstone_count(self) -> int:
+        """
+        Return the number of tombstones in the hash table
+        """
+        return self._tombstones
+
+    def get_compact_load(self) -> float:
+        """
+        Return the fraction of used slots (live entries plus tombstones) above which put compacts the table
+        """
+        return self._compact_load
+
+    def get_compaction_count(self) -> int:
+        """
+        Return the number of same-capacity rehashes done to clear tombstones
+        """
+        return self._compaction_count
+
+    def get_seed(self) -> int:
+        """
+        Return the seed keys are hashed with, or None if the map hashes with the function it was given
+        """
+        return self._seed
+
+    def is_resizing(self) -> bool:
+        """
+        Return True while an incremental resize still has slots left to migrate
+        """
+        return self._old_buckets is not None
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -95,38 +163,126 @@ class HashMap:
         :param value: Value to be inserted into the hash table.
         :return:
         """
+        self._migrate(self._incremental_step)
+
         #  Use hash function to find hash index associated with key
         hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        init_hash_idx = hash_idx
-        quad_val = 0
 
-        #  If the key is found in the linked list, replace the value with the argument value
-        if self.contains_key(key) is True:
-            while self._buckets[hash_idx].key != key:
-                quad_val += 1
-                hash_idx = (init_hash_idx + quad_val ** 2) % self._capacity
-            self._buckets[hash_idx].value = value
+        #  If the key is found in the hash table, replace the value with the argument value
+        buckets, hash_idx, free_idx = self._find_slot(key, hash_val)
+        if buckets is not None:
+            buckets[hash_idx].value = value
+            return
+
+        self._insert_new(key, value, hash_val, free_idx)
+
+    def _find_slot(self, key: str, hash_val: int) -> (DynamicArray, int, int):
+        """
+        Walk the probe sequence of key once, remembering the first slot the key could be inserted into. While an
+        incremental resize is in progress, keys not found in the current table are looked up in the old one.
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key
+        :return: tuple: Table holding the live entry for key and its index, or (None, -1), and the index of the
+                 first free slot of the current table (or -1 if the probe sequence has none)
+        """
+        hash_idx, free_idx, _ = self._probe(self._buckets, self._capacity, key, hash_val)
+        if hash_idx >= 0:
+            return self._buckets, hash_idx, free_idx
+        if self._old_buckets is not None:
+            hash_idx, _, _ = self._probe(self._old_buckets, self._old_capacity, key, hash_val, self._migrate_idx)
+            if hash_idx >= 0:
+                return self._old_buckets, hash_idx, free_idx
+        return None, -1, free_idx
+
+    def _insert_new(self, key: str, value: object, hash_val: int, free_idx: int) -> None:
+        """
+        Add a key known not to be in the hash map at the free slot found by _find_slot, resizing or compacting the
+        table first if needed.
+        :param key: Key to be added
+        :param value: Value to be associated with key
+        :param hash_val: Hash of the key
+        :param free_idx: First free slot of the key's probe sequence in the current table, or -1
+        :return:
+        """
+        #  Resize the table before adding the element if load factor exceeds 0.5, or if the probe sequence has no
+        #  free slot left. The free slot found above belongs to the old table then, so probe the new one.
+        if self.table_load() >= 0.5 or free_idx < 0:
+            self._auto_resize(2 * self._capacity)
+            _, free_idx, _ = self._probe(self._buckets, self._capacity, key, hash_val)
+
+        #  Filling an empty slot adds a used slot. Rehash at the same capacity first if that would push live entries
+        #  plus tombstones past the compaction threshold.
+        elif self._buckets[free_idx] is None and \
+                (self._size + self._tombstones + 1) / self._capacity > self._compact_load:
+            self._compaction_count += 1
+            self._auto_resize(self._capacity)
+            _, free_idx, _ = self._probe(self._buckets, self._capacity, key, hash_val)
 
         #  Create new hash entry with the key/value pair and insert it to the first available spot if it does not exist
-        else:
-            #  Resize the table before adding the element if load factor exceeds 0.5
-            if self.table_load() >= 0.5:
-                self.resize_table(2 * self._capacity)
-                #  Recompute hash index associated with key if resize occurred
-                hash_val = self._hash_function(key)
-                hash_idx = hash_val % self._capacity
-                init_hash_idx = hash_idx
-
-            while self._buckets[hash_idx] is not None:
-                #  If the element is a tombstone, allow the program to override the element with a new hash entry
-                if self._buckets[hash_idx].is_tombstone is True:
-                    break
-                quad_val += 1
-                hash_idx = (init_hash_idx + quad_val ** 2) % self._capacity
-            new_entry = HashEntry(key, value)
-            self._buckets[hash_idx] = new_entry
-            self._size += 1
+        if self._buckets[free_idx] is not None:
+            self._tombstones -= 1
+        self._buckets[free_idx] = HashEntry(key, value, hash_val)
+        self._size += 1
+        self._mod_count += 1
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replace the value associated with key by fn(value), or add the key with value default if it is not in the
+        hash map. Hashes the key and walks its probe sequence once, unlike a contains_key / get / put sequence.
+        :param key: Key to be updated or added
+        :param fn: Function from the current value to the new one
+        :param default: Value of a newly added key
+        :return: The new value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        buckets, hash_idx, free_idx = self._find_slot(key, hash_val)
+        if buckets is not None:
+            entry = buckets[hash_idx]
+            entry.value = fn(entry.value)
+            return entry.value
+
+        self._insert_new(key, default, hash_val, free_idx)
+        return default
+
+    def increment(self, key: str, delta: int = 1) -> object:
+        """
+        Add delta to the value associated with key, or add the key with value delta if it is not in the hash map.
+        Hashes the key and walks its probe sequence once, unlike a contains_key / get / put sequence.
+        :param key: Key whose value is incremented
+        :param delta: Amount added to the value
+        :return: The new value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        buckets, hash_idx, free_idx = self._find_slot(key, hash_val)
+        if buckets is not None:
+            entry = buckets[hash_idx]
+            entry.value += delta
+            return entry.value
+
+        self._insert_new(key, delta, hash_val, free_idx)
+        return delta
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value associated with key. If the key is not in the hash map, add it with value default first.
+        Hashes the key and walks its probe sequence once.
+        :param key: Key to be searched for or added
+        :param default: Value of a newly added key
+        :return: The value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        buckets, hash_idx, free_idx = self._find_slot(key, hash_val)
+        if buckets is not None:
+            return buckets[hash_idx].value
+
+        self._insert_new(key, default, hash_val, free_idx)
+        return default
 
     def table_load(self) -> float:
         """
@@ -141,6 +297,7 @@ class HashMap:
         Return the number of empty addresses in the hash table
         :return:
         """
+        self._finish_resize()
         count = 0
         # Go through each value in the hash table and increment count if the hash entry is not a tombstone
         for idx in range(self._capacity):
@@ -162,35 +319,153 @@ class HashMap:
         if new_capacity < self._size:
             return
 
+        #  An explicit resize always rehashes everything before returning
+        self._begin_resize(new_capacity)
+        self._finish_resize()
+
+    def _auto_resize(self, new_capacity: int) -> None:
+        """
+        Resize triggered by put. Rehashes in one pass, or only starts the resize when the map was created with an
+        incremental_step, leaving the migration to the following operations.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        self._begin_resize(new_capacity)
+        if self._incremental_step == 0:
+            self._finish_resize()
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Allocate a new table with a prime capacity that keeps the load factor at or below 0.5 and keep the current
+        table aside as the migration source.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        #  Only one resize may be in progress at a time. If incremental_step was too small to drain the previous one,
+        #  the rest of it is migrated here in one pass.
+        self._finish_resize()
+
         #  Populate a new Dynamic Array with None values with prime valued capacity
-        new_buckets = DynamicArray()
         new_capacity = self._next_prime(new_capacity)
         load_factor = self._size / new_capacity
         while load_factor > 0.5:
             new_capacity = self._next_prime(new_capacity + 1)
             load_factor = self._size / new_capacity
-        for _ in range(new_capacity):
-            new_buckets.append(None)
-
-        #  Hash the values from the old Dynamic Array and insert the values to the new Dynamic Array
-        for idx in range(self._capacity):
-            quad_val = 0
-            current_entry = self._buckets[idx]
-            if current_entry is not None:
-                #  Only add non-tombstone entries to new Dynamic Array
-                if current_entry.is_tombstone is False:
-                    hash_val = self._hash_function(current_entry.key)
-                    hash_idx = (hash_val + quad_val ** 2) % new_capacity
-                    init_hash_idx = hash_idx
-                    #  Rehash until an empty spot is found
-                    while new_buckets[hash_idx] is not None:
-                        quad_val += 1
-                        hash_idx = (init_hash_idx + quad_val ** 2) % new_capacity
-                    new_buckets[hash_idx] = current_entry
+        new_buckets = DynamicArray([None] * new_capacity)
 
         #  Set buckets of the hash map to the new Dynamic Array and capacity to the new capacity
-        self._buckets = new_buckets
-        self._capacity = new_capacity
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._buckets, self._capacity = new_buckets, new_capacity
+        self._migrate_idx = 0
+        self._tombstones = 0
+        self._mod_count += 1
+
+    def _migrate(self, count: int) -> None:
+        """
+        Move the live entries of up to count old slots into the new table. Migrated slots are left in place so the
+        probe sequences through them stay intact; lookups skip every old slot below _migrate_idx instead.
+        :param count: Maximum number of old slots to migrate
+        :return:
+        """
+        if self._old_buckets is None:
+            return
+
+        #  Insert the entries from the old Dynamic Array to the new Dynamic Array using their cached hashes
+        stop = min(self._migrate_idx + count, self._old_capacity)
+        for idx in range(self._migrate_idx, stop):
+            current_entry = self._old_buckets[idx]
+            #  Only add non-tombstone entries to new Dynamic Array
+            if current_entry is not None and current_entry.is_tombstone is False:
+                if self._insert_entry(self._buckets, self._capacity, current_entry):
+                    self._tombstones -= 1
+        self._migrate_idx = stop
+
+        #  Release the old Dynamic Array once every slot has been moved
+        if stop == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress.
+        :return:
+        """
+        self._migrate(self._old_capacity)
+
+    @staticmethod
+    def _insert_entry(buckets: DynamicArray, capacity: int, entry: HashEntry) -> bool:
+        """
+        Place entry in the first empty or tombstone slot of its probe sequence in the given table.
+        :param buckets: Table to insert into
+        :param capacity: Capacity of that table
+        :param entry: Hash entry to be placed, with its key's hash cached
+        :return: bool: True if the entry replaced a tombstone
+        """
+        hash_idx = entry.hash % capacity
+        init_hash_idx = hash_idx
+        quad_val = 0
+
+        #  If the element is a tombstone, allow the program to override the element with a new hash entry
+        while buckets[hash_idx] is not None and buckets[hash_idx].is_tombstone is False:
+            quad_val += 1
+            hash_idx = (init_hash_idx + quad_val ** 2) % capacity
+        replaced_tombstone = buckets[hash_idx] is not None
+        buckets[hash_idx] = entry
+        return replaced_tombstone
+
+    @staticmethod
+    def _probe(buckets: DynamicArray, capacity: int, key: str, hash_val: int,
+               moved: int = 0) -> (int, int, int):
+        """
+        Walk the quadratic probe sequence for key once, reading each slot a single time. Cached hashes are compared
+        before keys.
+        :param buckets: Table to search
+        :param capacity: Capacity of that table
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key
+        :param moved: Slots below this index have been migrated away and never match
+        :return: tuple: Index of the live entry matching key (or -1), index of the first tombstone or empty slot
+                 the key could be inserted into (or -1 if the sequence has none), and the number of slots read
+        """
+        hash_idx = hash_val % capacity
+        init_hash_idx = hash_idx
+        quad_val = 0
+        free_idx = -1
+
+        #  Go through buckets in the hash table. Stop at the first empty slot or when the key matches a live entry.
+        #  Stop as well if the hash index circled back to its original position, preventing an infinite loop.
+        #  Otherwise, remember the first tombstone, update hash index and probe for the next entry.
+        while True:
+            current_entry = buckets[hash_idx]
+            if current_entry is None:
+                return -1, (hash_idx if free_idx < 0 else free_idx), quad_val + 1
+            if current_entry.is_tombstone is True or hash_idx < moved:
+                if free_idx < 0:
+                    free_idx = hash_idx
+            elif current_entry.hash == hash_val and current_entry.key == key:
+                return hash_idx, free_idx, quad_val + 1
+
+            quad_val += 1
+            hash_idx = (init_hash_idx + quad_val * quad_val) % capacity
+            if hash_idx == init_hash_idx:
+                return -1, free_idx, quad_val
+
+    def _locate(self, key: str, hash_val: int) -> (DynamicArray, int):
+        """
+        Find the live entry for key, looking in the table being drained by an incremental resize as well.
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key
+        :return: tuple: Table holding the entry and its index, or (None, -1) if the key is not in the hash map
+        """
+        hash_idx, _, _ = self._probe(self._buckets, self._capacity, key, hash_val)
+        if hash_idx >= 0:
+            return self._buckets, hash_idx
+
+        if self._old_buckets is not None:
+            hash_idx, _, _ = self._probe(self._old_buckets, self._old_capacity, key, hash_val, self._migrate_idx)
+            if hash_idx >= 0:
+                return self._old_buckets, hash_idx
+
+        return None, -1
 
     def get(self, key: str) -> object:
         """
@@ -201,17 +476,12 @@ class HashMap:
         #  Return None automatically if there are no values contained in the hash table
         if self._size == 0:
             return None
+        self._migrate(self._incremental_step)
 
         #  If the key exists in the hash table, return the value associated with the key
-        if self.contains_key(key) is True:
-            hash_val = self._hash_function(key)
-            hash_idx = hash_val % self._capacity
-            init_hash_idx = hash_idx
-            quad_val = 0
-            while self._buckets[hash_idx].key != key:
-                quad_val += 1
-                hash_idx = (init_hash_idx + quad_val ** 2) % self._capacity
-            return self._buckets[hash_idx].value
+        buckets, hash_idx = self._locate(key, self._hash_function(key))
+        if buckets is not None:
+            return buckets[hash_idx].value
 
         return None
 
@@ -224,25 +494,11 @@ class HashMap:
         #  Return False automatically if there are no values contained in the hash table
         if self._size == 0:
             return False
+        self._migrate(self._incremental_step)
 
         #  Find the hash entry in the hash table associated with the key
-        hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        init_hash_idx = hash_idx
-        quad_val = 0
-
-        #  Go through buckets in the hash table. Return True if the key matches and hash entry is not a tombstone.
-        #  Return False if the hash index circled back to its original position, preventing an infinite loop.
-        #  Otherwise, update hash index and probe for the next entry.
-        while self._buckets[hash_idx] is not None:
-            if self._buckets[hash_idx].key == key and self._buckets[hash_idx].is_tombstone is False:
-                return True
-            elif hash_idx == init_hash_idx and quad_val > 0:
-                return False
-            else:
-                quad_val += 1
-                hash_idx = (init_hash_idx + quad_val ** 2) % self._capacity
-        return False
+        buckets, _ = self._locate(key, self._hash_function(key))
+        return buckets is not None
 
     def remove(self, key: str) -> None:
         """
@@ -250,30 +506,48 @@ class HashMap:
         :param key:
         :return:
         """
-        if self._size == 0 or self.contains_key(key) is False:
-            return
+        self.pop(key)
 
-        #  Find the hash entry in the hash table associated with the key
-        hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        init_hash_idx = hash_idx
-        quad_val = 0
-        while self._buckets[hash_idx].key != key:
-            quad_val += 1
-            hash_idx = (init_hash_idx + quad_val ** 2) % self._capacity
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Remove the given key from the hash map and return its associated value. If the key is not in the hash map,
+        do nothing and return default. Hashes the key and walks its probe sequence once.
+        :param key: Key to be removed from the hash map
+        :param default: Value returned if the key is not in the hash map
+        :return: The value that was associated with key, or default
+        """
+        if self._size == 0:
+            return default
+        self._migrate(self._incremental_step)
 
-        #  Remove the element by setting its tombstone value to True
-        self._buckets[hash_idx].is_tombstone = True
+        #  Find the hash entry in the hash table associated with the key
+        buckets, hash_idx = self._locate(key, self._hash_function(key))
+        if buckets is None:
+            return default
+
+        #  Remove the element by setting its tombstone value to True. Tombstones left in a table being drained by an
+        #  incremental resize are dropped with it, so only those in the current table are counted.
+        entry = buckets[hash_idx]
+        entry.is_tombstone = True
         self._size -= 1
+        self._mod_count += 1
+        if buckets is self._buckets:
+            self._tombstones += 1
+        return entry.value
 
     def clear(self) -> None:
         """
         Clears the contents of the hash map without changing the underlying hash table capacity.
         :return:
         """
+        #  Drop any table left over from an incremental resize
+        self._old_buckets = None
+
         for idx in range(self._buckets.length()):
             self._buckets[idx] = None
         self._size = 0
+        self._tombstones = 0
+        self._mod_count += 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -283,6 +557,7 @@ class HashMap:
         #  Return an empty Dynamic Array if there are no values contained in the hash table
         if self._size == 0:
             return DynamicArray()
+        self._finish_resize()
 
         #  Create a new Dynamic Array
         key_value_da = DynamicArray()
@@ -297,6 +572,324 @@ class HashMap:
         #  Return the Dynamic Array
         return key_value_da
 
+    def _iter_entries(self):
+        """
+        Generator over the live hash entries, in slot order. Raises RuntimeError if the hash map gains or loses a
+        key, or is resized, while the generator is suspended. Updating the value of an existing key is allowed.
+        """
+        self._finish_resize()
+        mod_count = self._mod_count
+        buckets = self._buckets
+        for idx in range(self._capacity):
+            current_entry = buckets[idx]
+            if current_entry is not None and current_entry.is_tombstone is False:
+                yield current_entry
+                if self._mod_count != mod_count:
+                    raise RuntimeError("HashMap changed size during iteration")
+
+    def keys(self):
+        """
+        Return a generator over the keys of the hash map, read from the slots without building a Dynamic Array.
+        """
+        return (entry.key for entry in self._iter_entries())
+
+    def values(self):
+        """
+        Return a generator over the values of the hash map, read from the slots without building a Dynamic Array.
+        """
+        return (entry.value for entry in self._iter_entries())
+
+    def items(self):
+        """
+        Return a generator over the key/value tuples of the hash map, read from the slots without building a
+        Dynamic Array.
+        """
+        return ((entry.key, entry.value) for entry in self._iter_entries())
+
+    def __iter__(self):
+        """
+        Iterate over the keys of the hash map.
+        """
+        return self.keys()
+
+    # ------------------------------------------------------------------ #
+
+    def _bucket_view(self, batch_size: int):
+        """
+        Return the table as a plain list when the batch is large enough to pay for copying it, otherwise the
+        Dynamic Array itself. Both are indexed with [], but the list skips the bounds check on every access.
+        Slots written through a list view must be stored back with DynamicArray(view).
+        :param batch_size: Number of keys in the batch
+        :return: List or Dynamic Array sharing the hash entries
+        """
+        if batch_size * 8 >= self._capacity:
+            return self._buckets.to_list()
+        return self._buckets
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update every key/value pair of a batch. The table grows at most once for the whole batch, every hash
+        is computed before inserting, and the slots are indexed without bounds checks. A key that appears more than
+        once ends up with its last value.
+        :param pairs: Dynamic Array (or list) of key/value tuples
+        :return:
+        """
+        pairs = pairs.to_list() if isinstance(pairs, DynamicArray) else list(pairs)
+        if not pairs:
+            return
+        self._finish_resize()
+
+        #  Grow once so the load factor stays below 0.5 for the whole batch. With a prime capacity, a quadratic
+        #  probe sequence then always reaches a free slot.
+        needed = self._size + len(pairs)
+        if needed / self._capacity >= 0.5:
+            self.resize_table(2 * needed)
+        elif (needed + self._tombstones) / self._capacity > self._compact_load:
+            self._compaction_count += 1
+            self.resize_table(self._capacity)
+
+        capacity = self._capacity
+        hashes = hash_keys([key for key, _ in pairs], self._hash_function)
+        slots = self._bucket_view(len(pairs))
+
+        for (key, value), hash_val in zip(pairs, hashes):
+            hash_idx, free_idx, _ = self._probe(slots, capacity, key, hash_val)
+            if hash_idx >= 0:
+                slots[hash_idx].value = value
+            else:
+                if slots[free_idx] is not None:
+                    self._tombstones -= 1
+                slots[free_idx] = HashEntry(key, value, hash_val)
+                self._size += 1
+                self._mod_count += 1
+
+        if slots is not self._buckets:
+            self._buckets = DynamicArray(slots)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key of a batch. Hashes are computed up front for the whole batch.
+        :param keys: Dynamic Array (or list) of keys
+        :return: Dynamic Array with the value of each key in batch order, None for keys not in the hash map
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        results = [None] * len(keys)
+        if self._size == 0:
+            return DynamicArray(results)
+        self._finish_resize()
+
+        capacity = self._capacity
+        hashes = hash_keys(keys, self._hash_function)
+        slots = self._bucket_view(len(keys))
+
+        for idx, hash_val in enumerate(hashes):
+            hash_idx, _, _ = self._probe(slots, capacity, keys[idx], hash_val)
+            if hash_idx >= 0:
+                results[idx] = slots[hash_idx].value
+        return DynamicArray(results)
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every key of a batch that is in the hash map.
+        :param keys: Dynamic Array (or list) of keys
+        :return:
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        if self._size == 0 or not keys:
+            return
+        self._finish_resize()
+
+        capacity = self._capacity
+        hashes = hash_keys(keys, self._hash_function)
+        slots = self._bucket_view(len(keys))
+
+        #  Tombstones are set on the shared hash entries, so a list view needs no write back
+        for key, hash_val in zip(keys, hashes):
+            hash_idx, _, _ = self._probe(slots, capacity, key, hash_val)
+            if hash_idx >= 0:
+                slots[hash_idx].is_tombstone = True
+                self._size -= 1
+                self._tombstones += 1
+                self._mod_count += 1
+
+    # ------------------------------------------------------------------ #
+
+    def save(self, path: str) -> None:
+        """
+        Write the hash map to a binary snapshot file. The file keeps the slot of every entry and tombstone and the
+        cached hash of every key, so load can rebuild the table without calling the hash function or probing.
+        Values must be plain data (see hash_snapshot), or load will refuse the file.
+        :param path: File to write
+        :return:
+        """
+        self._finish_resize()
+        slots, tombstones, hashes, keys, values = [], [], [], [], []
+        for idx in range(self._capacity):
+            current_entry = self._buckets[idx]
+            if current_entry is None:
+                continue
+            if current_entry.is_tombstone is True:
+                tombstones.append(idx)
+            else:
+                slots.append(idx)
+                hashes.append(current_entry.hash)
+                keys.append(current_entry.key)
+                values.append(current_entry.value)
+
+        write_snapshot(path, 'oa', self._hash_function, {
+            'capacity': self._capacity,
+            'incremental_step': self._incremental_step,
+            'compact_load': self._compact_load,
+            'slots': slots,
+            'tombstones': tombstones,
+            'hashes': hashes,
+            'keys': keys,
+            'values': values,
+        })
+
+    @classmethod
+    def load(cls, path: str, function: callable = hash_function_1, seed=None) -> "HashMap":
+        """
+        Read a hash map written by save. If the snapshot was written with the same hash function, every entry goes
+        straight back into its saved slot. Otherwise the pairs are inserted again with put_many.
+        :param path: File written by save
+        :param function: Hash function of the loaded map
+        :param seed: Seed of the loaded map, see __init__. The seed is not saved, so a seeded map is rebuilt as
+                     saved only when loaded with the same int seed.
+        :return: New hash map with the saved key/value pairs
+        """
+        payload, same_function = read_snapshot(path, 'oa', seeded_hash(function, seed))
+        if not same_function:
+            m = cls(11, function, payload['incremental_step'], payload['compact_load'], seed)
+            m.put_many(zip(payload['keys'], payload['values']))
+            return m
+
+        m = cls(payload['capacity'], function, payload['incremental_step'], payload['compact_load'], seed)
+        buckets = [None] * payload['capacity']
+        for idx, hash_val, key, value in zip(payload['slots'], payload['hashes'], payload['keys'], payload['values']):
+            buckets[idx] = HashEntry(key, value, hash_val)
+
+        #  Tombstones keep the probe sequences that run through them intact
+        for idx in payload['tombstones']:
+            buckets[idx] = HashEntry(None, None)
+            buckets[idx].is_tombstone = True
+
+        m._buckets = DynamicArray(buckets)
+        m._size = len(payload['keys'])
+        m._tombstones = len(payload['tombstones'])
+        return m
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
+        """
+        Start collecting stats, reported by get_stats. The map switches to an instrumented subclass and its table
+        to an array that tracks clusters of used slots, so the stats are kept as the map changes. Stats cost nothing
+        while disabled: a plain HashMap runs no instrumentation code.
+        :return:
+        """
+        if isinstance(self, _StatsHashMap):
+            return
+        self._stats = MapStats()
+        self._hash_function = HashCallCounter(self._hash_function)
+        self._stats.clusters = track_clusters(self._buckets)
+        self.__class__ = _StatsHashMap
+
+    def disable_stats(self) -> None:
+        """
+        Stop collecting stats and switch the map back to a plain HashMap. The collected stats are dropped.
+        :return:
+        """
+        if not isinstance(self, _StatsHashMap):
+            return
+        self._buckets.__class__ = DynamicArray
+        self._hash_function = self._hash_function.function
+        del self._stats
+        self.__class__ = HashMap
+
+    def get_stats(self) -> dict:
+        """
+        Return the stats collected since enable_stats, or None if stats are disabled.
+        :return: dict with operations, hash_calls, hash_calls_per_op, resize_count and resize_seconds (time spent
+                 allocating and migrating tables, compactions included), probe_lengths_hit and probe_lengths_miss
+                 (histograms of slots read per probe sequence that found / did not find its key), tombstones and
+                 max_cluster_length (longest run of adjacent used slots in the current table)
+        """
+        return None
+
+
+class _StatsHashMap(HashMap):
+    """
+    HashMap with stats enabled. enable_stats switches a map to this class and disable_stats switches it back, so
+    the HashMap methods themselves carry no instrumentation.
+    """
+
+    def _probe(self, buckets: DynamicArray, capacity: int, key: str, hash_val: int,
+               moved: int = 0) -> (int, int, int):
+        """
+        HashMap._probe, also recording the number of slots read in the hit or miss histogram.
+        """
+        result = HashMap._probe(buckets, capacity, key, hash_val, moved)
+        lengths = self._stats.probe_hits if result[0] >= 0 else self._stats.probe_misses
+        lengths[result[2]] = lengths.get(result[2], 0) + 1
+        return result
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Start a resize, timing it and tracking the clusters of the new table.
+        """
+        self._finish_resize()
+        start = time.perf_counter()
+        super()._begin_resize(new_capacity)
+        self._stats.clusters = track_clusters(self._buckets)
+        self._stats.resize_count += 1
+        self._stats.resize_seconds += time.perf_counter() - start
+
+    def _migrate(self, count: int) -> None:
+        """
+        Migrate old slots, timing it.
+        """
+        if self._old_buckets is None:
+            return
+        start = time.perf_counter()
+        super()._migrate(count)
+        self._stats.resize_seconds += time.perf_counter() - start
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update a batch of pairs. A batch written through a list view stores a new, untracked Dynamic Array,
+        whose clusters are measured again.
+        """
+        super().put_many(pairs)
+        if type(self._buckets) is DynamicArray:
+            self._stats.clusters = track_clusters(self._buckets)
+
+    def clear(self) -> None:
+        """
+        Clear the map and reset its cluster tracking.
+        """
+        super().clear()
+        self._stats.clusters = track_clusters(self._buckets)
+
+    def get_stats(self) -> dict:
+        """
+        Return the stats collected since enable_stats. See HashMap.get_stats.
+        """
+        stats = self._stats
+        return {
+            **stats.summary(self._hash_function.calls),
+            'probe_lengths_hit': histogram(stats.probe_hits),
+            'probe_lengths_miss': histogram(stats.probe_misses),
+            'tombstones': self._tombstones,
+            'max_cluster_length': stats.clusters.max_length,
+        }
+
+
+for _name in ('put', 'get', 'contains_key', 'pop', 'increment', 'upsert', 'setdefault'):
+    setattr(_StatsHashMap, _name, counting_operations(getattr(_StatsHashMap, _name)))
+for _name in ('put_many', 'get_many', 'remove_many'):
+    setattr(_StatsHashMap, _name, counting_operations(getattr(_StatsHashMap, _name), batch=True))
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -0,0 +1,316 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: HashMap ADT Implemented Using Parallel Flat Arrays and Collision Resolution via Quadratic Probing.
+#              Same public API as hash_map_oa.HashMap, without a HashEntry object per slot.
+
+
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+
+
+#  Slot states kept in the state byte array
+_EMPTY, _LIVE, _TOMBSTONE = 0, 1, 2
+
+#  Hashes are reduced to 63 bits so they fit a signed 64-bit array slot
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses
+        quadratic probing for collision resolution.
+        Slot i is described by _states[i] (empty, live or tombstone), _hashes[i], _keys[i] and _values[i].
+        :param capacity: Initial capacity, rounded up to a prime
+        :param function: Hash function used to map keys to slots
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                tombstone = self._states[i] == _TOMBSTONE
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} TS: {tombstone}\n"
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the slot arrays with empty arrays of the given capacity.
+        :param capacity: Number of slots
+        :return:
+        """
+        self._states = bytearray(capacity)
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _probe(self, key: str, hash_val: int) -> (int, int):
+        """
+        Walk the quadratic probe sequence for key once. Cached hashes are compared before keys.
+        :param key: Key to be searched for
+        :param hash_val: Masked hash of the key
+        :return: tuple: Index of the live slot holding key (or -1), and index of the first tombstone or empty slot
+                 the key could be inserted into (or -1 if the sequence has none)
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        hash_idx = hash_val % capacity
+        init_hash_idx = hash_idx
+        quad_val = 0
+        free_idx = -1
+
+        while True:
+            state = states[hash_idx]
+            if state == _EMPTY:
+                return -1, (hash_idx if free_idx < 0 else free_idx)
+            if state == _TOMBSTONE:
+                if free_idx < 0:
+                    free_idx = hash_idx
+            elif hashes[hash_idx] == hash_val and keys[hash_idx] == key:
+                return hash_idx, free_idx
+
+            quad_val += 1
+            hash_idx = (init_hash_idx + quad_val * quad_val) % capacity
+            if hash_idx == init_hash_idx:
+                return -1, free_idx
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the key already exists in the hash map, its associated value
+        is replaced with the new value. If the key is not in the hash map, a new key/value pair must be added.
+        Resize the table to the closest prime number to double current capacity if load factor >= 0.5.
+        :param key: Key to be inserted into the hash table.
+        :param value: Value to be inserted into the hash table.
+        :return:
+        """
+        hash_val = self._hash_function(key) & _HASH_MASK
+
+        #  If the key is found in the hash table, replace the value with the argument value
+        hash_idx, free_idx = self._probe(key, hash_val)
+        if hash_idx >= 0:
+            self._values[hash_idx] = value
+            return
+
+        #  Resize the table before adding the element if load factor exceeds 0.5 or the probe found no free slot
+        if self._size / self._capacity >= 0.5 or free_idx < 0:
+            self.resize_table(2 * self._capacity)
+            _, free_idx = self._probe(key, hash_val)
+
+        self._states[free_idx] = _LIVE
+        self._hashes[free_idx] = hash_val
+        self._keys[free_idx] = key
+        self._values[free_idx] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: self._size / self._capacity: The load factor of the hash map
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty addresses (empty or tombstone slots) in the hash table
+        :return:
+        """
+        return self._capacity - self._states.count(_LIVE)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. Rehash all existing key/value pairs from their cached hashes,
+        without calling the hash function. If the argument new_capacity is less than the number of elements in the
+        hash table, do nothing. If new_capacity is valid, make sure the new hash table capacity is a prime number.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        if new_capacity < self._size:
+            return
+
+        #  Find a prime capacity that keeps the load factor at or below 0.5
+        new_capacity = self._next_prime(new_capacity)
+        while self._size / new_capacity > 0.5:
+            new_capacity = self._next_prime(new_capacity + 1)
+
+        old_states, old_hashes, old_keys, old_values = self._states, self._hashes, self._keys, self._values
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        states, hashes, keys, values = self._states, self._hashes, self._keys, self._values
+
+        #  Move every live slot to the first empty slot of its probe sequence in the new arrays
+        for idx in range(len(old_states)):
+            if old_states[idx] != _LIVE:
+                continue
+            hash_val = old_hashes[idx]
+            hash_idx = init_hash_idx = hash_val % new_capacity
+            quad_val = 0
+            while states[hash_idx] != _EMPTY:
+                quad_val += 1
+                hash_idx = (init_hash_idx + quad_val * quad_val) % new_capacity
+            states[hash_idx] = _LIVE
+            hashes[hash_idx] = hash_val
+            keys[hash_idx] = old_keys[idx]
+            values[hash_idx] = old_values[idx]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist.
+        :param key: Key to be searched for
+        :return:
+        """
+        if self._size == 0:
+            return None
+        hash_idx, _ = self._probe(key, self._hash_function(key) & _HASH_MASK)
+        return None if hash_idx < 0 else self._values[hash_idx]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        if self._size == 0:
+            return False
+        hash_idx, _ = self._probe(key, self._hash_function(key) & _HASH_MASK)
+        return hash_idx >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        if self._size == 0:
+            return
+        hash_idx, _ = self._probe(key, self._hash_function(key) & _HASH_MASK)
+        if hash_idx < 0:
+            return
+
+        #  Mark the slot as a tombstone and drop the references so the key and value can be freed
+        self._states[hash_idx] = _TOMBSTONE
+        self._keys[hash_idx] = None
+        self._values[hash_idx] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash table capacity.
+        :return:
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        states, keys, values = self._states, self._keys, self._values
+        return DynamicArray([(keys[idx], values[idx]) for idx in range(self._capacity) if states[idx] == _LIVE])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
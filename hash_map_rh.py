@@ -0,0 +1,349 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: HashMap ADT Implemented Using Parallel Flat Arrays and Collision Resolution via Robin Hood
+#              Linear Probing with Backward-Shift Deletion. Same public API as hash_map_oa.HashMap.
+
+
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import mix_hash
+
+
+#  Probe distance stored for a slot that holds no entry
+_EMPTY = -1
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, max_load: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood linear probing for collision resolution.
+        Keys are hashed with function and then mix_hash, so hashes that differ only in a few low bits do not land
+        in adjacent home slots and merge into one long run.
+        Slot i is described by _dists[i] (distance from the key's home slot, or -1 if empty), _hashes[i], _keys[i]
+        and _values[i]. Along any run of occupied slots an entry never sits further from home than the entry after
+        it plus one, which keeps probe lengths short and lets unsuccessful lookups stop early.
+        :param capacity: Initial capacity, rounded up to a prime
+        :param function: Hash function used to map keys to slots
+        :param max_load: Load factor above which put doubles the capacity
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._max_load = max_load
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._dists[i] == _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} D: {self._dists[i]}\n"
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_max_load(self) -> float:
+        """
+        Return the load factor above which put grows the table
+        """
+        return self._max_load
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the slot arrays with empty arrays of the given capacity.
+        :param capacity: Number of slots
+        :return:
+        """
+        self._dists = array('i', [_EMPTY]) * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _find(self, key: str, hash_val: int) -> int:
+        """
+        Return the slot holding key, or -1. The probe stops at the first slot whose entry is closer to its home than
+        key would be at that point, since Robin Hood insertion would have placed key there or earlier.
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key, mixed by mix_hash
+        :return: Index of the slot holding key, or -1
+        """
+        dists, hashes, keys = self._dists, self._hashes, self._keys
+        capacity = self._capacity
+        hash_idx = hash_val % capacity
+        dist = 0
+        while dists[hash_idx] >= dist:
+            if hashes[hash_idx] == hash_val and keys[hash_idx] == key:
+                return hash_idx
+            dist += 1
+            hash_idx += 1
+            if hash_idx == capacity:
+                hash_idx = 0
+        return -1
+
+    def _place(self, hash_idx: int, dist: int, hash_val: int, key: str, value: object) -> None:
+        """
+        Insert an entry known not to be in the table, starting at hash_idx at probe distance dist. Whenever the
+        carried entry is further from home than the resident one, they swap and the resident is carried on.
+        :param hash_idx: First slot to try
+        :param dist: Distance of hash_idx from the carried entry's home slot
+        :param hash_val: Hash of the key, mixed by mix_hash
+        :param key: Key to be inserted
+        :param value: Value to be inserted
+        :return:
+        """
+        dists, hashes, keys, values = self._dists, self._hashes, self._keys, self._values
+        capacity = self._capacity
+        while True:
+            resident_dist = dists[hash_idx]
+            if resident_dist == _EMPTY:
+                dists[hash_idx], hashes[hash_idx], keys[hash_idx], values[hash_idx] = dist, hash_val, key, value
+                return
+            if resident_dist < dist:
+                dists[hash_idx], dist = dist, resident_dist
+                hashes[hash_idx], hash_val = hash_val, hashes[hash_idx]
+                keys[hash_idx], key = key, keys[hash_idx]
+                values[hash_idx], value = value, values[hash_idx]
+            dist += 1
+            hash_idx += 1
+            if hash_idx == capacity:
+                hash_idx = 0
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the key already exists in the hash map, its associated value
+        is replaced with the new value. If the key is not in the hash map, a new key/value pair must be added.
+        Resize the table to the closest prime number to double current capacity if the load factor would exceed
+        max_load.
+        :param key: Key to be inserted into the hash table.
+        :param value: Value to be inserted into the hash table.
+        :return:
+        """
+        hash_val = mix_hash(self._hash_function(key))
+
+        #  Walk the probe sequence once: either the key turns up, or the walk reaches the slot where Robin Hood
+        #  insertion takes over
+        dists, hashes, keys = self._dists, self._hashes, self._keys
+        capacity = self._capacity
+        hash_idx = hash_val % capacity
+        dist = 0
+        while dists[hash_idx] >= dist:
+            if hashes[hash_idx] == hash_val and keys[hash_idx] == key:
+                self._values[hash_idx] = value
+                return
+            dist += 1
+            hash_idx += 1
+            if hash_idx == capacity:
+                hash_idx = 0
+
+        #  After a resize, insertion starts over from the key's home slot in the new table
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(2 * self._capacity)
+            hash_idx, dist = hash_val % self._capacity, 0
+
+        self._place(hash_idx, dist, hash_val, key, value)
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: self._size / self._capacity: The load factor of the hash map
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty slots in the hash table
+        :return:
+        """
+        return self._dists.count(_EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. Rehash all existing key/value pairs from their cached hashes.
+        If the argument new_capacity is less than the number of elements in the hash table, do nothing. If
+        new_capacity is valid, make sure the new hash table capacity is a prime number that keeps the load factor at
+        or below max_load.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._next_prime(new_capacity)
+        while self._size / new_capacity > self._max_load:
+            new_capacity = self._next_prime(new_capacity + 1)
+
+        old_dists, old_hashes, old_keys, old_values = self._dists, self._hashes, self._keys, self._values
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        for idx in range(len(old_dists)):
+            if old_dists[idx] != _EMPTY:
+                hash_val = old_hashes[idx]
+                self._place(hash_val % new_capacity, 0, hash_val, old_keys[idx], old_values[idx])
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist.
+        :param key: Key to be searched for
+        :return:
+        """
+        if self._size == 0:
+            return None
+        hash_idx = self._find(key, mix_hash(self._hash_function(key)))
+        return None if hash_idx < 0 else self._values[hash_idx]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        if self._size == 0:
+            return False
+        return self._find(key, mix_hash(self._hash_function(key))) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        The entries after it that are away from their home slot shift back by one, so no tombstone is left behind.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        if self._size == 0:
+            return
+        hash_idx = self._find(key, mix_hash(self._hash_function(key)))
+        if hash_idx < 0:
+            return
+
+        dists, hashes, keys, values = self._dists, self._hashes, self._keys, self._values
+        capacity = self._capacity
+        next_idx = hash_idx + 1 if hash_idx + 1 < capacity else 0
+        while dists[next_idx] > 0:
+            dists[hash_idx] = dists[next_idx] - 1
+            hashes[hash_idx], keys[hash_idx], values[hash_idx] = hashes[next_idx], keys[next_idx], values[next_idx]
+            hash_idx = next_idx
+            next_idx = hash_idx + 1 if hash_idx + 1 < capacity else 0
+
+        dists[hash_idx] = _EMPTY
+        keys[hash_idx] = values[hash_idx] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash table capacity.
+        :return:
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        dists, keys, values = self._dists, self._keys, self._values
+        return DynamicArray([(keys[idx], values[idx]) for idx in range(self._capacity) if dists[idx] != _EMPTY])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
@@ -6,19 +6,51 @@
 # Description: HashMap ADT Implemented Using Dynamic Array and Collision Resolution via Chaining
 
 
+import time
+
 from a6_include import (DynamicArray, LinkedList,
                         hash_function_1, hash_function_2)
+from hash_batch import hash_keys
+from hash_functions import seeded_hash
+from hash_map_stats import (HashCallCounter, MapStats, counting_operations, histogram, track_chain, track_chains,
+                            untrack_chains)
+from hash_snapshot import read_snapshot, write_snapshot
+from tree_bucket import TreeBucket
+
+
+#  A chain longer than this is converted to a tree bucket
+TREEIFY_THRESHOLD = 8
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 min_load: float = 0.0,
+                 incremental_step: int = 0,
+                 seed=None) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        :param capacity: Initial capacity, rounded up to a prime. The table never shrinks below it.
+        :param function: Hash function used to map keys to buckets
+        :param max_load: Load factor above which put doubles the capacity
+        :param min_load: Load factor below which remove halves the capacity. 0 disables shrinking.
+        :param incremental_step: Old buckets migrated per operation while an automatic resize is in progress.
+                                 0 rehashes the whole table inside the put/remove that triggered the resize.
+                                 A step below about 1 / max_load may not drain the old table before the next
+                                 resize, which then finishes the migration in one pass and loses the bounded
+                                 per-operation latency.
+        :param seed: None hashes keys with function. An int, or 'random' for a seed drawn from the OS, hashes them
+                     with SipHash keyed by the seed instead, so colliding keys cannot be crafted without knowing it.
         """
+        #  Shrinking must leave the load below max_load, otherwise put and remove would resize back and forth
+        if max_load <= 0 or min_load < 0 or 2 * min_load >= max_load:
+            raise ValueError("load thresholds must satisfy 0 <= 2 * min_load < max_load")
+        if incremental_step < 0:
+            raise ValueError("incremental_step must not be negative")
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
@@ -26,9 +58,24 @@ class HashMap:
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        self._hash_function = function
+        self._hash_function = seeded_hash(function, seed)
+        self._seed = self._hash_function.seed if seed is not None else None
         self._size = 0
 
+        self._max_load = max_load
+        self._min_load = min_load
+        self._min_capacity = self._capacity
+        self._resize_count = 0
+
+        #  Bumped whenever a key is added or removed or the table is rebuilt, so iterators can detect it
+        self._mod_count = 0
+
+        #  Bucket array being drained by an incremental resize. Buckets below _migrate_idx have been moved already.
+        self._incremental_step = incremental_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_idx = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -86,6 +133,36 @@ class HashMap:
         """
         return self._capacity
 
+    def get_max_load(self) -> float:
+        """
+        Return the load factor above which put grows the table
+        """
+        return self._max_load
+
+    def get_min_load(self) -> float:
+        """
+        Return the load factor below which remove shrinks the table (0 if shrinking is disabled)
+        """
+        return self._min_load
+
+    def get_resize_count(self) -> int:
+        """
+        Return the number of times the table has been rehashed
+        """
+        return self._resize_count
+
+    def get_seed(self) -> int:
+        """
+        Return the seed keys are hashed with, or None if the map hashes with the function it was given
+        """
+        return self._seed
+
+    def is_resizing(self) -> bool:
+        """
+        Return True while an incremental resize still has buckets left to migrate
+        """
+        return self._old_buckets is not None
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -96,27 +173,106 @@ class HashMap:
         :param value: Value to be associated with key
         :return:
         """
+        self._migrate(self._incremental_step)
+
         #  Use hash function to find linked list associated with key
         hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        hash_ll = self._buckets[hash_idx]
+        hash_ll = self._bucket_for(hash_val)
 
-        #  If the key is found in the linked list, replace the value with the argument value
-        if hash_ll.contains(key):
-            for node in hash_ll:
-                if node.key == key:
-                    node.value = value
+        #  If the key is found in the linked list, replace the value of the node that was found
+        node = hash_ll.contains(key, hash_val)
+        if node is not None:
+            node.value = value
 
         #  Append a new node in the linked list with the key/value pair if it does not exist
         else:
-            hash_ll.insert(key, value)
-            self._size += 1
+            self._insert_new(hash_ll, key, value, hash_val)
+
+    def _insert_new(self, hash_ll: LinkedList, key: str, value: object, hash_val: int) -> None:
+        """
+        Add a key known not to be in the hash map to its bucket, growing the table if needed.
+        :param hash_ll: Bucket of the key, as returned by _bucket_for
+        :param key: Key to be added
+        :param value: Value to be associated with key
+        :param hash_val: Hash of the key
+        :return:
+        """
+        hash_ll.insert(key, value, hash_val)
+        if hash_ll.length() > TREEIFY_THRESHOLD:
+            self._treeify(hash_ll, hash_val)
+        self._size += 1
+        self._mod_count += 1
+
+        #  Double the capacity once the load factor exceeds the grow threshold
+        if self.table_load() > self._max_load:
+            self._auto_resize(2 * self._capacity)
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replace the value associated with key by fn(value), or add the key with value default if it is not in the
+        hash map. Hashes the key and walks its chain once, unlike a contains_key / get / put sequence.
+        :param key: Key to be updated or added
+        :param fn: Function from the current value to the new one
+        :param default: Value of a newly added key
+        :return: The new value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        hash_ll = self._bucket_for(hash_val)
+        node = hash_ll.contains(key, hash_val)
+        if node is not None:
+            node.value = fn(node.value)
+            return node.value
+
+        self._insert_new(hash_ll, key, default, hash_val)
+        return default
+
+    def increment(self, key: str, delta: int = 1) -> object:
+        """
+        Add delta to the value associated with key, or add the key with value delta if it is not in the hash map.
+        Hashes the key and walks its chain once, unlike a contains_key / get / put sequence.
+        :param key: Key whose value is incremented
+        :param delta: Amount added to the value
+        :return: The new value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        hash_ll = self._bucket_for(hash_val)
+        node = hash_ll.contains(key, hash_val)
+        if node is not None:
+            node.value += delta
+            return node.value
+
+        self._insert_new(hash_ll, key, delta, hash_val)
+        return delta
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Return the value associated with key. If the key is not in the hash map, add it with value default first.
+        Hashes the key and walks its chain once.
+        :param key: Key to be searched for or added
+        :param default: Value of a newly added key
+        :return: The value associated with key
+        """
+        self._migrate(self._incremental_step)
+
+        hash_val = self._hash_function(key)
+        hash_ll = self._bucket_for(hash_val)
+        node = hash_ll.contains(key, hash_val)
+        if node is not None:
+            return node.value
+
+        self._insert_new(hash_ll, key, default, hash_val)
+        return default
 
     def empty_buckets(self) -> int:
         """
         Return the number of empty buckets in the hash table
         :return:
         """
+        self._finish_resize()
         count = 0
 
         # Go through each LL in the buckets Dynamic Array and increment count if the bucket is empty
@@ -139,11 +295,15 @@ class HashMap:
         Clear the contents of the hash map. Does not change the underlying hash table capacity.
         :return:
         """
+        #  Drop any bucket array left over from an incremental resize
+        self._old_buckets = None
+
         # Replace every bucket with an empty Linked List
         for idx in range(self._capacity):
             self._buckets[idx] = LinkedList()
 
         self._size = 0
+        self._mod_count += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -156,24 +316,104 @@ class HashMap:
         if new_capacity < 1:
             return
 
+        #  An explicit resize always rehashes everything before returning
+        self._begin_resize(new_capacity)
+        self._finish_resize()
+
+    def _auto_resize(self, new_capacity: int) -> None:
+        """
+        Resize triggered by the load thresholds. Rehashes in one pass, or only starts the resize when the map was
+        created with an incremental_step, leaving the migration to the following operations.
+        :param new_capacity: Baseline capacity for hash map to be resized to.
+        :return:
+        """
+        self._begin_resize(new_capacity)
+        if self._incremental_step == 0:
+            self._finish_resize()
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Allocate a new bucket array with a prime capacity and keep the current one aside as the migration source.
+        :param new_capacity: Baseline capacity for hash map to be resized to.
+        :return:
+        """
+        #  Only one resize may be in progress at a time. If incremental_step was too small to drain the previous one,
+        #  the rest of it is migrated here in one pass.
+        self._finish_resize()
+
         #  Populate a new Dynamic Array with empty LL's with prime valued capacity
-        new_buckets = DynamicArray()
         if self._is_prime(new_capacity) is False:
             new_capacity = self._next_prime(new_capacity)
-        for _ in range(new_capacity):
-            new_buckets.append(LinkedList())
-
-        #  Hash the values from the old Dynamic Array and insert the values to the appropriate LL in the new DA
-        for idx in range(self._capacity):
-            current_ll = self._buckets[idx]
-            for node in current_ll:
-                hash_val = self._hash_function(node.key)
-                hash_idx = hash_val % new_capacity
-                new_buckets[hash_idx].insert(node.key, node.value)
+        new_buckets = DynamicArray([LinkedList() for _ in range(new_capacity)])
 
         #  Set buckets of the hash map to the new Dynamic Array and capacity to the new capacity
-        self._buckets = new_buckets
-        self._capacity = new_capacity
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._buckets, self._capacity = new_buckets, new_capacity
+        self._migrate_idx = 0
+        self._resize_count += 1
+        self._mod_count += 1
+
+    def _migrate(self, count: int) -> None:
+        """
+        Move the contents of up to count old buckets into the new bucket array.
+        :param count: Maximum number of old buckets to migrate
+        :return:
+        """
+        if self._old_buckets is None:
+            return
+
+        #  Insert the values from the old Dynamic Array to the appropriate LL in the new DA using the cached hashes
+        stop = min(self._migrate_idx + count, self._old_capacity)
+        for idx in range(self._migrate_idx, stop):
+            for node in self._old_buckets[idx]:
+                hash_ll = self._buckets[node.hash % self._capacity]
+                hash_ll.insert(node.key, node.value, node.hash)
+                if hash_ll.length() > TREEIFY_THRESHOLD:
+                    self._treeify(hash_ll, node.hash)
+            self._old_buckets[idx] = None
+        self._migrate_idx = stop
+
+        #  Release the old Dynamic Array once every bucket has been moved
+        if stop == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress.
+        :return:
+        """
+        self._migrate(self._old_capacity)
+
+    def _treeify(self, chain: LinkedList, hash_val: int) -> TreeBucket:
+        """
+        Replace a chain that has grown past TREEIFY_THRESHOLD with a tree bucket holding the same pairs, so that
+        keys crafted to collide cost O(log n) per lookup instead of O(n). Buckets that are already trees are left
+        alone. A resize rebuilds every bucket as a chain, and only chains still too long are converted again.
+        :param chain: Bucket of the key with the given hash
+        :param hash_val: Hash of a key in the bucket
+        :return: The tree bucket now in place of the chain
+        """
+        if isinstance(chain, TreeBucket):
+            return chain
+        tree = TreeBucket(chain)
+        if self._old_buckets is not None and self._old_buckets[hash_val % self._old_capacity] is chain:
+            self._old_buckets[hash_val % self._old_capacity] = tree
+        else:
+            self._buckets[hash_val % self._capacity] = tree
+        return tree
+
+    def _bucket_for(self, hash_val: int) -> LinkedList:
+        """
+        Return the bucket that holds (or would hold) the key with the given hash. While an incremental resize is
+        in progress, keys whose old bucket has not been migrated yet still live in the old bucket array.
+        :param hash_val: Hash of the key
+        :return: The bucket for the key
+        """
+        if self._old_buckets is not None:
+            old_idx = hash_val % self._old_capacity
+            if old_idx >= self._migrate_idx:
+                return self._old_buckets[old_idx]
+        return self._buckets[hash_val % self._capacity]
 
     def get(self, key: str) -> object:
         """
@@ -184,18 +424,16 @@ class HashMap:
         #  Return None automatically if there are no values contained in the hash table
         if self._size == 0:
             return None
+        self._migrate(self._incremental_step)
 
         #  Find the linked list in the hash table associated with the key
         hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        hash_ll = self._buckets[hash_idx]
+        hash_ll = self._bucket_for(hash_val)
 
         #  Traverse the linked list, comparing node's key with the argument key.
         #  If the key is found, return node's value. If not, return None
-        for node in hash_ll:
-            if node.key == key:
-                return node.value
-        return None
+        node = hash_ll.contains(key, hash_val)
+        return None if node is None else node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -206,18 +444,15 @@ class HashMap:
         #  Return False automatically if there are no values contained in the hash table
         if self._size == 0:
             return False
+        self._migrate(self._incremental_step)
 
         #  Find the linked list in the hash table associated with the key
         hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        hash_ll = self._buckets[hash_idx]
+        hash_ll = self._bucket_for(hash_val)
 
         #  Traverse the Linked List, comparing node's key with argument key
         #  If the key is found, return True. If not, return False.
-        for node in hash_ll:
-            if node.key == key:
-                return True
-        return False
+        return hash_ll.contains(key, hash_val) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -225,21 +460,36 @@ class HashMap:
         :param key: Key to be removed from the hash map
         :return:
         """
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Remove the given key from the hash map and return its associated value. If the key is not in the hash map,
+        do nothing and return default. Hashes the key and walks its chain once.
+        :param key: Key to be removed from the hash map
+        :param default: Value returned if the key is not in the hash map
+        :return: The value that was associated with key, or default
+        """
         #  Do nothing automatically if there are no values contained in the hash table
         if self._size == 0:
-            return
+            return default
+        self._migrate(self._incremental_step)
 
         #  Find the linked list in the hash table associated with the key
         hash_val = self._hash_function(key)
-        hash_idx = hash_val % self._capacity
-        hash_ll = self._buckets[hash_idx]
+        hash_ll = self._bucket_for(hash_val)
 
-        #  Remove the element from the hash table if the key exists. Do nothing if it doesn't
-        if self.contains_key(key):
-            hash_ll.remove(key)
-            self._size -= 1
-        else:
-            return
+        #  Unlink the node if the key exists. Do nothing if it doesn't.
+        node = hash_ll.pop(key, hash_val)
+        if node is None:
+            return default
+        self._size -= 1
+        self._mod_count += 1
+
+        #  Halve the capacity once the load factor drops below the shrink threshold, but never below the initial size
+        if self.table_load() < self._min_load and self._capacity > self._min_capacity:
+            self._auto_resize(max(self._capacity // 2, self._min_capacity))
+        return node.value
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -249,6 +499,7 @@ class HashMap:
         #  Return an empty Dynamic Array if there are no values contained in the hash table
         if self._size == 0:
             return DynamicArray()
+        self._finish_resize()
 
         #  Create a new Dynamic Array
         key_value_da = DynamicArray()
@@ -262,6 +513,322 @@ class HashMap:
         #  Return the Dynamic Array
         return key_value_da
 
+    def _iter_nodes(self):
+        """
+        Generator over the nodes of every chain, in bucket order. Raises RuntimeError if the hash map gains or
+        loses a key, or is resized, while the generator is suspended. Updating the value of an existing key is
+        allowed.
+        """
+        self._finish_resize()
+        mod_count = self._mod_count
+        buckets = self._buckets
+        for idx in range(self._capacity):
+            for node in buckets[idx]:
+                yield node
+                if self._mod_count != mod_count:
+                    raise RuntimeError("HashMap changed size during iteration")
+
+    def keys(self):
+        """
+        Return a generator over the keys of the hash map, read from the chains without building a Dynamic Array.
+        """
+        return (node.key for node in self._iter_nodes())
+
+    def values(self):
+        """
+        Return a generator over the values of the hash map, read from the chains without building a Dynamic Array.
+        """
+        return (node.value for node in self._iter_nodes())
+
+    def items(self):
+        """
+        Return a generator over the key/value tuples of the hash map, read from the chains without building a
+        Dynamic Array.
+        """
+        return ((node.key, node.value) for node in self._iter_nodes())
+
+    def __iter__(self):
+        """
+        Iterate over the keys of the hash map.
+        """
+        return self.keys()
+
+    # ------------------------------------------------------------------ #
+
+    def _bucket_view(self, batch_size: int):
+        """
+        Return the buckets as a plain list when the batch is large enough to pay for copying it, otherwise the
+        Dynamic Array itself. Both are indexed with [], but the list skips the bounds check on every access.
+        :param batch_size: Number of keys in the batch
+        :return: List or Dynamic Array sharing the bucket linked lists
+        """
+        if batch_size * 8 >= self._capacity:
+            return self._buckets.to_list()
+        return self._buckets
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update every key/value pair of a batch. The table grows at most once for the whole batch, every hash
+        is computed before inserting, and the buckets are indexed without bounds checks. A key that appears more
+        than once ends up with its last value.
+        :param pairs: Dynamic Array (or list) of key/value tuples
+        :return:
+        """
+        pairs = pairs.to_list() if isinstance(pairs, DynamicArray) else list(pairs)
+        if not pairs:
+            return
+        self._finish_resize()
+
+        #  Grow once so that the whole batch fits under the grow threshold
+        needed = self._size + len(pairs)
+        if needed / self._capacity > self._max_load:
+            self.resize_table(int(needed / self._max_load) + 1)
+
+        capacity = self._capacity
+        hashes = hash_keys([key for key, _ in pairs], self._hash_function)
+        buckets = self._bucket_view(len(pairs))
+
+        for (key, value), hash_val in zip(pairs, hashes):
+            hash_ll = buckets[hash_val % capacity]
+            node = hash_ll.contains(key, hash_val)
+            if node is not None:
+                node.value = value
+            else:
+                hash_ll.insert(key, value, hash_val)
+                if hash_ll.length() > TREEIFY_THRESHOLD:
+                    buckets[hash_val % capacity] = self._treeify(hash_ll, hash_val)
+                self._size += 1
+                self._mod_count += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key of a batch. Hashes are computed up front for the whole batch.
+        :param keys: Dynamic Array (or list) of keys
+        :return: Dynamic Array with the value of each key in batch order, None for keys not in the hash map
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        results = [None] * len(keys)
+        if self._size == 0:
+            return DynamicArray(results)
+        self._finish_resize()
+
+        capacity = self._capacity
+        hashes = hash_keys(keys, self._hash_function)
+        buckets = self._bucket_view(len(keys))
+
+        for idx, hash_val in enumerate(hashes):
+            node = buckets[hash_val % capacity].contains(keys[idx], hash_val)
+            if node is not None:
+                results[idx] = node.value
+        return DynamicArray(results)
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every key of a batch that is in the hash map. The table shrinks at most once for the whole batch.
+        :param keys: Dynamic Array (or list) of keys
+        :return:
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        if self._size == 0 or not keys:
+            return
+        self._finish_resize()
+
+        capacity = self._capacity
+        hashes = hash_keys(keys, self._hash_function)
+        buckets = self._bucket_view(len(keys))
+
+        for key, hash_val in zip(keys, hashes):
+            if buckets[hash_val % capacity].remove(key, hash_val):
+                self._size -= 1
+                self._mod_count += 1
+
+        #  Halve the capacity as often as remove would have, but rehash only once
+        new_capacity = self._capacity
+        while self._size / new_capacity < self._min_load and new_capacity > self._min_capacity:
+            new_capacity = max(new_capacity // 2, self._min_capacity)
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
+    # ------------------------------------------------------------------ #
+
+    def save(self, path: str) -> None:
+        """
+        Write the hash map to a binary snapshot file. The file keeps the bucket layout, the chain order, which
+        buckets are trees and the cached hash of every key, so load can rebuild the table without calling the hash
+        function. Values must be plain data (see hash_snapshot), or load will refuse the file.
+        :param path: File to write
+        :return:
+        """
+        self._finish_resize()
+        chain_lengths, trees, hashes, keys, values = [], [], [], [], []
+        for idx in range(self._capacity):
+            current_ll = self._buckets[idx]
+            chain_lengths.append(current_ll.length())
+            if isinstance(current_ll, TreeBucket):
+                trees.append(idx)
+            for node in current_ll:
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+
+        write_snapshot(path, 'sc', self._hash_function, {
+            'capacity': self._capacity,
+            'min_capacity': self._min_capacity,
+            'max_load': self._max_load,
+            'min_load': self._min_load,
+            'incremental_step': self._incremental_step,
+            'chain_lengths': chain_lengths,
+            'trees': trees,
+            'hashes': hashes,
+            'keys': keys,
+            'values': values,
+        })
+
+    @classmethod
+    def load(cls, path: str, function: callable = hash_function_1, seed=None) -> "HashMap":
+        """
+        Read a hash map written by save. If the snapshot was written with the same hash function, the chains are
+        rebuilt as saved from the cached hashes. Otherwise the pairs are inserted again with put_many.
+        :param path: File written by save
+        :param function: Hash function of the loaded map
+        :param seed: Seed of the loaded map, see __init__. The seed is not saved, so a seeded map is rebuilt as
+                     saved only when loaded with the same int seed.
+        :return: New hash map with the saved key/value pairs and load thresholds
+        """
+        payload, same_function = read_snapshot(path, 'sc', seeded_hash(function, seed))
+        m = cls(payload['min_capacity'], function, payload['max_load'], payload['min_load'],
+                payload['incremental_step'], seed)
+        if not same_function:
+            m.put_many(zip(payload['keys'], payload['values']))
+            return m
+
+        #  Chains are rebuilt back to front, since insert adds at the head
+        hashes, keys, values = payload['hashes'], payload['keys'], payload['values']
+        buckets = []
+        end = 0
+        for length in payload['chain_lengths']:
+            current_ll = LinkedList()
+            for idx in range(end + length - 1, end - 1, -1):
+                current_ll.insert(keys[idx], values[idx], hashes[idx])
+            buckets.append(current_ll)
+            end += length
+        for idx in payload.get('trees', ()):
+            buckets[idx] = TreeBucket(buckets[idx])
+
+        m._buckets = DynamicArray(buckets)
+        m._capacity = payload['capacity']
+        m._size = len(keys)
+        return m
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
+        """
+        Start collecting stats, reported by get_stats. The map switches to an instrumented subclass and its chains
+        to lists that keep a chain length histogram, so the stats are kept as the map changes. Stats cost nothing
+        while disabled: a plain HashMap runs no instrumentation code.
+        :return:
+        """
+        if isinstance(self, _StatsHashMap):
+            return
+        self._stats = MapStats()
+        self._hash_function = HashCallCounter(self._hash_function)
+        self._stats.chain_lengths = track_chains(self._buckets)
+        if self._old_buckets is not None:
+            self._stats.old_chain_lengths = track_chains(self._old_buckets)
+        self.__class__ = _StatsHashMap
+
+    def disable_stats(self) -> None:
+        """
+        Stop collecting stats and switch the map back to a plain HashMap. The collected stats are dropped.
+        :return:
+        """
+        if not isinstance(self, _StatsHashMap):
+            return
+        untrack_chains(self._buckets)
+        if self._old_buckets is not None:
+            untrack_chains(self._old_buckets)
+        self._hash_function = self._hash_function.function
+        del self._stats
+        self.__class__ = HashMap
+
+    def get_stats(self) -> dict:
+        """
+        Return the stats collected since enable_stats, or None if stats are disabled.
+        :return: dict with operations, hash_calls, hash_calls_per_op, resize_count, resize_seconds (time spent
+                 allocating and migrating tables), chain_lengths (histogram of chain length to number of buckets,
+                 over both tables during an incremental resize) and max_chain_length
+        """
+        return None
+
+
+class _StatsHashMap(HashMap):
+    """
+    HashMap with stats enabled. enable_stats switches a map to this class and disable_stats switches it back, so
+    the HashMap methods themselves carry no instrumentation.
+    """
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Start a resize, timing it and tracking the chains of the new table.
+        """
+        self._finish_resize()
+        start = time.perf_counter()
+        super()._begin_resize(new_capacity)
+        stats = self._stats
+        stats.old_chain_lengths = stats.chain_lengths
+        stats.chain_lengths = track_chains(self._buckets)
+        stats.resize_count += 1
+        stats.resize_seconds += time.perf_counter() - start
+
+    def _migrate(self, count: int) -> None:
+        """
+        Migrate old buckets, timing it and dropping them from the old table's histogram.
+        """
+        if self._old_buckets is None:
+            return
+        start = time.perf_counter()
+        old_lengths = self._stats.old_chain_lengths
+        for idx in range(self._migrate_idx, min(self._migrate_idx + count, self._old_capacity)):
+            old_lengths[self._old_buckets[idx].length()] -= 1
+        super()._migrate(count)
+        self._stats.resize_seconds += time.perf_counter() - start
+
+    def _treeify(self, chain: LinkedList, hash_val: int) -> TreeBucket:
+        """
+        Convert a long chain, tracking the tree bucket in its place in the same histogram.
+        """
+        tree = super()._treeify(chain, hash_val)
+        if tree is not chain:
+            track_chain(tree, chain._lengths)
+        return tree
+
+    def clear(self) -> None:
+        """
+        Clear the map and track its new, empty chains.
+        """
+        super().clear()
+        self._stats.chain_lengths = track_chains(self._buckets)
+        self._stats.old_chain_lengths = {}
+
+    def get_stats(self) -> dict:
+        """
+        Return the stats collected since enable_stats. See HashMap.get_stats.
+        """
+        stats = self._stats
+        lengths = histogram(stats.chain_lengths, stats.old_chain_lengths)
+        return {
+            **stats.summary(self._hash_function.calls),
+            'chain_lengths': lengths,
+            'max_chain_length': max(lengths, default=0),
+        }
+
+
+for _name in ('put', 'get', 'contains_key', 'pop', 'increment', 'upsert', 'setdefault'):
+    setattr(_StatsHashMap, _name, counting_operations(getattr(_StatsHashMap, _name)))
+for _name in ('put_many', 'get_many', 'remove_many'):
+    setattr(_StatsHashMap, _name, counting_operations(getattr(_StatsHashMap, _name), batch=True))
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -274,13 +841,9 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
 
     map = HashMap()
     #  Iterate through da, creating a hash map where the key -> da value, value -> count
-    #  If the key is already in the hash map, increment the count associated to the key
+    #  increment adds the key with count 1 or bumps its count, hashing the key once
     for idx in range(da.length()):
-        if map.contains_key(da[idx]):
-            key_count = map.get(da[idx])
-            map.put(da[idx], key_count + 1)
-        else:
-            map.put(da[idx], 1)
+        map.increment(da[idx])
 
     #  Go through key value pairs to find highest value among the tuples
     key_value_da = map.get_keys_and_values()
@@ -0,0 +1,273 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Sharded HashMap front-end. Keys are partitioned by hash across worker processes, each owning a
+#              hash_map_sc.HashMap or hash_map_oa.HashMap shard, so bulk operations run on several cores at once.
+
+
+import multiprocessing
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_batch import hash_keys
+
+
+def _serve(conn, hash_map_cls: type, capacity: int, function) -> None:
+    """
+    Worker process loop. Owns one shard and runs every (method name, args) request received on conn against it,
+    replying with ('ok', result) or ('error', exception). A None request ends the loop.
+    """
+    shard = hash_map_cls(capacity, function)
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        name, args = request
+        try:
+            result = getattr(shard, name)(*args)
+            if isinstance(result, DynamicArray):
+                result = result.to_list()
+            conn.send(('ok', result))
+        except Exception as error:
+            conn.send(('error', error))
+    conn.close()
+
+
+class HashMap:
+    def __init__(self, shards: int = 4, hash_map_cls: type = hash_map_sc.HashMap, capacity: int = 11,
+                 function=hash_function_1) -> None:
+        """
+        Initialize new sharded HashMap.
+        Key k lives in shard function(k) % shards. Every shard is a HashMap of the given class, owned by its own
+        worker process. Batch operations send one request to every shard involved before waiting for any reply.
+        The hash function must be picklable, such as a module-level function or a SipHash instance. Keys are only
+        routed in this process and only placed within a shard by its worker, so a per-process hash like builtin_hash
+        works as well.
+        Call close() (or use the map as a context manager) to stop the workers.
+        :param shards: Number of worker processes
+        :param hash_map_cls: HashMap class of each shard, hash_map_sc.HashMap or hash_map_oa.HashMap
+        :param capacity: Initial capacity of each shard
+        :param function: Hash function used to route keys to shards and, inside each shard, to buckets
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
+        self._hash_function = function
+        self._conns = []
+        self._workers = []
+        for _ in range(shards):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_serve, args=(child_conn, hash_map_cls, capacity, function),
+                                             daemon=True)
+            worker.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._workers.append(worker)
+
+    def __enter__(self) -> "HashMap":
+        """Return the map itself."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the workers."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop every worker process. The map cannot be used afterwards.
+        """
+        for conn in self._conns:
+            conn.send(None)
+            conn.close()
+        for worker in self._workers:
+            worker.join()
+        self._conns, self._workers = [], []
+
+    def get_shard_count(self) -> int:
+        """
+        Return the number of shards
+        """
+        return len(self._conns)
+
+    # ------------------------------------------------------------------ #
+
+    def _shard_of(self, key: str) -> int:
+        """
+        Return the index of the shard owning key.
+        """
+        return self._hash_function(key) % len(self._conns)
+
+    def _call(self, shard: int, name: str, *args) -> object:
+        """
+        Run a method on one shard and return its result.
+        """
+        return self._call_many({shard: (name, args)})[shard]
+
+    def _call_many(self, requests: dict) -> dict:
+        """
+        Send a (method name, args) request to each listed shard, then collect the replies. The shards work on
+        their requests in parallel.
+        :param requests: Mapping of shard index to (method name, args)
+        :return: Mapping of shard index to result
+        """
+        for shard, request in requests.items():
+            self._conns[shard].send(request)
+
+        results, error = {}, None
+        for shard in requests:
+            status, result = self._conns[shard].recv()
+            if status == 'error':
+                error = result
+            results[shard] = result
+        if error is not None:
+            raise error
+        return results
+
+    def _call_all(self, name: str, *args) -> list:
+        """
+        Run a method on every shard and return the results in shard order.
+        """
+        results = self._call_many({shard: (name, args) for shard in range(len(self._conns))})
+        return [results[shard] for shard in range(len(self._conns))]
+
+    def _route(self, keys: list) -> list:
+        """
+        Return the shard index of every key of a batch.
+        """
+        shards = len(self._conns)
+        return [hash_val % shards for hash_val in hash_keys(keys, self._hash_function)]
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the shard owning the key.
+        :param key: Key to be inserted into the hash map.
+        :param value: Value to be inserted into the hash map.
+        :return:
+        """
+        self._call(self._shard_of(key), 'put', key, value)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist.
+        :param key: Key to be searched for
+        :return:
+        """
+        return self._call(self._shard_of(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        return self._call(self._shard_of(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        self._call(self._shard_of(key), 'remove', key)
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update every key/value pair of a batch. Pairs are split by shard and every shard runs its own
+        put_many at the same time. A key that appears more than once ends up with its last value.
+        :param pairs: Dynamic Array (or list) of key/value tuples
+        :return:
+        """
+        pairs = pairs.to_list() if isinstance(pairs, DynamicArray) else list(pairs)
+        if not pairs:
+            return
+        routed = {}
+        for pair, shard in zip(pairs, self._route([key for key, _ in pairs])):
+            routed.setdefault(shard, []).append(pair)
+        self._call_many({shard: ('put_many', (shard_pairs,)) for shard, shard_pairs in routed.items()})
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Look up every key of a batch. Keys are split by shard and every shard runs its own get_many at the same time.
+        :param keys: Dynamic Array (or list) of keys
+        :return: Dynamic Array with the value of each key in batch order, None for keys not in the hash map
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        routed = {}
+        for idx, shard in enumerate(self._route(keys)):
+            routed.setdefault(shard, []).append(idx)
+        replies = self._call_many({shard: ('get_many', ([keys[idx] for idx in positions],))
+                                   for shard, positions in routed.items()})
+
+        #  Put every shard's values back at the positions of their keys in the batch
+        results = [None] * len(keys)
+        for shard, positions in routed.items():
+            for idx, value in zip(positions, replies[shard]):
+                results[idx] = value
+        return DynamicArray(results)
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every key of a batch that is in the hash map.
+        :param keys: Dynamic Array (or list) of keys
+        :return:
+        """
+        keys = keys.to_list() if isinstance(keys, DynamicArray) else list(keys)
+        routed = {}
+        for key, shard in zip(keys, self._route(keys)):
+            routed.setdefault(shard, []).append(key)
+        self._call_many({shard: ('remove_many', (shard_keys,)) for shard, shard_keys in routed.items()})
+
+    def get_size(self) -> int:
+        """
+        Return the number of key/value pairs across all shards
+        """
+        return sum(self._call_all('get_size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return the total capacity of all shards
+        """
+        return sum(self._call_all('get_capacity'))
+
+    def table_load(self) -> float:
+        """
+        Return the load factor over all shards
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets across all shards
+        """
+        return sum(self._call_all('empty_buckets'))
+
+    def clear(self) -> None:
+        """
+        Clear every shard without changing its capacity.
+        """
+        self._call_all('clear')
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in any shard.
+        :return: key_value_da: Dynamic Array with the key/value tuples of every shard, shard by shard
+        """
+        merged = []
+        for pairs in self._call_all('get_keys_and_values'):
+            merged.extend(pairs)
+        return DynamicArray(merged)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSharded put_many / get_many")
+    print("---------------------------")
+    for shard_cls in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        with HashMap(3, shard_cls, function=hash_function_2) as m:
+            m.put_many([('str' + str(i), i * 100) for i in range(150)])
+            m.put('str0', -1)
+            m.remove('str1')
+            values = m.get_many(['str0', 'str1', 'str2', 'str149', 'str150'])
+            print(m.get_size(), values, m.contains_key('str2'), len(m.get_keys_and_values().to_list()))
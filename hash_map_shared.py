@@ -0,0 +1,350 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Read-only HashMap ADT Stored in a Shared Memory Block or a Memory-Mapped File, with Collision Resolution
+#              via Quadratic Probing. Built once from another HashMap; any number of processes can then attach and
+#              look keys up in place, without deserializing the table or copying it into their own memory.
+
+
+import mmap
+import os
+import pickle
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import DynamicArray
+from hash_functions import fnv1a_hash
+from hash_snapshot import loads_plain
+
+
+#  Header: magic, capacity, size, offset of the arena, and the hash of _CHECK_KEY under the build's hash function
+_HEADER = struct.Struct('<8sQQQQ')
+_MAGIC = b'HMSHARED'
+_CHECK_KEY = 'hash_map_shared'
+
+#  Slot: hash (0 if the slot is empty), key offset, value offset, key length, value length. Offsets point into the
+#  arena, which holds the UTF-8 keys and the pickled values. Values are read back with hash_snapshot.loads_plain, so a
+#  crafted table cannot run code in a reader, and only plain data can be stored.
+_SLOT = struct.Struct('<QQQII')
+
+#  Hashes are reduced to 63 bits; the top bit marks a slot as occupied so that an all-zero slot is empty
+_HASH_MASK = (1 << 63) - 1
+_OCCUPIED = 1 << 63
+
+
+def _tracker_name(owner: shared_memory.SharedMemory) -> str:
+    """
+    Return the name the resource tracker knows a shared memory block by: SharedMemory.name, with the leading slash
+    that POSIX shared memory names carry and SharedMemory.name leaves out.
+    """
+    return '/' + owner.name if os.name == 'posix' else owner.name
+
+
+class HashMap:
+    def __init__(self, buffer, function=fnv1a_hash, owner=None) -> None:
+        """
+        Wrap a buffer laid out by HashMap.build. Use HashMap.build to create a table and HashMap.attach or
+        HashMap.open to use an existing one.
+        :param buffer: Memory view over the whole table
+        :param function: Hash function the table was built with
+        :param owner: Shared memory block or mmap object backing the buffer, closed by close()
+        """
+        magic, capacity, size, arena_offset, check = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError("buffer does not hold a shared HashMap")
+        if check != self._slot_hash(function, _CHECK_KEY):
+            raise ValueError("hash function does not match the one the table was built with")
+
+        self._buffer = buffer
+        self._owner = owner
+        self._hash_function = function
+        self._capacity = capacity
+        self._size = size
+
+    def __enter__(self) -> "HashMap":
+        """Return the map itself."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Detach from the table."""
+        self.close()
+
+    @staticmethod
+    def _slot_hash(function, key: str) -> int:
+        """
+        Return the hash of key as stored in a slot: masked to 63 bits, with the occupied bit set.
+        """
+        return (function(key) & _HASH_MASK) | _OCCUPIED
+
+    @staticmethod
+    def _next_prime(capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not HashMap._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def build(cls, source, function=fnv1a_hash, name: str = None, path: str = None) -> "HashMap":
+        """
+        Lay out a table with the key/value pairs of source, in a new shared memory block or, if path is given, in a
+        new file mapped into memory. The capacity is the first prime at least twice the number of pairs.
+        :param source: Any HashMap (its get_keys_and_values is used), a Dynamic Array or an iterable of key/value
+                       tuples. Keys must be str and values plain data (None, bool, int, float, complex, str, bytes,
+                       or tuples, lists, dicts and sets of those), since readers refuse to unpickle anything else.
+        :param function: Hash function used to place the keys. Readers in other processes must use the same one,
+                         so it must not be seeded per process like builtin_hash.
+        :param name: Name of the shared memory block; a unique name is generated when None
+        :param path: File to write the table to instead of shared memory
+        :return: The new table, attached. The caller of build owns a shared memory block and should unlink() it
+                 once no process needs it any more.
+        """
+        if hasattr(source, 'get_keys_and_values'):
+            source = source.get_keys_and_values()
+        if isinstance(source, DynamicArray):
+            source = source.to_list()
+        pairs = list(dict(source).items())
+
+        capacity = cls._next_prime(max(2 * len(pairs), 3))
+        encoded = [(key.encode(), pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) for key, value in pairs]
+        arena_offset = _HEADER.size + capacity * _SLOT.size
+        total = arena_offset + sum(len(key) + len(value) for key, value in encoded)
+
+        if path is None:
+            owner = shared_memory.SharedMemory(name=name, create=True, size=total)
+            buffer = owner.buf
+        else:
+            with open(path, 'wb+') as file:
+                file.truncate(total)
+                owner = mmap.mmap(file.fileno(), total)
+            buffer = memoryview(owner)
+
+        #  Place every pair at the first empty slot of its quadratic probe sequence, appending key and value bytes
+        #  to the arena
+        used = bytearray(capacity)
+        offset = arena_offset
+        for (key, _), (key_bytes, value_bytes) in zip(pairs, encoded):
+            hash_val = cls._slot_hash(function, key)
+            hash_idx = init_hash_idx = (hash_val & _HASH_MASK) % capacity
+            quad_val = 0
+            while used[hash_idx]:
+                quad_val += 1
+                hash_idx = (init_hash_idx + quad_val * quad_val) % capacity
+            used[hash_idx] = 1
+
+            key_offset, value_offset = offset, offset + len(key_bytes)
+            offset = value_offset + len(value_bytes)
+            buffer[key_offset:value_offset] = key_bytes
+            buffer[value_offset:offset] = value_bytes
+            _SLOT.pack_into(buffer, _HEADER.size + hash_idx * _SLOT.size,
+                            hash_val, key_offset, value_offset, len(key_bytes), len(value_bytes))
+
+        _HEADER.pack_into(buffer, 0, _MAGIC, capacity, len(pairs), arena_offset, cls._slot_hash(function, _CHECK_KEY))
+        return cls(buffer, function, owner)
+
+    @classmethod
+    def attach(cls, name: str, function=fnv1a_hash) -> "HashMap":
+        """
+        Attach to a table built in the shared memory block with the given name.
+        :param name: Name of the shared memory block
+        :param function: Hash function the table was built with
+        :return: The table, read in place
+        """
+        owner = shared_memory.SharedMemory(name=name)
+
+        #  Attaching must not register the block for cleanup: on Python < 3.13 the resource tracker would unlink it
+        #  when this process exits, while the builder and other readers still use it
+        resource_tracker.unregister(_tracker_name(owner), 'shared_memory')
+        return cls(owner.buf, function, owner)
+
+    @classmethod
+    def open(cls, path: str, function=fnv1a_hash) -> "HashMap":
+        """
+        Map a table file written by build into memory, read-only.
+        :param path: File written by build
+        :param function: Hash function the table was built with
+        :return: The table, read in place
+        """
+        with open(path, 'rb') as file:
+            owner = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memoryview(owner), function, owner)
+
+    def get_name(self) -> str:
+        """
+        Return the name of the shared memory block, or None for a memory-mapped file
+        """
+        return self._owner.name if isinstance(self._owner, shared_memory.SharedMemory) else None
+
+    def close(self) -> None:
+        """
+        Detach from the table. The shared memory block or file stays in place for other processes.
+        """
+        if self._owner is None:
+            return
+        if isinstance(self._owner, shared_memory.SharedMemory):
+            self._buffer = None
+            self._owner.close()
+        else:
+            self._buffer.release()
+            self._owner.close()
+        self._owner = None
+
+    def unlink(self) -> None:
+        """
+        Detach and free the shared memory block. Processes still attached keep their mapping until they close it.
+        """
+        owner = self._owner
+        self.close()
+        if isinstance(owner, shared_memory.SharedMemory):
+            #  A forked reader shares this process's resource tracker, so its attach may have dropped the block from
+            #  the tracker already. Register it again so unlink can unregister it.
+            resource_tracker.register(_tracker_name(owner), 'shared_memory')
+            owner.unlink()
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: self._size / self._capacity: The load factor of the hash map
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty slots in the hash table
+        :return:
+        """
+        return self._capacity - self._size
+
+    def _find(self, key: str) -> tuple:
+        """
+        Walk the quadratic probe sequence of key, reading each slot in place.
+        :param key: Key to be searched for
+        :return: tuple: (value offset, value length) of the slot holding key, or None
+        """
+        buffer, capacity = self._buffer, self._capacity
+        key_bytes = key.encode()
+        hash_val = self._slot_hash(self._hash_function, key)
+        hash_idx = init_hash_idx = (hash_val & _HASH_MASK) % capacity
+        quad_val = 0
+
+        while True:
+            slot_hash, key_offset, value_offset, key_length, value_length = \
+                _SLOT.unpack_from(buffer, _HEADER.size + hash_idx * _SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == hash_val and key_length == len(key_bytes) and \
+                    buffer[key_offset:key_offset + key_length] == key_bytes:
+                return value_offset, value_length
+
+            quad_val += 1
+            hash_idx = (init_hash_idx + quad_val * quad_val) % capacity
+            if hash_idx == init_hash_idx:
+                return None
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist. Only the value of
+        the matching slot is decoded.
+        :param key: Key to be searched for
+        :return:
+        """
+        found = self._find(key)
+        if found is None:
+            return None
+        value_offset, value_length = found
+        return loads_plain(self._buffer[value_offset:value_offset + value_length])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        return self._find(key) is not None
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        buffer = self._buffer
+        pairs = []
+        for slot in _SLOT.iter_unpack(buffer[_HEADER.size:_HEADER.size + self._capacity * _SLOT.size]):
+            slot_hash, key_offset, value_offset, key_length, value_length = slot
+            if slot_hash:
+                key = str(buffer[key_offset:key_offset + key_length], 'utf-8')
+                pairs.append((key, loads_plain(buffer[value_offset:value_offset + value_length])))
+        return DynamicArray(pairs)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+    from multiprocessing import Pool
+
+    import hash_map_oa
+    from a6_include import hash_function_1
+
+    def reader(name: str) -> int:
+        with HashMap.attach(name) as table:
+            return sum(table.get('str' + str(i)) == i * 100 for i in range(200))
+
+    print("\nShared memory table built from hash_map_oa")
+    print("-------------------------------------------")
+    m = hash_map_oa.HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    table = HashMap.build(m)
+    print(table.get_size(), table.get_capacity(), table.get('str7'), table.contains_key('str150'))
+    with Pool(2) as pool:
+        print(pool.map(reader, [table.get_name()] * 2))
+    table.unlink()
+
+    print("\nMemory-mapped file")
+    print("------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'table.bin')
+    HashMap.build([('key1', 10), ('key2', [1, 2]), ('key1', 30)], path=path).close()
+    with HashMap.open(path) as table:
+        print(table.get_size(), table.get('key1'), table.get('key2'), table.get_keys_and_values())
+    os.remove(path)
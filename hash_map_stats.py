@@ -0,0 +1,235 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Building blocks for HashMap.enable_stats. A map with stats enabled switches to an instrumented
+#              subclass whose tables are made of the tracking containers below, so every counter is updated where
+#              the change happens and reading the stats never scans the table. A map with stats disabled is a plain
+#              HashMap again and runs none of this code.
+
+
+import functools
+import inspect
+
+from a6_include import DynamicArray
+
+
+class HashCallCounter:
+    """
+    Hash function wrapper that counts how often it is called. Batch operations hash through it key by key, so
+    they lose the NumPy path of hash_batch while stats are enabled.
+    """
+
+    def __init__(self, function: callable) -> None:
+        """Wrap the given hash function."""
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, key: str) -> int:
+        """Count the call and forward it."""
+        self.calls += 1
+        return self.function(key)
+
+
+class MapStats:
+    """
+    Counters of one map with stats enabled. Histograms map a length to the number of chains or probe sequences
+    of that length.
+    """
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.operations = 0
+        self.resize_count = 0
+        self.resize_seconds = 0.0
+        self.chain_lengths = {}
+        self.old_chain_lengths = {}
+        self.probe_hits = {}
+        self.probe_misses = {}
+        self.clusters = None
+
+    def summary(self, hash_calls: int) -> dict:
+        """
+        Return the counters shared by both maps.
+        :param hash_calls: Hash function calls since stats were enabled
+        :return: dict with the operation, hash call and resize counters
+        """
+        return {
+            'operations': self.operations,
+            'hash_calls': hash_calls,
+            'hash_calls_per_op': hash_calls / self.operations if self.operations else 0.0,
+            'resize_count': self.resize_count,
+            'resize_seconds': self.resize_seconds,
+        }
+
+
+def histogram(*counts: dict) -> dict:
+    """
+    Merge length histograms, dropping empty lengths, in length order.
+    """
+    merged = {}
+    for count in counts:
+        for length, number in count.items():
+            if number:
+                merged[length] = merged.get(length, 0) + number
+    return dict(sorted(merged.items()))
+
+
+def counting_operations(method: callable, batch: bool = False) -> callable:
+    """
+    Wrap a HashMap method so each call adds to the operation count of the map's stats: one per call, or one per
+    key for a batch method, whose first argument is the batch.
+    """
+    if batch:
+        #  The batch may be passed by position or by its parameter name (pairs or keys)
+        name = list(inspect.signature(method).parameters)[1]
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if args:
+                items, args = args[0], args[1:]
+            else:
+                items = kwargs.pop(name)
+            items = items.to_list() if isinstance(items, DynamicArray) else list(items)
+            self._stats.operations += len(items)
+            return method(self, items, *args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self._stats.operations += 1
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# ------------------------------------------------------------------ #
+#  Chain length tracking (SC). Every chain of a table (a LinkedList, or a TreeBucket once it has grown long) is
+#  switched to a subclass of its class bound to that table's histogram, so any insert or removal, from any code path,
+#  moves its chain between two lengths.
+
+
+class _TrackedChain:
+    """
+    Mixin for a chain class that keeps its table's chain length histogram up to date
+    """
+
+    __slots__ = ()
+    _lengths = None
+    _base = None
+
+    def insert(self, key: str, value: object, hash_val: int = None) -> None:
+        """Insert new node."""
+        lengths = self._lengths
+        lengths[self.length()] -= 1
+        super().insert(key, value, hash_val)
+        lengths[self.length()] = lengths.get(self.length(), 0) + 1
+
+    def pop(self, key: str, hash_val: int = None):
+        """Remove node with matching key and return it, or None if no match."""
+        node = super().pop(key, hash_val)
+        if node is not None:
+            lengths = self._lengths
+            lengths[self.length() + 1] -= 1
+            lengths[self.length()] = lengths.get(self.length(), 0) + 1
+        return node
+
+
+def _tracked_class(base: type, lengths: dict) -> type:
+    """Return a tracked subclass of a chain class, bound to the given histogram."""
+    return type('_Tracked' + base.__name__, (_TrackedChain, base),
+                {'__slots__': (), '_lengths': lengths, '_base': base})
+
+
+def track_chains(buckets: DynamicArray) -> dict:
+    """
+    Switch every chain of a table to a tracked chain and return the chain length histogram they keep up to date.
+    Slots set to None by a migration are skipped.
+    """
+    lengths = {}
+    classes = {}
+    for idx in range(buckets.length()):
+        chain = buckets[idx]
+        if chain is not None:
+            if type(chain) not in classes:
+                classes[type(chain)] = _tracked_class(type(chain), lengths)
+            chain.__class__ = classes[type(chain)]
+            lengths[chain.length()] = lengths.get(chain.length(), 0) + 1
+    return lengths
+
+
+def track_chain(chain, lengths: dict) -> None:
+    """
+    Switch one chain, already counted in a table's chain length histogram, to a tracked chain of that table.
+    """
+    chain.__class__ = _tracked_class(type(chain), lengths)
+
+
+def untrack_chains(buckets: DynamicArray) -> None:
+    """
+    Switch every chain of a table back to its plain class.
+    """
+    for idx in range(buckets.length()):
+        chain = buckets[idx]
+        if chain is not None:
+            chain.__class__ = chain._base
+
+
+# ------------------------------------------------------------------ #
+#  Cluster tracking (OA). Slots of an open addressing table only go from empty to used until the table is rebuilt,
+#  so the longest run of used slots can be kept by merging runs as slots are filled.
+
+
+class ClusterTracker:
+    """
+    Longest run of adjacent used slots (live entries or tombstones) in a table, not wrapping around its end.
+    The length of every run is stored at both of its end slots; a slot that is filled joins the runs ending next to
+    it, whose lengths are read from those end slots.
+    """
+
+    def __init__(self, slots: DynamicArray) -> None:
+        """Measure the runs of a table."""
+        capacity = slots.length()
+        self.runs = [0] * capacity
+        self.max_length = 0
+        idx = 0
+        while idx < capacity:
+            if slots[idx] is None:
+                idx += 1
+                continue
+            start = idx
+            while idx < capacity and slots[idx] is not None:
+                idx += 1
+            self.runs[start] = self.runs[idx - 1] = idx - start
+            self.max_length = max(self.max_length, idx - start)
+
+    def fill(self, idx: int) -> None:
+        """Record that the empty slot idx is now used."""
+        runs = self.runs
+        left = runs[idx - 1] if idx > 0 else 0
+        right = runs[idx + 1] if idx + 1 < len(runs) else 0
+        length = left + 1 + right
+        runs[idx - left] = runs[idx + right] = length
+        if length > self.max_length:
+            self.max_length = length
+
+
+class _TrackedArray(DynamicArray):
+    """
+    Dynamic Array of slots that reports every empty slot it fills to its table's cluster tracker
+    """
+
+    __slots__ = ()
+    _clusters = None
+
+    def __setitem__(self, index: int, value: object) -> None:
+        """Set value of element at a given index using [] syntax."""
+        was_empty = self.get_at_index(index) is None
+        self.set_at_index(index, value)
+        if was_empty and value is not None:
+            self._clusters.fill(index)
+
+
+def track_clusters(slots: DynamicArray) -> ClusterTracker:
+    """
+    Switch a table to a tracked array and return the cluster tracker it keeps up to date.
+    """
+    clusters = ClusterTracker(slots)
+    slots.__class__ = type('_TrackedArray', (_TrackedArray,), {'__slots__': (), '_clusters': clusters})
+    return clusters
@@ -0,0 +1,389 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: HashMap ADT Implemented Using SwissTable-Style Control Bytes and Collision Resolution via Probing
+#              Groups of 16 Slots. Same public API as hash_map_oa.HashMap. Every probe step scans the control bytes
+#              of a whole group with bytearray.find, and keys are only compared on a control byte match.
+
+
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import mix_hash
+
+
+#  Slots per group
+_GROUP = 16
+
+#  Control byte values. Full slots hold the low 7 bits of their key's hash, so they never equal these.
+_EMPTY, _DELETED = 0x80, 0xFE
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, max_load: float = 0.875) -> None:
+        """
+        Initialize new HashMap that uses
+        SwissTable-style group probing for collision resolution.
+        The table is a prime number of groups of 16 slots. Keys are hashed with function and then mix_hash, so the
+        clustered values of weak functions still spread over the groups. Slot i is described by _ctrl[i] (empty,
+        deleted, or the low 7 bits of the mixed hash), _hashes[i], _keys[i] and _values[i]. The remaining high bits
+        pick the first group, and probing moves on one group at a time until it reaches a group with an empty slot.
+        :param capacity: Initial capacity, rounded up to a prime number of groups
+        :param function: Hash function used to map keys to slots
+        :param max_load: Fraction of slots holding live or deleted entries above which put rehashes the table
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        self._hash_function = function
+        self._max_load = max_load
+        self._size = 0
+        self._allocate(self._next_prime(-(-capacity // _GROUP)))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._ctrl[i] == _EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                deleted = self._ctrl[i] == _DELETED
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} TS: {deleted}\n"
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_max_load(self) -> float:
+        """
+        Return the fraction of used slots above which put rehashes the table
+        """
+        return self._max_load
+
+    def get_tombstone_count(self) -> int:
+        """
+        Return the number of deleted slots in the hash table
+        """
+        return self._deleted
+
+    # ------------------------------------------------------------------ #
+
+    def _allocate(self, groups: int) -> None:
+        """
+        Replace the slot arrays with empty arrays of the given number of groups.
+        :param groups: Number of 16-slot groups
+        :return:
+        """
+        self._groups = groups
+        self._capacity = groups * _GROUP
+        self._ctrl = bytearray([_EMPTY]) * self._capacity
+        self._hashes = array('q', bytes(8 * self._capacity))
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._deleted = 0
+
+    def _find(self, key: str, hash_val: int) -> int:
+        """
+        Return the slot holding key, or -1. Lookup-only version of _probe that skips the search for a free slot.
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key, mixed by mix_hash
+        :return: Index of the slot holding key, or -1
+        """
+        ctrl, keys = self._ctrl, self._keys
+        tag = hash_val & 0x7F
+        group = (hash_val >> 7) % self._groups
+
+        for _ in range(self._groups):
+            start = group * _GROUP
+            end = start + _GROUP
+            hash_idx = ctrl.find(tag, start, end)
+            while hash_idx >= 0:
+                if keys[hash_idx] == key:
+                    return hash_idx
+                hash_idx = ctrl.find(tag, hash_idx + 1, end)
+            if ctrl.find(_EMPTY, start, end) >= 0:
+                return -1
+
+            group += 1
+            if group == self._groups:
+                group = 0
+        return -1
+
+    def _probe(self, key: str, hash_val: int) -> (int, int):
+        """
+        Walk the groups of key's probe sequence once. In each group, bytearray.find locates the slots whose control
+        byte matches the low 7 bits of the hash, and only those keys are compared.
+        :param key: Key to be searched for
+        :param hash_val: Hash of the key, mixed by mix_hash
+        :return: tuple: Index of the slot holding key (or -1), and index of the first empty or deleted slot the key
+                 could be inserted into (or -1 if the table has none)
+        """
+        ctrl, keys = self._ctrl, self._keys
+        tag = hash_val & 0x7F
+        group = (hash_val >> 7) % self._groups
+        free_idx = -1
+
+        for _ in range(self._groups):
+            start = group * _GROUP
+            end = start + _GROUP
+            hash_idx = ctrl.find(tag, start, end)
+            while hash_idx >= 0:
+                if keys[hash_idx] == key:
+                    return hash_idx, free_idx
+                hash_idx = ctrl.find(tag, hash_idx + 1, end)
+
+            #  A group with an empty slot ends the probe sequence: no key ever moved on past it
+            empty_idx = ctrl.find(_EMPTY, start, end)
+            if free_idx < 0:
+                deleted_idx = ctrl.find(_DELETED, start, end)
+                if deleted_idx >= 0 and (empty_idx < 0 or deleted_idx < empty_idx):
+                    free_idx = deleted_idx
+                else:
+                    free_idx = empty_idx
+            if empty_idx >= 0:
+                return -1, free_idx
+
+            group += 1
+            if group == self._groups:
+                group = 0
+        return -1, free_idx
+
+    def _write(self, hash_idx: int, hash_val: int, key: str, value: object) -> None:
+        """
+        Fill an empty or deleted slot.
+        """
+        if self._ctrl[hash_idx] == _DELETED:
+            self._deleted -= 1
+        self._ctrl[hash_idx] = hash_val & 0x7F
+        self._hashes[hash_idx] = hash_val
+        self._keys[hash_idx] = key
+        self._values[hash_idx] = value
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update the key/value pair in the hash map. If the key already exists in the hash map, its associated value
+        is replaced with the new value. If the key is not in the hash map, a new key/value pair must be added.
+        When filling an empty slot would take live plus deleted slots past max_load, rehash first: at the same
+        capacity if at least half of the used slots are deleted, otherwise at double the capacity.
+        :param key: Key to be inserted into the hash table.
+        :param value: Value to be inserted into the hash table.
+        :return:
+        """
+        hash_val = mix_hash(self._hash_function(key))
+        hash_idx, free_idx = self._probe(key, hash_val)
+        if hash_idx >= 0:
+            self._values[hash_idx] = value
+            return
+
+        if free_idx < 0 or (self._ctrl[free_idx] == _EMPTY and
+                            (self._size + self._deleted + 1) / self._capacity > self._max_load):
+            if self._deleted >= self._size:
+                self.resize_table(self._capacity)
+            else:
+                self.resize_table(2 * self._capacity)
+            _, free_idx = self._probe(key, hash_val)
+
+        self._write(free_idx, hash_val, key, value)
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Return the hash table's load factor
+        :return: self._size / self._capacity: The load factor of the hash map
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty addresses (empty or deleted slots) in the hash table
+        :return:
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the internal hash table. Rehash all existing key/value pairs from their cached hashes,
+        dropping deleted slots. If the argument new_capacity is less than the number of elements in the hash table,
+        do nothing. If new_capacity is valid, the table gets a prime number of groups that keeps the load factor at
+        or below half of max_load.
+        :param new_capacity: Baseline capacity for the new hash table
+        :return:
+        """
+        if new_capacity < self._size:
+            return
+
+        groups = self._next_prime(-(-new_capacity // _GROUP))
+        while self._size / (groups * _GROUP) > self._max_load / 2:
+            groups = self._next_prime(groups + 1)
+
+        old_ctrl, old_hashes, old_keys, old_values = self._ctrl, self._hashes, self._keys, self._values
+        self._allocate(groups)
+        ctrl = self._ctrl
+
+        #  Move every live slot to the first empty slot of its probe sequence in the new arrays
+        for idx in range(len(old_ctrl)):
+            if old_ctrl[idx] & 0x80:
+                continue
+            hash_val = old_hashes[idx]
+            group = (hash_val >> 7) % groups
+            hash_idx = ctrl.find(_EMPTY, group * _GROUP, group * _GROUP + _GROUP)
+            while hash_idx < 0:
+                group = group + 1 if group + 1 < groups else 0
+                hash_idx = ctrl.find(_EMPTY, group * _GROUP, group * _GROUP + _GROUP)
+            ctrl[hash_idx] = old_ctrl[idx]
+            self._hashes[hash_idx] = hash_val
+            self._keys[hash_idx] = old_keys[idx]
+            self._values[hash_idx] = old_values[idx]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the key does not exist.
+        :param key: Key to be searched for
+        :return:
+        """
+        if self._size == 0:
+            return None
+        hash_idx = self._find(key, mix_hash(self._hash_function(key)))
+        return None if hash_idx < 0 else self._values[hash_idx]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Return True if the key is in the hash map. False otherwise.
+        :param key: Key to be searched for
+        :return: bool: True if the key is in the hash map. False otherwise.
+        """
+        if self._size == 0:
+            return False
+        hash_idx = self._find(key, mix_hash(self._hash_function(key)))
+        return hash_idx >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Remove the given key and its associated value from the hash map. If the key is not in the hash map, do nothing.
+        The slot becomes empty again if its group still has another empty slot, since no probe sequence can run past
+        such a group. Otherwise it is marked deleted.
+        :param key: Key to be removed from the hash map
+        :return:
+        """
+        if self._size == 0:
+            return
+        hash_idx = self._find(key, mix_hash(self._hash_function(key)))
+        if hash_idx < 0:
+            return
+
+        start = hash_idx - hash_idx % _GROUP
+        if self._ctrl.find(_EMPTY, start, start + _GROUP) >= 0:
+            self._ctrl[hash_idx] = _EMPTY
+        else:
+            self._ctrl[hash_idx] = _DELETED
+            self._deleted += 1
+        self._keys[hash_idx] = None
+        self._values[hash_idx] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash table capacity.
+        :return:
+        """
+        self._allocate(self._groups)
+        self._size = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a Dynamic Array where each index contains a tuple of a key/value pair stored in the hash map.
+        :return: key_value_da: Dynamic Array with tuples of key-value tuples
+        """
+        ctrl, keys, values = self._ctrl, self._keys, self._values
+        return DynamicArray([(keys[idx], values[idx]) for idx in range(self._capacity) if not ctrl[idx] & 0x80])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
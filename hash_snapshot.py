@@ -0,0 +1,91 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Binary snapshot files for HashMap.save / HashMap.load. A snapshot is a short header followed by one
+#              pickled payload with the table layout, so loading is a single bulk read. The payload records the hash
+#              of a few fixed keys, which tells load whether the cached hashes are valid for its hash function.
+#              The payload is read with an unpickler that refuses to import anything, so a crafted file cannot run
+#              code on load. In exchange, only plain data can be saved: keys are str and values are None, bool,
+#              int, float, complex, str, bytes, or tuples, lists, dicts, sets and frozensets of those.
+
+
+import io
+import pickle
+import struct
+
+
+#  Header: magic, map kind ('sc' or 'oa'), format version
+_HEADER = struct.Struct('<8s2sH')
+_MAGIC = b'HMSNAPSH'
+_VERSION = 1
+
+#  The only globals a payload may reference: builtin value types that pickle rebuilds through a call
+_SAFE_GLOBALS = {('builtins', 'complex'), ('builtins', 'set'), ('builtins', 'frozenset'), ('builtins', 'bytearray')}
+
+#  Keys whose hashes identify the hash function a snapshot was written with
+_CHECK_KEYS = ('', 'hash_snapshot', 'HashMap key 0123456789')
+
+
+def fingerprint(function) -> tuple:
+    """
+    Return the hashes of the check keys under the given hash function. Wrappers that expose the function they wrap
+    as .function, such as CachedHash and the stats layer's HashCallCounter, are unwrapped first, so taking or
+    checking a snapshot does not show up in their counters.
+    """
+    while hasattr(function, 'function'):
+        function = function.function
+    return tuple(function(key) for key in _CHECK_KEYS)
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """
+    Unpickler for plain data. Pickles can call any importable function while loading; this one refuses every
+    global outside _SAFE_GLOBALS, so only builtin values and containers can be rebuilt.
+    """
+
+    def find_class(self, module: str, name: str) -> object:
+        """Return a safe builtin type, or raise pickle.UnpicklingError for any other global."""
+        if (module, name) in _SAFE_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"pickled data references {module}.{name}; only plain data can be loaded")
+
+
+def loads_plain(data: bytes) -> object:
+    """
+    Unpickle plain data (see the module description) without importing or calling anything the data names.
+    Raises pickle.UnpicklingError for any other pickle.
+    """
+    return _PlainUnpickler(io.BytesIO(data)).load()
+
+
+def write_snapshot(path: str, kind: str, function, payload: dict) -> None:
+    """
+    Write a snapshot file.
+    :param path: File to write
+    :param kind: Map kind, 'sc' or 'oa'
+    :param function: Hash function of the map, fingerprinted into the payload
+    :param payload: Table layout, a dict of plain data (see the module description). Other values are written,
+                    but read_snapshot refuses to load them.
+    :return:
+    """
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, kind.encode(), _VERSION))
+        pickle.dump({**payload, 'fingerprint': fingerprint(function)}, file, pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str, kind: str, function) -> (dict, bool):
+    """
+    Read a snapshot file written by write_snapshot. Files from untrusted sources are safe to read: the payload
+    cannot import or call anything, and a payload that tries raises pickle.UnpicklingError.
+    :param path: File to read
+    :param kind: Map kind the caller expects, 'sc' or 'oa'
+    :param function: Hash function the map will use
+    :return: tuple: The payload, and True if it was written with the same hash function
+    """
+    with open(path, 'rb') as file:
+        magic, file_kind, version = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a HashMap snapshot")
+        if file_kind != kind.encode():
+            raise ValueError(f"{path} holds a {file_kind.decode()} snapshot, not {kind}")
+        payload = _PlainUnpickler(file).load()
+    return payload, payload['fingerprint'] == fingerprint(function)
@@ -0,0 +1,203 @@
+# Course: CS261 - Data Structures
+# Assignment: Assignment 6 - HashMap Implementation
+# Description: Balanced-tree bucket for the chaining HashMap. A chain that grows past the map's treeify threshold is
+#              converted to an AVL tree ordered by (hash, key), so a bucket full of colliding keys is searched in
+#              O(log n) instead of O(n). The tree has the same interface as LinkedList, so the map uses either one
+#              as a bucket.
+
+
+class TreeNode:
+    """
+    AVL tree node for use in a tree bucket. Has the key, value and hash attributes of SLNode.
+    """
+
+    __slots__ = ('key', 'value', 'hash', 'left', 'right', 'height')
+
+    def __init__(self, key: str, value: object, hash_val: int) -> None:
+        """Initialize a leaf node given a key, value and the hash of the key."""
+        self.key = key
+        self.value = value
+        self.hash = hash_val
+        self.left = None
+        self.right = None
+        self.height = 1
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return '(' + str(self.key) + ': ' + str(self.value) + ')'
+
+
+def _height(node: TreeNode) -> int:
+    """Return the height of a subtree, 0 for an empty one."""
+    return node.height if node is not None else 0
+
+
+def _rebalance(node: TreeNode) -> TreeNode:
+    """
+    Update the height of a node whose subtrees are balanced and rotate it if it is not.
+    Return the root of the rebalanced subtree.
+    """
+    left, right = _height(node.left), _height(node.right)
+    if left > right + 1:
+        child = node.left
+        if _height(child.left) < _height(child.right):
+            node.left = _rotate_left(child)
+        return _rotate_right(node)
+    if right > left + 1:
+        child = node.right
+        if _height(child.right) < _height(child.left):
+            node.right = _rotate_right(child)
+        return _rotate_left(node)
+    node.height = max(left, right) + 1
+    return node
+
+
+def _rotate_right(node: TreeNode) -> TreeNode:
+    """Rotate a subtree right and return its new root."""
+    root = node.left
+    node.left = root.right
+    root.right = node
+    node.height = max(_height(node.left), _height(node.right)) + 1
+    root.height = max(_height(root.left), node.height) + 1
+    return root
+
+
+def _rotate_left(node: TreeNode) -> TreeNode:
+    """Rotate a subtree left and return its new root."""
+    root = node.right
+    node.right = root.left
+    root.left = node
+    node.height = max(_height(node.left), _height(node.right)) + 1
+    root.height = max(node.height, _height(root.right)) + 1
+    return root
+
+
+def _insert(root: TreeNode, node: TreeNode) -> TreeNode:
+    """Insert a node whose key is not in the subtree and return the new root of the subtree."""
+    if root is None:
+        return node
+    if node.hash < root.hash or (node.hash == root.hash and node.key < root.key):
+        root.left = _insert(root.left, node)
+    else:
+        root.right = _insert(root.right, node)
+    return _rebalance(root)
+
+
+def _pop_min(root: TreeNode) -> (TreeNode, TreeNode):
+    """Unlink the leftmost node of a subtree. Return the new root of the subtree and the unlinked node."""
+    if root.left is None:
+        return root.right, root
+    root.left, node = _pop_min(root.left)
+    return _rebalance(root), node
+
+
+def _pop(root: TreeNode, key: str, hash_val: int) -> (TreeNode, TreeNode):
+    """
+    Unlink the node with matching key from a subtree. Return the new root of the subtree and the unlinked node,
+    or None if no match. The unlinked node itself is returned, not a copy of its key and value.
+    """
+    if root is None:
+        return None, None
+
+    if hash_val == root.hash and key == root.key:
+        if root.left is None:
+            return root.right, root
+        if root.right is None:
+            return root.left, root
+        #  Put the in-order successor in the place of the node
+        right, successor = _pop_min(root.right)
+        successor.left, successor.right = root.left, right
+        return _rebalance(successor), root
+
+    if hash_val < root.hash or (hash_val == root.hash and key < root.key):
+        root.left, node = _pop(root.left, key, hash_val)
+    else:
+        root.right, node = _pop(root.right, key, hash_val)
+    if node is None:
+        return root, None
+    return _rebalance(root), node
+
+
+def _build(nodes: list, start: int, end: int) -> TreeNode:
+    """Link the sorted nodes[start:end] into a balanced subtree and return its root."""
+    if start == end:
+        return None
+    mid = (start + end) // 2
+    root = nodes[mid]
+    root.left = _build(nodes, start, mid)
+    root.right = _build(nodes, mid + 1, end)
+    root.height = max(_height(root.left), _height(root.right)) + 1
+    return root
+
+
+class TreeBucket:
+    """
+    Class implementing an AVL tree bucket
+    Supported methods are the ones of LinkedList: insert, remove, pop, contains, length, iterator
+    Unlike LinkedList, every method needs the key's hash, which orders the tree before the key does.
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, chain=()) -> None:
+        """
+        Initialize a tree bucket, optionally holding the nodes of a chain.
+        :param chain: Iterable of nodes with key, value and hash attributes, such as a LinkedList, with distinct keys
+        """
+        nodes = sorted((TreeNode(node.key, node.value, node.hash) for node in chain),
+                       key=lambda node: (node.hash, node.key))
+        self._root = _build(nodes, 0, len(nodes))
+        self._size = len(nodes)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'Tree [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Generator over the nodes of the tree, in (hash, key) order."""
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def insert(self, key: str, value: object, hash_val: int) -> None:
+        """Insert new node. As with LinkedList, the key must not be in the bucket already."""
+        self._root = _insert(self._root, TreeNode(key, value, hash_val))
+        self._size += 1
+
+    def remove(self, key: str, hash_val: int) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        return self.pop(key, hash_val) is not None
+
+    def pop(self, key: str, hash_val: int) -> TreeNode:
+        """
+        Remove node with matching key.
+        Return the removed node, or None if no match
+        """
+        self._root, node = _pop(self._root, key, hash_val)
+        if node is not None:
+            self._size -= 1
+        return node
+
+    def contains(self, key: str, hash_val: int) -> TreeNode:
+        """Return node with matching key, or None if no match"""
+        node = self._root
+        while node is not None:
+            if hash_val == node.hash:
+                if key == node.key:
+                    return node
+                node = node.left if key < node.key else node.right
+            else:
+                node = node.left if hash_val < node.hash else node.right
+        return None
+
+    def length(self) -> int:
+        """Return the number of nodes in the tree."""
+        return self._size